@@ -0,0 +1,7 @@
+"""
+Benchmarks for the PC Parts Picker Profile Database Management System
+
+:: Usage
+	Run from the 'workspace' directory so that 'modules' is importable
+		python -m benchmarks.<benchmark-name>
+"""
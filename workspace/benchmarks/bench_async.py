@@ -0,0 +1,107 @@
+"""
+Benchmark: asyncdblib.AsyncSQLiteDB with many concurrent coroutines
+
+- Throughput of point lookups from [coroutines] concurrent coroutines vs the same lookups made synchronously
+- Event-loop responsiveness (longest tick delay) while a slow report query runs, synchronously vs through the facade
+
+:: Usage
+	python -m benchmarks.bench_async [number-of-rows] [coroutines] [lookups-per-coroutine]
+"""
+import os
+import sys
+import time
+import asyncio
+import modules.dblib as dblib
+import modules.asyncdblib as asyncdblib
+from benchmarks import common
+
+SLOW_QUERY = ("designs", "gpu_manufacturer, cpu_manufacturer, COUNT(*), AVG(gpu_price + cpu_price)", "", "GROUP BY gpu_manufacturer, cpu_manufacturer")
+
+async def ticker(stop, interval=0.005):
+	"""
+	Tick every [interval] seconds until [stop] is set; return the longest delay past the expected tick
+	"""
+	worst = 0.0
+	while not stop.is_set():
+		expected = time.perf_counter() + interval
+		await asyncio.sleep(interval)
+		worst = max(worst, time.perf_counter() - expected)
+	return worst
+
+async def measure_lag(work):
+	"""
+	Longest event-loop tick delay while [work]() runs
+	"""
+	stop = asyncio.Event()
+	tick = asyncio.create_task(ticker(stop))
+	await asyncio.sleep(0.02)
+	await work()
+	stop.set()
+	return await tick
+
+def run(number_of_rows=50000, coroutines=100, lookups=50):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_designs_table(mgt.conn)
+		utils.insert_many(mgt.conn, "designs", common.make_designs(number_of_rows), common.DESIGN_COLUMNS)
+		total = coroutines * lookups
+
+		def keys(c):
+			return [((c * lookups + i) * 7919) % number_of_rows + 1 for i in range(lookups)]
+
+		# Synchronous lookups on the calling thread
+		def sync_lookups():
+			for c in range(coroutines):
+				for key in keys(c):
+					utils.retrieve(mgt.conn, "designs", "cpu_name, gpu_name", "ROW_ID=?", fetch="one", verbose=False, params=(key,))
+		_, t_sync = common.timed(sync_lookups)
+
+		async def scenario():
+			results = {}
+			async with asyncdblib.AsyncSQLiteDB("bench.db", work_dir) as adb:
+				async def client(c):
+					for key in keys(c):
+						await adb.retrieve("designs", "cpu_name, gpu_name", "ROW_ID=?", fetch="one", params=(key,))
+				start = time.perf_counter()
+				await asyncio.gather(*[client(c) for c in range(coroutines)])
+				results["async"] = time.perf_counter() - start
+
+				# Same lookups, one round trip per coroutine
+				def batch(conn, utils, key_list):
+					return [utils.retrieve(conn, "designs", "cpu_name, gpu_name", "ROW_ID=?", fetch="one", verbose=False, params=(key,)) for key in key_list]
+				start = time.perf_counter()
+				await asyncio.gather(*[adb.run(batch, keys(c)) for c in range(coroutines)])
+				results["async_batched"] = time.perf_counter() - start
+
+				async def blocking():
+					utils.retrieve(mgt.conn, *SLOW_QUERY, verbose=False)
+				async def awaited():
+					await adb.retrieve(*SLOW_QUERY)
+				results["lag_sync"] = await measure_lag(blocking)
+				results["lag_async"] = await measure_lag(awaited)
+			return results
+
+		results = asyncio.run(scenario())
+		utils.close_db(mgt.conn)
+
+		common.report("{} coroutines x {} lookups over {} designs".format(coroutines, lookups, number_of_rows), [
+			("synchronous", total / t_sync, "lookups/s"),
+			("AsyncSQLiteDB, one call per lookup", total / results["async"], "lookups/s"),
+			("AsyncSQLiteDB, one call per coroutine", total / results["async_batched"], "lookups/s"),
+			("event-loop stall, slow query called directly", results["lag_sync"] * 1000, "ms"),
+			("event-loop stall, slow query awaited", results["lag_async"] * 1000, "ms"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 50000
+	coroutines = int(argv[1]) if len(argv) > 1 else 100
+	lookups = int(argv[2]) if len(argv) > 2 else 50
+	run(number_of_rows, coroutines, lookups)
+
+if __name__ == "__main__":
+	main()
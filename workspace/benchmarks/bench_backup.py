@@ -0,0 +1,77 @@
+"""
+Benchmark: online backup (SQLiteDBMgmt.backup) vs a plain file copy
+
+Also measures how long a concurrent writer waits for its commit while each copy is running.
+
+:: Usage
+	python -m benchmarks.bench_backup [number-of-rows]
+"""
+import os
+import sys
+import time
+import shutil
+import threading
+import modules.dblib as dblib
+from benchmarks import common
+
+def run(number_of_rows=200000, pages=256, sleep=0.0):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir, profile="balanced")
+		utils = mgt.BaseUtilities()
+		common.create_designs_table(mgt.conn)
+		utils.insert_many(mgt.conn, "designs", common.make_designs(number_of_rows), common.DESIGN_COLUMNS)
+		mgt.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+		size_mib = os.path.getsize(mgt.full_path) / (1024 * 1024)
+
+		def writer_latency(stop):
+			"""
+			Commit single rows from another connection until [stop] is set; return the worst commit latency
+			"""
+			conn = utils.open_db(mgt.full_path, {"timeout" : 60.0})
+			worst = 0.0
+			row = next(common.make_designs(1))
+			while not stop.is_set():
+				start = time.perf_counter()
+				utils.insert(conn, "designs", dict(zip(common.DESIGN_COLUMNS, row)), commit=True, get_result=False, completion_msg="", parameterized=True)
+				worst = max(worst, time.perf_counter() - start)
+				time.sleep(0.01)
+			conn.close()
+			return worst
+
+		def measure(copy):
+			stop = threading.Event()
+			res = {}
+			thread = threading.Thread(target=lambda: res.setdefault("worst", writer_latency(stop)))
+			thread.start()
+			_, elapsed = common.timed(copy)
+			stop.set()
+			thread.join()
+			return elapsed, res["worst"]
+
+		# Before: plain copy (not consistent if a write lands mid-copy, the WAL is not included)
+		t_copy, w_copy = measure(lambda: shutil.copy(mgt.full_path, os.path.join(work_dir, "copy.db")))
+
+		# After: online backup to a file and to memory
+		t_file, w_file = measure(lambda: mgt.backup(os.path.join(work_dir, "backup.db"), pages, sleep))
+		t_mem, w_mem = measure(lambda: mgt.backup(":memory:", pages, sleep).close())
+		utils.close_db(mgt.conn)
+
+		common.report("Backup of a {:.1f} MiB database ({} designs)".format(size_mib, number_of_rows), [
+			("file copy (before) : elapsed", t_copy, "s"),
+			("file copy (before) : worst writer commit", w_copy * 1000, "ms"),
+			("backup() to file, pages={} : elapsed".format(pages), t_file, "s"),
+			("backup() to file : worst writer commit", w_file * 1000, "ms"),
+			("backup() to :memory: : elapsed", t_mem, "s"),
+			("backup() to :memory: : worst writer commit", w_mem * 1000, "ms"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 200000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
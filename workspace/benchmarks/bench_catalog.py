@@ -0,0 +1,72 @@
+"""
+Benchmark: 37-column 'designs' table vs the normalized parts catalog (modules.catalog)
+
+Reports the database size and the latency of
+	- "which builds use part X" : OR over every *_name column vs index lookups on parts/design_parts
+	- fetching one design by ROW_ID : 'designs' vs the 'designs_compat' view
+
+:: Usage
+	python -m benchmarks.bench_catalog [number-of-rows]
+"""
+import os
+import sys
+import modules.dblib as dblib
+import modules.catalog as catalog
+from benchmarks import common
+
+def db_size_mib(conn, path):
+	conn.execute("VACUUM;")
+	return os.path.getsize(path) / (1024 * 1024)
+
+def run(number_of_rows=100000, repeat=50):
+	work_dir = common.temp_dir()
+	try:
+		source = dblib.SQLiteDBMgmt("designs.db", work_dir)
+		target = dblib.SQLiteDBMgmt("normalized.db", work_dir)
+		utils = source.BaseUtilities()
+		common.create_designs_table(source.conn)
+		utils.insert_many(source.conn, "designs", common.make_designs(number_of_rows), common.DESIGN_COLUMNS)
+
+		stats = catalog.migrate(source.conn, target.conn)
+
+		# Check the compatibility view on the target against the source
+		target.conn.execute("ATTACH DATABASE ? AS source", (source.full_path,))
+		mismatches = target.conn.execute("SELECT COUNT(*) FROM (SELECT * FROM source.designs EXCEPT SELECT * FROM designs_compat)").fetchone()[0]
+		target.conn.execute("DETACH DATABASE source")
+
+		name_columns = [col for col in catalog.design_columns() if col.endswith("_name")]
+		part_name = "Part 42"
+
+		_, t_old = common.timed(lambda: [
+			source.conn.execute("SELECT ROW_ID FROM designs WHERE {}".format(" OR ".join(["{}=?".format(c) for c in name_columns])), [part_name] * len(name_columns)).fetchall()
+			for i in range(repeat)
+		])
+		_, t_new = common.timed(lambda: [catalog.builds_using_part(target.conn, part_name) for i in range(repeat)])
+
+		row_id = number_of_rows // 2
+		_, t_row_old = common.timed(lambda: [source.conn.execute("SELECT * FROM designs WHERE ROW_ID=?", (row_id,)).fetchone() for i in range(repeat)])
+		_, t_row_new = common.timed(lambda: [target.conn.execute("SELECT * FROM designs_compat WHERE ROW_ID=?", (row_id,)).fetchone() for i in range(repeat)])
+
+		common.report("Normalized catalog ({} designs, {} parts, {} manufacturers, {} view mismatches)".format(
+			number_of_rows, stats["parts"], stats["manufacturers"], mismatches
+		), [
+			("migration", stats["seconds"], "s"),
+			("DB size : designs (before)", db_size_mib(source.conn, source.full_path), "MiB"),
+			("DB size : normalized (after)", db_size_mib(target.conn, target.full_path), "MiB"),
+			("builds using part : designs (before)", t_old / repeat * 1000, "ms"),
+			("builds using part : catalog (after)", t_new / repeat * 1000, "ms"),
+			("design by ROW_ID : designs (before)", t_row_old / repeat * 1000, "ms"),
+			("design by ROW_ID : designs_compat (after)", t_row_new / repeat * 1000, "ms"),
+		])
+		utils.close_db(source.conn)
+		utils.close_db(target.conn)
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 100000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
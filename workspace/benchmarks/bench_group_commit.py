@@ -0,0 +1,91 @@
+"""
+Benchmark: bursty writes from many threads, one commit per write vs SQLiteDBMgmt.BackgroundWriter (group commit)
+
+- per-write commit    : every thread has its own connection and commits each INSERT (one journal sync per write)
+- writer, wait each   : every thread submits an INSERT and waits for its Future before the next one
+- writer, burst       : every thread submits all its INSERTs, then waits for the Futures
+
+:: Usage
+	python -m benchmarks.bench_group_commit [threads] [writes-per-thread] [profile]
+"""
+import os
+import sys
+import time
+import threading
+import modules.dblib as dblib
+from benchmarks import common
+
+INSERT_STMT = "INSERT INTO profiles (username, password, email) VALUES (?, ?, ?)"
+
+def row(t, i, tag):
+	username = "{}-{}-{}".format(tag, t, i)
+	return (username, "hash-" + username, username + "@example.com")
+
+def run_threads(threads, target):
+	"""
+	Run target(t) on [threads] threads; return the elapsed seconds
+	"""
+	workers = [threading.Thread(target=target, args=(t,)) for t in range(threads)]
+	start = time.perf_counter()
+	for worker in workers:
+		worker.start()
+	for worker in workers:
+		worker.join()
+	return time.perf_counter() - start
+
+def run(threads=8, writes=200, profile=None):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir, profile=profile)
+		utils = mgt.BaseUtilities()
+		common.create_profiles_table(mgt.conn)
+		full_path = os.path.join(work_dir, "bench.db")
+		total = threads * writes
+
+		def per_write_commit(t):
+			conn = utils.open_db(full_path, {"timeout" : 60.0}, profile=profile)
+			for i in range(writes):
+				conn.execute(INSERT_STMT, row(t, i, "direct"))
+				conn.commit()
+			conn.close()
+		t_direct = run_threads(threads, per_write_commit)
+
+		results = {}
+		with mgt.BackgroundWriter(full_path, profile=profile) as writer:
+			def wait_each(t):
+				for i in range(writes):
+					writer.submit(INSERT_STMT, row(t, i, "wait")).result()
+			results["wait"] = run_threads(threads, wait_each)
+			stats_wait = writer.stats()
+
+			def burst(t):
+				futures = [writer.submit(INSERT_STMT, row(t, i, "burst")) for i in range(writes)]
+				for future in futures:
+					future.result()
+			results["burst"] = run_threads(threads, burst)
+			stats_burst = writer.stats()
+
+		count = utils.retrieve(mgt.conn, "profiles", "COUNT(*)", fetch="one", verbose=False)[0]
+		utils.close_db(mgt.conn)
+
+		batches_burst = stats_burst["batches"] - stats_wait["batches"]
+		common.report("{} threads x {} INSERTs (profile: {})".format(threads, writes, profile), [
+			("per-write commit", total / t_direct, "writes/s"),
+			("BackgroundWriter, wait each", total / results["wait"], "writes/s"),
+			("  writes per commit", stats_wait["writes_per_batch"], ""),
+			("BackgroundWriter, burst", total / results["burst"], "writes/s"),
+			("  writes per commit", total / float(batches_burst) if batches_burst > 0 else 0.0, ""),
+			("rows written (expected {})".format(total * 3), count, "rows"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	threads = int(argv[0]) if len(argv) > 0 else 8
+	writes = int(argv[1]) if len(argv) > 1 else 200
+	profile = argv[2] if len(argv) > 2 else None
+	run(threads, writes, profile)
+
+if __name__ == "__main__":
+	main()
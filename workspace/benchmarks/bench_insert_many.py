@@ -0,0 +1,47 @@
+"""
+Benchmark: row-by-row insert() vs insert_many() into the 37-column 'designs' table
+
+:: Usage
+	python -m benchmarks.bench_insert_many [number-of-rows]
+"""
+import os
+import sys
+import modules.dblib as dblib
+from benchmarks import common
+
+def run(number_of_rows=20000, batch_size=1000, seed=0):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_designs_table(mgt.conn)
+		rows = list(common.make_designs(number_of_rows, seed))	# Generated before timing: the generator is slower than insert_many()
+
+		# Before: one insert() + commit per row
+		def insert_each():
+			for row in rows:
+				utils.insert(mgt.conn, "designs", dict(zip(common.DESIGN_COLUMNS, row)), commit=True, get_result=False, completion_msg="", parameterized=True)
+
+		_, t_each = common.timed(insert_each)
+		mgt.conn.execute("DELETE FROM designs")
+		mgt.conn.commit()
+
+		# After: one transaction, in batches of executemany()
+		stats = utils.insert_many(mgt.conn, "designs", rows, common.DESIGN_COLUMNS, batch_size)
+		utils.close_db(mgt.conn)
+
+		common.report("Insert {} designs".format(number_of_rows), [
+			("insert() + commit per row (before)", number_of_rows / t_each, "rows/sec"),
+			("insert_many(), batch_size={} (after)".format(batch_size), stats["rows_per_sec"], "rows/sec"),
+			("speedup", stats["rows_per_sec"] / (number_of_rows / t_each), "x"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 20000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: overhead of SQLiteDBMgmt.Instrumentation on BaseUtilities point lookups
+
+- disabled                : utils.instrumentation = None (the default)
+- timings                 : per-statement latency histogram, rows, errors, slow-query log
+- timings + trace         : also counts every statement with the connection's trace callback
+- timings + trace + steps : also counts virtual machine steps with a progress handler (every 1000 instructions)
+
+:: Usage
+	python -m benchmarks.bench_instrumentation [number-of-rows] [number-of-lookups]
+"""
+import os
+import sys
+import modules.dblib as dblib
+from benchmarks import common
+
+def run(number_of_rows=100000, number_of_lookups=50000):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_profiles_table(mgt.conn)
+		usernames = common.fill_profiles(mgt.conn, number_of_rows)
+		keys = [usernames[(i * 7919) % number_of_rows] for i in range(number_of_lookups)]
+
+		def lookups():
+			for username in keys:
+				utils.retrieve(mgt.conn, "profiles", "username,password", "username=?", fetch="one", completion_msg="", verbose=False, params=(username,))
+
+		def scenario(trace, progress_steps):
+			utils.instrumentation = mgt.Instrumentation()
+			utils.instrumentation.attach(mgt.conn, trace, progress_steps)
+			_, seconds = common.timed(lookups)
+			utils.instrumentation.detach(mgt.conn)
+			return seconds
+
+		utils.instrumentation = None
+		_, t_disabled = common.timed(lookups)
+		t_timings = scenario(False, None)
+		t_trace = scenario(True, None)
+		t_steps = scenario(True, 1000)
+		entry = utils.instrumentation.report()[0]
+		utils.close_db(mgt.conn)
+
+		results = [("disabled", number_of_lookups / t_disabled, "lookups/s")]
+		for label, seconds in [("timings", t_timings), ("timings + trace", t_trace), ("timings + trace + steps", t_steps)]:
+			results.append((label, number_of_lookups / seconds, "lookups/s"))
+			results.append(("  overhead", (seconds / t_disabled - 1) * 100, "%"))
+		results.append(("p95 lookup latency (histogram bucket)", entry["p95_seconds"] * 1000000, "us"))
+		common.report("{} point lookups over {} profiles".format(number_of_lookups, number_of_rows), results)
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 100000
+	number_of_lookups = int(argv[1]) if len(argv) > 1 else 50000
+	run(number_of_rows, number_of_lookups)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,63 @@
+"""
+Memory benchmark: retrieve() (fetchall) vs iter_retrieve() (fetchmany batches)
+
+Scans every row of a [number-of-rows] 'profiles' table and samples the process RSS while iterating.
+iter_retrieve() should stay flat; retrieve() grows with the table size.
+
+:: Usage
+	python -m benchmarks.bench_iter_retrieve [number-of-rows]
+"""
+import os
+import sys
+import modules.dblib as dblib
+from benchmarks import common
+
+def current_rss_mib():
+	"""
+	Current resident set size of this process in MiB
+	"""
+	try:
+		with open("/proc/self/statm") as f:
+			return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+	except OSError:
+		# Not Linux: fall back to the peak RSS
+		import resource
+		peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+		if sys.platform == "darwin":
+			return peak / (1024 * 1024)
+		return peak / 1024
+
+def run(number_of_rows=1000000, batch_size=1000, samples=10):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_profiles_table(mgt.conn)
+		common.fill_profiles(mgt.conn, number_of_rows)
+
+		# After: streaming, sampled every [number_of_rows / samples] rows (run first, RSS only grows)
+		results = [("baseline", current_rss_mib(), "MiB RSS")]
+		step = max(number_of_rows // samples, 1)
+		count = 0
+		for row in utils.iter_retrieve(mgt.conn, "profiles", batch_size=batch_size):
+			count += 1
+			if count % step == 0:
+				results.append(("iter_retrieve() after {} rows".format(count), current_rss_mib(), "MiB RSS"))
+
+		# Before: fetchall()
+		rows = utils.retrieve(mgt.conn, "profiles", verbose=False)
+		results.append(("retrieve() after {} rows".format(len(rows)), current_rss_mib(), "MiB RSS"))
+		del rows
+		utils.close_db(mgt.conn)
+
+		common.report("Full scan of {} profiles".format(number_of_rows), results)
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 1000000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
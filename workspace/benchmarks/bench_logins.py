@@ -0,0 +1,100 @@
+"""
+Benchmark: PBKDF2 login verification on the calling thread vs security.HashingService (threads/processes)
+
+Reports logins/sec, per-login latency and the longest time the calling ("UI") thread was blocked.
+
+:: Usage
+	python -m benchmarks.bench_logins [number-of-logins] [concurrent-logins] [iterations]
+"""
+import os
+import sys
+import time
+import modules.dblib as dblib
+import modules.security as sec
+from benchmarks import common
+
+def percentile(values, fraction):
+	values = sorted(values)
+	return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def run_inline(users, passwords):
+	"""
+	Every login is verified on the calling thread, one at a time
+	"""
+	latencies = []
+	start = time.perf_counter()
+	for i in range(len(users)):
+		t = time.perf_counter()
+		sec.verify_password(passwords[i], users[i])
+		latencies.append(time.perf_counter() - t)
+	elapsed = time.perf_counter() - start
+	return elapsed, latencies, max(latencies)
+
+def run_service(users, passwords, concurrency, use_processes):
+	"""
+	The calling thread submits up to [concurrency] logins at once and collects them as they finish
+	"""
+	latencies = []
+	blocked = 0.0
+	with sec.HashingService(max_pending=concurrency, use_processes=use_processes, submit_timeout=60.0) as service:
+		# Warm the pool up (process start-up is not a per-login cost)
+		service.verify("warm-up", users[0])
+		start = time.perf_counter()
+		futures = []
+		for i in range(len(users)):
+			t = time.perf_counter()
+			future = service.submit_verify(passwords[i], users[i])
+			blocked = max(blocked, time.perf_counter() - t)
+			future.add_done_callback(lambda f, t=t: latencies.append(time.perf_counter() - t))
+			futures.append(future)
+		results = [f.result() for f in futures]
+		elapsed = time.perf_counter() - start
+		stats = service.stats()
+	assert all(results), "verification failed"
+	return elapsed, latencies, blocked, stats
+
+def run(number_of_logins=64, concurrency=16, iterations=sec.DEFAULT_ITERATIONS):
+	work_dir = common.temp_dir()
+	try:
+		# Accounts with PBKDF2 hashes, looked up through BaseUtilities as the login does
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_profiles_table(mgt.conn)
+		usernames = ["user{}".format(i) for i in range(number_of_logins)]
+		passwords = ["password-{}".format(i) for i in range(number_of_logins)]
+		rows = [(usernames[i], sec.hash_password(passwords[i], iterations), "{}@example.com".format(usernames[i])) for i in range(number_of_logins)]
+		utils.insert_many(mgt.conn, "profiles", rows, ["username", "password", "email"])
+		hashes = [
+			utils.retrieve(mgt.conn, "profiles", "password", "username=?", fetch="one", completion_msg="", verbose=False, params=(u,))[0]
+			for u in usernames
+		]
+		utils.close_db(mgt.conn)
+
+		results = []
+		t_inline, lat_inline, blocked_inline = run_inline(hashes, passwords)
+		results += [
+			("calling thread: logins/sec", number_of_logins / t_inline, "logins/s"),
+			("calling thread: p95 latency", percentile(lat_inline, 0.95) * 1000, "ms"),
+			("calling thread: longest stall", blocked_inline * 1000, "ms"),
+		]
+		for label, use_processes in (("thread pool", False), ("process pool", True)):
+			t_pool, lat_pool, blocked_pool, stats = run_service(hashes, passwords, concurrency, use_processes)
+			results += [
+				("{} ({} workers): logins/sec".format(label, stats["workers"]), number_of_logins / t_pool, "logins/s"),
+				("{}: p95 latency".format(label), percentile(lat_pool, 0.95) * 1000, "ms"),
+				("{}: longest stall (submit)".format(label), blocked_pool * 1000, "ms"),
+			]
+
+		common.report("{} logins, {} in flight, {} PBKDF2 iterations".format(number_of_logins, concurrency, iterations), results)
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_logins = int(argv[0]) if len(argv) > 0 else 64
+	concurrency = int(argv[1]) if len(argv) > 1 else 16
+	iterations = int(argv[2]) if len(argv) > 2 else sec.DEFAULT_ITERATIONS
+	run(number_of_logins, concurrency, iterations)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: start-up schema work, re-running every table/index/trigger/FTS step (the former Workspace.setup)
+vs schema.migrate() on an up-to-date file (reads PRAGMA user_version only)
+
+:: Usage
+	python -m benchmarks.bench_migrations [number-of-rows]
+"""
+import os
+import sys
+import modules.dblib as dblib
+import modules.schema as schema
+from benchmarks import common
+
+def run(number_of_rows=200000, repeat=20):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		schema.create_tables(mgt.conn, utils)	# A file from before the migrations: the first released layout, no total_price, user_version 0
+		mgt.conn.commit()
+		utils.insert_many(mgt.conn, "designs", common.make_designs(number_of_rows), common.DESIGN_COLUMNS)
+
+		# First start on an existing, never migrated file (version 0)
+		stats, t_first = common.timed(schema.migrate, mgt.conn, utils)
+
+		# Every start before: all the DDL/check steps again
+		def setup_every_time():
+			for migration in schema.MIGRATIONS:
+				migration["apply"](mgt.conn, utils)
+				mgt.conn.commit()
+		_, t_before = common.timed(lambda: [setup_every_time() for i in range(repeat)])
+
+		# Every start after: fast path
+		_, t_after = common.timed(lambda: [schema.migrate(mgt.conn, utils) for i in range(repeat)])
+		utils.close_db(mgt.conn)
+
+		common.report("Start-up schema work on {} designs (schema version {})".format(number_of_rows, stats["to"]), [
+			("first migration (version 0 -> {})".format(stats["to"]), t_first, "s"),
+			("every step on each start (before)", t_before / repeat * 1000, "ms/start"),
+			("migrate() fast path (after)", t_after / repeat * 1000, "ms/start"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 200000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,52 @@
+"""
+Benchmark: 'LIMIT ... OFFSET ...' vs keyset pagination (BaseUtilities.paginate) at increasing page depths
+
+:: Usage
+	python -m benchmarks.bench_pagination [number-of-rows]
+"""
+import os
+import sys
+import modules.dblib as dblib
+from benchmarks import common
+
+def run(number_of_rows=200000, page_size=50, repeat=20):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_designs_table(mgt.conn)
+		utils.insert_many(mgt.conn, "designs", common.make_designs(number_of_rows), common.DESIGN_COLUMNS)
+
+		results = []
+		for depth in [0, number_of_rows // 100, number_of_rows // 10, number_of_rows // 2, number_of_rows - page_size]:
+			# Before: OFFSET walks over every skipped row
+			_, t_offset = common.timed(lambda: [
+				utils.retrieve(mgt.conn, "designs", other_options="ORDER BY ROW_ID LIMIT {} OFFSET {}".format(page_size, depth), completion_msg="", verbose=False)
+				for i in range(repeat)
+			])
+
+			# After: seek straight to the page with the token left by the previous page
+			# (tokens only fit the query that made them, so the first [depth] rows are read once, untimed)
+			token = None
+			if depth > 0:
+				token = utils.paginate(mgt.conn, "designs", page_size=depth)["next"]
+			_, t_keyset = common.timed(lambda: [
+				utils.paginate(mgt.conn, "designs", page_size=page_size, token=token)
+				for i in range(repeat)
+			])
+
+			results.append(("page at row {} : OFFSET (before)".format(depth), t_offset / repeat * 1000, "ms/page"))
+			results.append(("page at row {} : keyset (after)".format(depth), t_keyset / repeat * 1000, "ms/page"))
+		utils.close_db(mgt.conn)
+
+		common.report("Pagination over {} designs".format(number_of_rows), results)
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 200000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
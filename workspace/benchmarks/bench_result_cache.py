@@ -0,0 +1,69 @@
+"""
+Benchmark: repeated retrieve() calls with and without SQLiteDBMgmt.ResultCache
+
+A menu/report-like workload: a small set of read queries repeated many times, with an occasional write
+that invalidates the cached results of its table.
+
+:: Usage
+	python -m benchmarks.bench_result_cache [number-of-rows] [number-of-reads]
+"""
+import os
+import sys
+import modules.dblib as dblib
+from benchmarks import common
+
+PRICE_COLUMNS = [c for c in common.DESIGN_COLUMNS if c.endswith("_price")]
+
+def workload(utils, conn, number_of_reads, write_every):
+	"""
+	Run [number_of_reads] reads drawn from a fixed set of queries, with one UPDATE every [write_every] reads
+	"""
+	queries = [
+		("designs", "COUNT(*)", "", "", None),
+		("designs", "ROW_ID, total_price", "total_price BETWEEN ? AND ?", "ORDER BY total_price LIMIT 20", (3000.0, 3500.0)),
+		("designs", "gpu_manufacturer, COUNT(*), AVG(total_price)", "", "GROUP BY gpu_manufacturer", None),
+		("designs", "cpu_name, gpu_name", "ROW_ID=?", "", (42,)),
+		("profiles", "username,password", "username=?", "", ("user7",)),
+	]
+	for i in range(number_of_reads):
+		table_name, col, where_condition, other_options, params = queries[i % len(queries)]
+		utils.retrieve(conn, table_name, col, where_condition, other_options, verbose=False, params=params)
+		if (write_every > 0) and ((i + 1) % write_every == 0):
+			utils.query_exec(conn, None, "UPDATE profiles SET email=? WHERE username=?;", True, completion_msg="", params=("{}@example.com".format(i), "user7"))
+
+def run(number_of_rows=50000, number_of_reads=5000, write_every=100):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_designs_table(mgt.conn)
+		common.create_profiles_table(mgt.conn)
+		common.fill_profiles(mgt.conn, 1000)
+		utils.insert_many(mgt.conn, "designs", common.make_designs(number_of_rows), common.DESIGN_COLUMNS)
+		utils.materialize_sum(mgt.conn, "designs", "total_price", PRICE_COLUMNS)
+
+		_, t_plain = common.timed(workload, utils, mgt.conn, number_of_reads, write_every)
+
+		utils.result_cache = mgt.ResultCache()
+		_, t_cached = common.timed(workload, utils, mgt.conn, number_of_reads, write_every)
+		stats = utils.result_cache.stats()
+		utils.close_db(mgt.conn)
+
+		common.report("{} reads over {} designs, one write every {} reads".format(number_of_reads, number_of_rows, write_every), [
+			("without cache", number_of_reads / t_plain, "reads/s"),
+			("with ResultCache", number_of_reads / t_cached, "reads/s"),
+			("hit rate", stats["hit_rate"] * 100, "%"),
+			("invalidations", stats["invalidations"], "entries"),
+			("cached bytes", stats["bytes"], "bytes"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 50000
+	number_of_reads = int(argv[1]) if len(argv) > 1 else 5000
+	run(number_of_rows, number_of_reads)
+
+if __name__ == "__main__":
+	main()
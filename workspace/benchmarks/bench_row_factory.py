@@ -0,0 +1,75 @@
+"""
+Benchmark: fetching design rows as plain tuples, sqlite3.Row, SQLiteDBMgmt.RecordFactory records and per-row dictionaries
+
+- fetch          : retrieve() of every design (all columns), rows/s
+- fetch + access : same, then reading 3 columns of every row by name (by position for tuples), rows/s
+- memory         : memory held by the fetched result (tracemalloc)
+
+:: Usage
+	python -m benchmarks.bench_row_factory [number-of-rows]
+"""
+import os
+import sys
+import sqlite3
+import tracemalloc
+import modules.dblib as dblib
+import modules.schema as schema
+from benchmarks import common
+
+FIELDS = ["cpu_name", "gpu_name", "total_price"]
+
+def run(number_of_rows=100000, repeat=3):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		schema.migrate(mgt.conn, utils, target_version=2)
+		utils.insert_many(mgt.conn, "designs", common.make_designs(number_of_rows), common.DESIGN_COLUMNS)
+		columns = list(schema.table_properties[1]["columns"].keys())
+		positions = [columns.index(f) for f in FIELDS]
+
+		def fetch():
+			return utils.retrieve(mgt.conn, "designs", verbose=False)
+
+		# (label, row factory, post-processing of the result, access to FIELDS of a row)
+		scenarios = [
+			("tuple", None, None, lambda row: [row[i] for i in positions]),
+			("dict per row", None, lambda rows: [dict(zip(columns, row)) for row in rows], lambda row: [row[f] for f in FIELDS]),
+			("sqlite3.Row", sqlite3.Row, None, lambda row: [row[f] for f in FIELDS]),
+			("RecordFactory", mgt.RecordFactory(schema.table_properties), None, lambda row: [row.cpu_name, row.gpu_name, row.total_price]),
+		]
+
+		results = []
+		for label, row_factory, convert, access in scenarios:
+			mgt.conn.row_factory = row_factory
+			load = (lambda: convert(fetch())) if convert != None else fetch
+
+			t_fetch = min([common.timed(load)[1] for i in range(repeat)])
+			def load_and_access():
+				for row in load():
+					access(row)
+			t_access = min([common.timed(load_and_access)[1] for i in range(repeat)])
+
+			tracemalloc.start()
+			rows = load()
+			held = tracemalloc.get_traced_memory()[0]
+			tracemalloc.stop()
+			del rows
+
+			results.append(("{} : fetch".format(label), number_of_rows / t_fetch, "rows/s"))
+			results.append(("{} : fetch + access".format(label), number_of_rows / t_access, "rows/s"))
+			results.append(("{} : memory".format(label), held / float(number_of_rows), "bytes/row"))
+		mgt.conn.row_factory = None
+		utils.close_db(mgt.conn)
+
+		common.report("{} designs, {} columns".format(number_of_rows, len(columns)), results)
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 100000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: LIKE '%...%' across every *_name/*_manufacturer column vs the FTS5 index (BaseUtilities.search)
+
+- search  : ms per query, LIKE before and MATCH after the index is built
+- writes  : insert_many() of 10000 designs before and after the index exists; the FTS triggers index
+            all 21 text columns of every row, so large imports are cheaper with rebuild_fts_index() afterwards
+
+:: Usage
+	python -m benchmarks.bench_search [number-of-rows]
+"""
+import os
+import sys
+import modules.dblib as dblib
+from benchmarks import common
+
+TEXT_COLUMNS = [c for c in common.DESIGN_COLUMNS if c.endswith("_name") or c.endswith("_manufacturer")]
+SEARCHES = ["RTX 4070", "Noctua", "0042 Gaming"]
+
+def run(number_of_rows=200000, repeat=10, limit=20):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_designs_table(mgt.conn)
+		utils.insert_many(mgt.conn, "designs", common.make_designs(number_of_rows), common.DESIGN_COLUMNS)
+		# A few rare, real-world names among the synthetic ones
+		mgt.conn.execute("UPDATE designs SET gpu_name = 'GeForce RTX 4070 Super' WHERE ROW_ID % 1000 = 0;")
+		mgt.conn.execute("UPDATE designs SET cooling_device_manufacturer = 'Noctua' WHERE ROW_ID % 700 = 0;")
+		mgt.conn.commit()
+
+		# Before: substring match over every text column
+		def like_search(text):
+			conditions = " AND ".join([
+				"({})".format(" OR ".join(["{} LIKE ?".format(c) for c in TEXT_COLUMNS]))
+				for word in text.split()
+			])
+			params = [("%" + word + "%") for word in text.split() for c in TEXT_COLUMNS]
+			return utils.retrieve(mgt.conn, "designs", "ROW_ID", conditions, "LIMIT {}".format(limit), verbose=False, params=params) or []
+
+		_, t_like = common.timed(lambda: [like_search(text) for text in SEARCHES for i in range(repeat)])
+		new_rows = [list(common.make_designs(10000, seed=2)), list(common.make_designs(10000, seed=1))]	# Generated before timing
+		_, t_insert_plain = common.timed(utils.insert_many, mgt.conn, "designs", new_rows[0], common.DESIGN_COLUMNS)
+
+		# After: FTS5 index (built once, then maintained by triggers)
+		if not utils.fts_available(mgt.conn):
+			print("SQLite was built without FTS5")
+			return
+		_, t_build = common.timed(utils.create_fts_index, mgt.conn, "designs", TEXT_COLUMNS)
+		results, t_fts = common.timed(lambda: [utils.search(mgt.conn, "designs", text, col="ROW_ID", limit=limit) for text in SEARCHES for i in range(repeat)])
+		_, t_insert = common.timed(utils.insert_many, mgt.conn, "designs", new_rows[1], common.DESIGN_COLUMNS)
+		utils.close_db(mgt.conn)
+
+		number_of_queries = len(SEARCHES) * repeat
+		common.report("Search over {} designs ({} text columns, top {})".format(number_of_rows, len(TEXT_COLUMNS), limit), [
+			("LIKE '%...%' (before)", t_like / number_of_queries * 1000, "ms/query"),
+			("FTS5 index build", t_build, "s"),
+			("FTS5 MATCH + bm25 (after)", t_fts / number_of_queries * 1000, "ms/query"),
+			("results per query", sum([len(r) for r in results]) / float(number_of_queries), "rows"),
+			("insert_many without FTS index", 10000 / t_insert_plain, "rows/sec"),
+			("insert_many with FTS triggers", 10000 / t_insert, "rows/sec"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 200000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: start-up import cost per module ('python -X importtime') and per GUI backend
+
+:: Usage
+	python -m benchmarks.bench_startup [number-of-modules-to-list]
+"""
+import os
+import sys
+import time
+import subprocess
+from benchmarks import common
+
+WORKSPACE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Toolkit load for each backend, timed in a fresh interpreter (the attribute access imports the toolkit)
+BACKEND_STATEMENTS = {
+	"headless" : "",
+	"tk" : "ui.tk",
+	"qt5" : "ui.widgets",
+}
+
+def backend_load_time(backend):
+	"""
+	Time get_backend([backend]) and its toolkit import in a fresh interpreter
+
+	:: Returns
+		Value: (<seconds>, None) or (None, <error>) if the toolkit is not available
+		Type: Tuple
+	"""
+	statement = "import time, modules.guilib as g; t = time.perf_counter(); ui = g.get_backend('{}'); {}; print(time.perf_counter() - t)".format(
+		backend, BACKEND_STATEMENTS[backend] or "pass"
+	)
+	proc = subprocess.run([sys.executable, "-c", statement], cwd=WORKSPACE, capture_output=True, text=True)
+	if proc.returncode != 0:
+		return None, proc.stderr.strip().splitlines()[-1]
+	return float(proc.stdout.strip().splitlines()[-1]), None
+
+def import_times(statement):
+	"""
+	Run [statement] in a fresh interpreter with -X importtime
+
+	:: Returns
+		Value: ({"<module>" : (<self-us>, <cumulative-us>)}, <wall-clock-seconds>) or (None, <error>) if it failed
+		Type: Tuple
+	"""
+	start = time.perf_counter()
+	proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=WORKSPACE, capture_output=True, text=True)
+	elapsed = time.perf_counter() - start
+	if proc.returncode != 0:
+		return None, proc.stderr.strip().splitlines()[-1]
+	modules = {}
+	for line in proc.stderr.splitlines():
+		if not line.startswith("import time:") or "cumulative" in line:
+			continue
+		self_us, cumulative_us, name = line[len("import time:"):].split("|")
+		modules[name.strip()] = (int(self_us), int(cumulative_us))
+	return modules, elapsed
+
+def run(top=15, repeat=5):
+	# Compile the bytecode once so the runs do not measure compilation
+	subprocess.run([sys.executable, "-m", "compileall", "-q", "main.py", "modules"], cwd=WORKSPACE, check=True)
+
+	# Best of [repeat] runs of 'import main'
+	best = None
+	for i in range(repeat):
+		modules, elapsed = import_times("import main")
+		if modules == None:
+			print("import main failed: {}".format(elapsed))
+			return
+		if (best == None) or (modules["main"][1] < best[0]["main"][1]):
+			best = (modules, elapsed)
+	modules, elapsed = best
+
+	results = [("interpreter start + import main (wall clock)", elapsed * 1000, "ms")]
+	ranked = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)
+	for name, (self_us, cumulative_us) in ranked[:top]:
+		results.append(("{} (self {:.1f}ms)".format(name, self_us / 1000.0), cumulative_us / 1000.0, "ms cumulative"))
+	common.report("Import cost of main", results)
+
+	results = []
+	unavailable = []
+	for backend in BACKEND_STATEMENTS.keys():
+		seconds, error = backend_load_time(backend)
+		if seconds == None:
+			unavailable.append("\t{} unavailable: {}".format(backend, error))
+			continue
+		results.append(("{}: backend + toolkit load".format(backend), seconds * 1000, "ms"))
+	common.report("GUI backends (toolkit loaded on first use)", results)
+	for line in unavailable:
+		print(line)
+
+def main():
+	argv = sys.argv[1:]
+	top = int(argv[0]) if len(argv) > 0 else 15
+	run(top)
+
+if __name__ == "__main__":
+	main()
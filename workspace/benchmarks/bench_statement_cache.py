@@ -0,0 +1,55 @@
+"""
+Micro-benchmark: login lookup with str.format vs bound parameters
+
+Compares the per-call latency of the 'profiles' username lookup used by Workspace.Security.login
+	- format : "username=\"<name>\"" => a new statement string per user, re-parsed and re-planned on every call
+	- params : "username=?" + params => one statement string, served from the connection statement cache
+
+:: Usage
+	python -m benchmarks.bench_statement_cache [number-of-rows] [number-of-lookups]
+"""
+import os
+import sys
+import random
+import modules.dblib as dblib
+from benchmarks import common
+
+def run(number_of_rows=100000, number_of_lookups=20000, seed=0):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_profiles_table(mgt.conn)
+		usernames = common.fill_profiles(mgt.conn, number_of_rows, seed)
+
+		rng = random.Random(seed)
+		lookups = [rng.choice(usernames) for i in range(number_of_lookups)]
+
+		def lookup_format():
+			for uname in lookups:
+				utils.retrieve(mgt.conn, "profiles", "username,password", "username=\"{}\"".format(uname), fetch="one", completion_msg="", verbose=False)
+
+		def lookup_params():
+			for uname in lookups:
+				utils.retrieve(mgt.conn, "profiles", "username,password", "username=?", fetch="one", completion_msg="", verbose=False, params=(uname,))
+
+		_, t_format = common.timed(lookup_format)
+		_, t_params = common.timed(lookup_params)
+		utils.close_db(mgt.conn)
+
+		common.report("Login lookup on {} profiles ({} lookups)".format(number_of_rows, number_of_lookups), [
+			("str.format (before)", t_format / number_of_lookups * 1e6, "us/call"),
+			("bound parameters (after)", t_params / number_of_lookups * 1e6, "us/call"),
+			("speedup", t_format / t_params, "x"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 100000
+	number_of_lookups = int(argv[1]) if len(argv) > 1 else 20000
+	run(number_of_rows, number_of_lookups)
+
+if __name__ == "__main__":
+	main()
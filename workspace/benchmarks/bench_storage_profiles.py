@@ -0,0 +1,63 @@
+"""
+Benchmark: insert and scan throughput per storage-performance profile (dblib.STORAGE_PROFILES)
+
+Each profile runs against its own copy of res/database/PCPartsList.db
+	- insert (commit/row) : insert() with a commit per row, as done by registration today
+	- insert (bulk)       : insert_many() in a single transaction
+	- scan                : SELECT * over the whole 'designs' table
+
+:: Usage
+	python -m benchmarks.bench_storage_profiles [number-of-rows]
+"""
+import os
+import sys
+import shutil
+import modules.dblib as dblib
+from benchmarks import common
+
+SOURCE_DB = os.path.join(dblib.get_parent_dir(dblib.__file__, 2), "res", "database", "PCPartsList.db")
+
+def run(number_of_rows=50000, number_of_single_inserts=1000, seed=0):
+	results = []
+	for profile in dblib.STORAGE_PROFILES.keys():
+		work_dir = common.temp_dir()
+		try:
+			shutil.copy(SOURCE_DB, os.path.join(work_dir, "PCPartsList.db"))
+			read_only = (dblib.STORAGE_PROFILES[profile].get("query_only") == "ON")
+
+			# Writes (the read-only profile is loaded with the default settings instead)
+			mgt = dblib.SQLiteDBMgmt("PCPartsList.db", work_dir, profile=None if read_only else profile)
+			utils = mgt.BaseUtilities()
+			common.create_designs_table(mgt.conn)
+
+			single_rows = list(common.make_designs(number_of_single_inserts, seed))	# Generated before timing
+			bulk_rows = list(common.make_designs(number_of_rows, seed))
+			if not read_only:
+				def insert_each():
+					for row in single_rows:
+						utils.insert(mgt.conn, "designs", dict(zip(common.DESIGN_COLUMNS, row)), commit=True, get_result=False, completion_msg="", parameterized=True)
+				_, t_each = common.timed(insert_each)
+				results.append(("{} : insert (commit/row)".format(profile), number_of_single_inserts / t_each, "rows/sec"))
+
+			stats = utils.insert_many(mgt.conn, "designs", bulk_rows, common.DESIGN_COLUMNS)
+			if not read_only:
+				results.append(("{} : insert (bulk)".format(profile), stats["rows_per_sec"], "rows/sec"))
+			utils.close_db(mgt.conn)
+
+			# Scan on a fresh connection with the profile applied
+			mgt = dblib.SQLiteDBMgmt("PCPartsList.db", work_dir, profile=profile)
+			rows, t_scan = common.timed(lambda: mgt.conn.execute("SELECT * FROM designs").fetchall())
+			results.append(("{} : scan".format(profile), len(rows) / t_scan, "rows/sec"))
+			utils.close_db(mgt.conn)
+		finally:
+			common.remove_dir(work_dir)
+
+	common.report("Storage profiles ({} designs)".format(number_of_rows), results)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 50000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
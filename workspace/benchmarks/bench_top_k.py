@@ -0,0 +1,99 @@
+"""
+Benchmark: top-K and budget-bracket queries over a synthetic million-build 'designs' table
+
+Compares fetching every row and sorting in Python against modules.reports
+(index-ordered LIMIT queries, bounded heaps and in-database aggregation), including peak Python memory.
+
+:: Usage
+	python -m benchmarks.bench_top_k [number-of-rows] [k]
+"""
+import os
+import sys
+import tracemalloc
+import modules.dblib as dblib
+import modules.reports as reports
+from benchmarks import common
+
+INDEXES = {
+	"idx_designs_total_price" : {"columns" : ["total_price"]},
+	"idx_designs_gpu_manufacturer_total_price" : {"columns" : ["gpu_manufacturer", "total_price"]},
+}
+
+def measure(func, *args, **kwargs):
+	"""
+	Run func once, return (result, seconds, peak Python memory in MiB)
+	"""
+	tracemalloc.start()
+	try:
+		res, seconds = common.timed(func, *args, **kwargs)
+		peak = tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+	return res, seconds, peak / (1024 * 1024)
+
+def run(number_of_rows=1000000, k=10, low=3000.0, high=4500.0):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_designs_table(mgt.conn, aggregates=False)	# Triggers added after the fill below
+		rows = list(common.make_designs(number_of_rows))	# Generated before timing
+		_, t_fill = common.timed(utils.insert_many, mgt.conn, "designs", rows, common.DESIGN_COLUMNS)
+		del rows
+		utils.materialize_sum(mgt.conn, "designs", "total_price", reports.PRICE_COLUMNS)
+		utils.create_indexes(mgt.conn, "designs", INDEXES)
+		vendor = utils.retrieve(mgt.conn, "designs", "gpu_manufacturer", other_options="LIMIT 1", fetch="one", verbose=False)[0]
+
+		# Before: every row into Python, then sort
+		def naive_top_builds():
+			rows = utils.retrieve(mgt.conn, "designs", "ROW_ID, total_price, gpu_manufacturer", verbose=False)
+			rows = [r for r in rows if low <= r[1] <= high and r[2] == vendor]
+			return [(r[0], r[1]) for r in sorted(rows, key=lambda r: (r[1], r[0]))[:k]]
+
+		def naive_top_parts():
+			rows = utils.retrieve(mgt.conn, "designs", "ROW_ID, {}".format(", ".join(reports.PRICE_COLUMNS)), verbose=False)
+			entries = [(r[i + 1], r[0], reports.PRICE_COLUMNS[i][:-len("_price")]) for r in rows for i in range(len(reports.PRICE_COLUMNS)) if r[i + 1] != None]
+			return sorted(entries, key=lambda e: e[0], reverse=True)[:k]
+
+		def naive_brackets(edges):
+			rows = utils.retrieve(mgt.conn, "designs", "total_price", verbose=False)
+			return [(edges[i], edges[i + 1], sum(1 for r in rows if edges[i] <= r[0] < edges[i + 1])) for i in range(len(edges) - 1)]
+
+		edges = [0, 1000, 2000, 3000, 4000, 5000, 6000, 1e9]
+
+		before_builds, t_b1, m_b1 = measure(naive_top_builds)
+		after_builds, t_a1, m_a1 = measure(reports.top_builds, mgt.conn, k, low=low, high=high, gpu_manufacturer=vendor, utils=utils)
+		before_parts, t_b2, m_b2 = measure(naive_top_parts)
+		after_parts, t_a2, m_a2 = measure(reports.top_parts, mgt.conn, k, utils=utils)
+		before_brackets, t_b3, m_b3 = measure(naive_brackets, edges)
+		after_brackets, t_a3, m_a3 = measure(reports.price_brackets, mgt.conn, edges, utils=utils)
+		histogram, t_h, m_h = measure(reports.price_histogram, mgt.conn, 500.0, utils=utils)
+		utils.close_db(mgt.conn)
+
+		common.report("Top-{} / brackets over {} designs (fill {:.1f}s)".format(k, number_of_rows, t_fill), [
+			("top builds, fetch + sort (before)", t_b1 * 1000, "ms"),
+			("top builds, fetch + sort peak memory", m_b1, "MiB"),
+			("top builds, index + LIMIT (after)", t_a1 * 1000, "ms"),
+			("top builds, index + LIMIT peak memory", m_a1, "MiB"),
+			("same result", float([tuple(r) for r in before_builds] == [tuple(r) for r in after_builds]), "bool"),
+			("top parts, fetch + sort (before)", t_b2 * 1000, "ms"),
+			("top parts, fetch + sort peak memory", m_b2, "MiB"),
+			("top parts, bounded heap (after)", t_a2 * 1000, "ms"),
+			("top parts, bounded heap peak memory", m_a2, "MiB"),
+			("same prices", float([e[0] for e in before_parts] == [e[0] for e in after_parts]), "bool"),
+			("brackets, fetch + count (before)", t_b3 * 1000, "ms"),
+			("brackets, index range counts (after)", t_a3 * 1000, "ms"),
+			("same counts", float(before_brackets == after_brackets), "bool"),
+			("histogram, GROUP BY ({} buckets)".format(len(histogram)), t_h * 1000, "ms"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 1000000
+	k = int(argv[1]) if len(argv) > 1 else 10
+	run(number_of_rows, k)
+
+if __name__ == "__main__":
+	main()
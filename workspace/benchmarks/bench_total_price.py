@@ -0,0 +1,58 @@
+"""
+Benchmark: budget filter on the sum of the *_price columns vs the trigger-maintained, indexed total_price
+
+:: Usage
+	python -m benchmarks.bench_total_price [number-of-rows]
+"""
+import os
+import sys
+import modules.dblib as dblib
+from benchmarks import common
+
+PRICE_COLUMNS = [c for c in common.DESIGN_COLUMNS if c.endswith("_price")]
+
+def run(number_of_rows=200000, repeat=20, low=4000.0, high=4100.0):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir)
+		utils = mgt.BaseUtilities()
+		common.create_designs_table(mgt.conn, aggregates=False)	# total_price is what this benchmark adds
+		utils.insert_many(mgt.conn, "designs", common.make_designs(number_of_rows), common.DESIGN_COLUMNS)
+
+		# Before: arithmetic over every row
+		sum_expr = " + ".join(["IFNULL({}, 0)".format(c) for c in PRICE_COLUMNS])
+		before, t_before = common.timed(lambda: [
+			utils.retrieve(mgt.conn, "designs", "ROW_ID", "{} BETWEEN ? AND ?".format(sum_expr), verbose=False, params=(low, high))
+			for i in range(repeat)
+		])
+
+		# After: stored column + index
+		stats = utils.materialize_sum(mgt.conn, "designs", "total_price", PRICE_COLUMNS)
+		utils.create_indexes(mgt.conn, "designs", {"idx_designs_total_price" : {"columns" : ["total_price"]}})
+		after, t_after = common.timed(lambda: [
+			utils.retrieve(mgt.conn, "designs", "ROW_ID", "total_price BETWEEN ? AND ?", verbose=False, params=(low, high))
+			for i in range(repeat)
+		])
+
+		# Trigger cost on writes
+		new_rows = list(common.make_designs(10000, seed=1))	# Generated before timing
+		_, t_insert = common.timed(utils.insert_many, mgt.conn, "designs", new_rows, common.DESIGN_COLUMNS)
+		utils.close_db(mgt.conn)
+
+		common.report("Budget {}-{} over {} designs ({} matches)".format(low, high, number_of_rows, len(before[0] or [])), [
+			("backfill", stats["seconds"], "s"),
+			("sum of *_price (before)", t_before / repeat * 1000, "ms/query"),
+			("indexed total_price (after)", t_after / repeat * 1000, "ms/query"),
+			("same result", float(sorted(before[0] or []) == sorted(after[0] or [])), "bool"),
+			("insert_many with triggers", 10000 / t_insert, "rows/sec"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = int(argv[0]) if len(argv) > 0 else 200000
+	run(number_of_rows)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: compound operations ("register a profile, save its first design, update the profile")
+with a commit per BaseUtilities call vs one SQLiteDBMgmt.transaction() scope per operation
+
+:: Usage
+	python -m benchmarks.bench_transactions [number-of-operations] [profile]
+"""
+import os
+import sys
+import modules.dblib as dblib
+from benchmarks import common
+
+def register_with_design(utils, conn, n, design):
+	"""
+	One compound operation: 3 statements, each asking query_exec() to commit
+	"""
+	username = "user{}".format(n)
+	utils.insert(conn, "profiles", {"username" : username, "password" : "hash{}".format(n), "email" : "{}@example.com".format(username)}, commit=True, completion_msg="", parameterized=True)
+	utils.query_exec(conn, None, "INSERT INTO designs ({}) VALUES ({});".format(", ".join(common.DESIGN_COLUMNS), ", ".join(["?"] * len(common.DESIGN_COLUMNS))), True, completion_msg="", params=design)
+	utils.query_exec(conn, None, "UPDATE profiles SET email=? WHERE username=?;", True, completion_msg="", params=("{}@example.org".format(username), username))
+
+def run(number_of_operations=500, profile="durable"):
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir, profile=profile)
+		utils = mgt.BaseUtilities()
+		common.create_profiles_table(mgt.conn)
+		common.create_designs_table(mgt.conn)
+		designs = list(common.make_designs(number_of_operations * 2))
+
+		def per_call_commit():
+			for n in range(number_of_operations):
+				register_with_design(utils, mgt.conn, n, designs[n])
+		_, t_per_call = common.timed(per_call_commit)
+
+		def scoped():
+			for n in range(number_of_operations, number_of_operations * 2):
+				with mgt.transaction("IMMEDIATE"):
+					register_with_design(utils, mgt.conn, n, designs[n])
+		_, t_scoped = common.timed(scoped)
+
+		# Atomicity: a failing step (duplicate username) undoes the whole operation
+		designs_before = utils.retrieve(mgt.conn, "designs", "COUNT(*)", fetch="one", verbose=False)[0]
+		try:
+			with mgt.transaction("IMMEDIATE"):
+				utils.query_exec(mgt.conn, None, "INSERT INTO designs (cpu_name) VALUES ('orphan');", True, completion_msg="")
+				utils.insert(mgt.conn, "profiles", {"username" : "user0", "password" : "x", "email" : "x"}, commit=True, completion_msg="", parameterized=True)
+		except Exception:
+			pass
+		designs_after = utils.retrieve(mgt.conn, "designs", "COUNT(*)", fetch="one", verbose=False)[0]
+		utils.close_db(mgt.conn)
+
+		common.report("{} compound operations, 3 statements each (profile: {})".format(number_of_operations, profile), [
+			("commit per call", number_of_operations / t_per_call, "ops/s"),
+			("one transaction() per operation", number_of_operations / t_scoped, "ops/s"),
+			("speed-up", t_per_call / t_scoped, "x"),
+			("designs left by a failed operation", designs_after - designs_before, "rows"),
+		])
+	finally:
+		common.remove_dir(work_dir)
+
+def main():
+	argv = sys.argv[1:]
+	number_of_operations = int(argv[0]) if len(argv) > 0 else 500
+	profile = argv[1] if len(argv) > 1 else "durable"
+	run(number_of_operations, profile)
+
+if __name__ == "__main__":
+	main()
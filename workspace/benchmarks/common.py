@@ -0,0 +1,150 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import modules.dblib as dblib
+import modules.schema as schema
+
+""" General Functions """
+def temp_dir(prefix="pcbuilddb-bench-"):
+	"""
+	Create a scratch directory for a benchmark database
+	- Benchmarks never touch res/database/PCPartsList.db directly
+	"""
+	return tempfile.mkdtemp(prefix=prefix)
+
+def remove_dir(path):
+	"""
+	Remove a scratch directory created by temp_dir()
+	"""
+	shutil.rmtree(path, ignore_errors=True)
+
+def timed(func, *args, **kwargs):
+	"""
+	Run a function and return (result, elapsed seconds)
+	"""
+	start = time.perf_counter()
+	res = func(*args, **kwargs)
+	return res, time.perf_counter() - start
+
+def create_profiles_table(conn):
+	"""
+	Create the 'profiles' table from schema.table_properties
+	"""
+	utils = dblib.SQLiteDBMgmt.BaseUtilities()
+	utils.create_table(conn, "profiles", table_definition("profiles")["columns"], True, None, True, False, completion_msg="")
+	if utils.last_error != None:
+		raise RuntimeError("Creating profiles failed: {}".format(utils.last_error))
+
+def fill_profiles(conn, number_of_rows, seed=0):
+	"""
+	Fill the 'profiles' table with [number_of_rows] synthetic users
+	- Usernames are 'user<n>' so that lookups can be generated without storing them
+
+	:: Returns
+		Value: List of usernames inserted
+		Type: List
+	"""
+	rng = random.Random(seed)
+	usernames = ["user{}".format(i) for i in range(number_of_rows)]
+	conn.executemany(
+		"INSERT INTO profiles (username, password, email) VALUES (?, ?, ?)",
+		(
+			(u, "{:064x}".format(rng.getrandbits(256)), "{}@example.com".format(u))
+			for u in usernames
+		)
+	)
+	conn.commit()
+	return usernames
+
+DESIGN_PARTS = ["case", "motherboard", "cpu", "gpu", "psu", "cooling_device", "io_devices", "memory_device", "storage_device", "peripheral"]
+
+def table_definition(table_name):
+	"""
+	Get the definition of a table in modules/schema.py, so the benchmarks run against the tables the program creates
+	"""
+	for curr_table in schema.table_properties:
+		if curr_table["name"] == table_name:
+			return curr_table
+	raise KeyError(table_name)
+
+# Insertable columns of 'designs' (all but ROW_ID and the trigger-maintained total_price), in table order
+DESIGN_COLUMNS = [c for c in table_definition("designs")["columns"].keys() if (c != "ROW_ID") and (c not in table_definition("designs").get("aggregates", {}))]
+
+def create_designs_table(conn, aggregates=True):
+	"""
+	Create the 'designs' table from schema.table_properties (no indexes, no full-text index)
+
+	:: Params
+		aggregates
+			Description: Also create the triggers that maintain total_price (schema migration 2), as in the program
+				- False leaves total_price NULL, for benchmarks that measure adding it
+			Type: Boolean
+			Default: True
+	"""
+	utils = dblib.SQLiteDBMgmt.BaseUtilities()
+	definition = table_definition("designs")
+	utils.create_table(conn, "designs", definition["columns"], True, None, False, False, completion_msg="")
+	if utils.last_error != None:
+		raise RuntimeError("Creating designs failed: {}".format(utils.last_error))
+	if aggregates:
+		for target_column, source_columns in definition.get("aggregates", {}).items():
+			utils.materialize_sum(conn, "designs", target_column, source_columns, commit=False)
+	conn.commit()
+
+def make_designs(number_of_rows, seed=0, parts_per_category=200, number_of_vendors=50):
+	"""
+	Generate [number_of_rows] synthetic design rows (tuples in DESIGN_COLUMNS order)
+		- Every category draws from a fixed catalog of [parts_per_category] parts, each with one vendor,
+		  a list price and a size/power attribute, so parts repeat across designs as in real data
+		- Prices vary +/-10% around the list price
+		- Generating rows costs about as much as inserting them: build a list() before timing an insert
+	"""
+	rng = random.Random(seed)
+	catalog = {}
+	for part in DESIGN_PARTS + ["operating_system"]:
+		catalog[part] = [
+			{
+				"name" : "{} Model {:04d} {} Edition".format(part.replace("_", " ").title(), i, rng.choice(["Pro", "Elite", "Gaming", "Plus", "Ultra"])),
+				"manufacturer" : "Vendor {} Technology Co., Ltd.".format(rng.randrange(number_of_vendors)),
+				"price" : round(rng.uniform(10, 800), 2),
+				"attribute" : "{}".format(rng.choice([8, 16, 32, 64, 500, 750, 1000])),
+			}
+			for i in range(parts_per_category)
+		]
+
+	# (part, field) of every column, looked up once instead of per row
+	layout = []
+	for col in DESIGN_COLUMNS:
+		part = [p for p in catalog.keys() if col.startswith(p + "_")][0]
+		layout.append((col, part, col[len(part) + 1:]))
+
+	for i in range(number_of_rows):
+		chosen = {}
+		row = []
+		for col, part, field in layout:
+			if col == "peripheral_category":
+				row.append(rng.choice(["Keyboard", "Mouse", "Monitor", "Headset"]))
+				continue
+			if part not in chosen:
+				chosen[part] = rng.choice(catalog[part])
+			if field == "price":
+				row.append(round(chosen[part]["price"] * rng.uniform(0.9, 1.1), 2))
+			elif field in ("manufacturer", "name"):
+				row.append(chosen[part][field])
+			else:
+				row.append(chosen[part]["attribute"])
+		yield tuple(row)
+
+def report(title, results):
+	"""
+	Print a list of (label, value, unit) results
+	"""
+	print("=== {} ===".format(title))
+	for label, value, unit in results:
+		print("	{:<48} : {:>12.3f} {}".format(label, value, unit))
@@ -0,0 +1,264 @@
+"""
+Synthetic PC-build data for the benchmark suite
+
+- profiles : unique usernames and e-mails, password fields shaped like real PBKDF2 hashes
+- designs  : one part per category drawn from a catalog of real-world product families and vendors,
+             with a budget tier per build (entry, mid-range, high-end, enthusiast) so that the prices of the parts
+             of a build are correlated and total_price has a realistic, right-skewed distribution
+- Everything is a generator driven by one seed: the same (scale, seed) always produces the same rows,
+  and 10M rows never have to be held in memory
+
+:: Usage
+	from benchmarks import datagen
+	utils.insert_many(conn, "profiles", datagen.profiles(100000), datagen.PROFILE_COLUMNS)
+	utils.insert_many(conn, "designs", datagen.designs(100000), datagen.DESIGN_COLUMNS)
+"""
+import os
+import sys
+import base64
+import random
+import modules.schema as schema
+
+""" Constants """
+DEFAULT_SEED = 20240101
+
+# Named scales accepted by parse_scale()
+SCALES = {
+	"10k" : 10000,
+	"100k" : 100000,
+	"1m" : 1000000,
+	"10m" : 10000000,
+}
+
+def table_columns(table_name):
+	"""
+	Insertable columns of a table in modules/schema.py: everything but ROW_ID and the trigger-maintained aggregates
+	"""
+	for curr_table in schema.table_properties:
+		if curr_table["name"] == table_name:
+			aggregates = curr_table.get("aggregates", {}).keys()
+			return [c for c in curr_table["columns"].keys() if (c != "ROW_ID") and (c not in aggregates)]
+	raise KeyError(table_name)
+
+PROFILE_COLUMNS = table_columns("profiles")
+DESIGN_COLUMNS = table_columns("designs")
+
+# Budget tiers: (name, weight, position in each category's price range from 0.0 = cheapest to 1.0 = dearest)
+TIERS = [
+	("entry", 35, 0.15),
+	("mid-range", 40, 0.40),
+	("high-end", 20, 0.70),
+	("enthusiast", 5, 0.95),
+]
+
+# Per category: ([(vendors, product name template, model numbers, suffixes), ...], (lowest price, highest price), attribute values)
+# {n} is replaced by a model number and {s} by a suffix; every product is sold by up to two of its vendors
+CATALOG = {
+	"case" : (
+		[
+			(["Fractal Design"], "Meshify {n}", ["2", "C", "S2"], [""]),
+			(["Lian Li"], "O11 Dynamic {s}", [""], ["Mini", "EVO", "XL"]),
+			(["NZXT"], "H{n} Flow", ["5", "7", "9"], [""]),
+			(["Corsair"], "{n}D Airflow", ["4000", "5000"], [""]),
+			(["Phanteks", "be quiet!"], "{s} 500", [""], ["Eclipse", "Pure Base"]),
+		],
+		(45.0, 250.0), None,
+	),
+	"motherboard" : (
+		[
+			(["ASUS", "MSI", "Gigabyte", "ASRock"], "B{n}M {s}", ["550", "650", "760"], ["Pro", "Gaming", "WiFi"]),
+			(["ASUS", "MSI", "Gigabyte"], "X{n}E {s}", ["570", "670", "870"], ["Hero", "Tomahawk", "Aorus Master"]),
+			(["ASUS", "MSI", "ASRock"], "Z{n} {s}", ["690", "790"], ["Pro", "Gaming X", "Formula"]),
+		],
+		(80.0, 650.0), None,
+	),
+	"cpu" : (
+		[
+			(["Intel"], "Core i{n}", ["3-14100F", "5-14400", "5-14600K", "7-14700K", "9-14900K"], [""]),
+			(["AMD"], "Ryzen {n}", ["5 7600", "5 7600X", "7 7700X", "7 7800X3D", "9 7950X"], [""]),
+		],
+		(90.0, 700.0), None,
+	),
+	"gpu" : (
+		[
+			(["ASUS", "MSI", "Gigabyte", "Zotac"], "GeForce RTX {n}{s}", ["3060", "4060", "4070", "4080", "4090"], ["", " Ti", " Super"]),
+			(["Sapphire", "PowerColor", "XFX"], "Radeon RX {n}{s}", ["6600", "7600", "7800", "7900"], ["", " XT"]),
+			(["Intel", "ASRock"], "Arc A{n}", ["580", "750", "770"], [""]),
+		],
+		(180.0, 2000.0), None,
+	),
+	"psu" : (
+		[
+			(["Corsair"], "RM{n}x", ["650", "750", "850", "1000"], [""]),
+			(["Seasonic"], "Focus GX-{n}", ["650", "750", "850"], [""]),
+			(["be quiet!"], "Pure Power 12 M {n}W", ["650", "850", "1000"], [""]),
+			(["EVGA", "Thermaltake"], "{s} Gold", [""], ["SuperNOVA G6", "Toughpower GF3"]),
+		],
+		(55.0, 300.0), ["550W", "650W", "750W", "850W", "1000W", "1200W"],
+	),
+	"cooling_device" : (
+		[
+			(["Noctua"], "NH-{n}", ["U12S", "D15", "L9i"], [""]),
+			(["be quiet!"], "Dark Rock {s}", [""], ["4", "Pro 5", "Elite"]),
+			(["Arctic"], "Liquid Freezer III {n}", ["240", "280", "360"], [""]),
+			(["NZXT", "Corsair", "Deepcool"], "{s} AIO {n}", ["240", "360"], ["Kraken", "iCUE H150i", "LT720"]),
+		],
+		(25.0, 250.0), None,
+	),
+	"io_devices" : (
+		[
+			(["TP-Link"], "Archer TX{n}E", ["20", "50", "55"], [""]),
+			(["ASUS"], "PCE-AX{n}", ["3000", "58BT"], [""]),
+			(["Creative"], "Sound Blaster {s}", [""], ["Z", "AE-5", "Audigy"]),
+		],
+		(20.0, 180.0), None,
+	),
+	"memory_device" : (
+		[
+			(["Corsair"], "Vengeance DDR5-{n}", ["5200", "6000", "6400"], [""]),
+			(["G.Skill"], "Trident Z5 DDR5-{n}", ["6000", "6400", "7200"], [""]),
+			(["Kingston"], "Fury Beast DDR{n}", ["4-3200", "4-3600", "5-6000"], [""]),
+			(["Crucial", "TeamGroup"], "{s} DDR5-{n}", ["4800", "5600"], ["Pro", "T-Create"]),
+		],
+		(40.0, 450.0), ["8GiB", "16GiB", "32GiB", "64GiB", "96GiB", "128GiB"],
+	),
+	"storage_device" : (
+		[
+			(["Samsung"], "{n} {s}", ["970", "980", "990"], ["EVO Plus", "Pro"]),
+			(["Western Digital"], "WD_Black SN{n}", ["770", "850X"], [""]),
+			(["Crucial"], "P{n}", ["3", "5 Plus"], [""]),
+			(["Seagate"], "FireCuda {n}", ["530", "540"], [""]),
+			(["Kingston", "Sabrent"], "{s} NVMe {n}", ["Gen4"], ["KC3000", "Rocket 4"]),
+		],
+		(35.0, 600.0), ["500GiB", "1TiB", "2TiB", "4TiB", "8TiB"],
+	),
+	"peripheral" : (
+		[
+			(["Logitech"], "G{n} {s}", ["305", "502", "915", "Pro X"], ["Lightspeed", "Wireless"]),
+			(["Razer"], "DeathAdder V{n}", ["2", "3"], [""]),
+			(["Keychron"], "Q{n} Pro", ["1", "3", "6"], [""]),
+			(["LG"], "UltraGear {n}GR{s}", ["27", "32", "34"], ["83Q", "95QE"]),
+			(["SteelSeries", "Dell"], "{s} {n}", ["Pro", "Wireless"], ["Arctis Nova", "Alienware AW920H"]),
+		],
+		(25.0, 1200.0), None,
+	),
+}
+PERIPHERAL_CATEGORIES = ["Keyboard", "Mouse", "Monitor", "Headset", "Webcam"]
+OPERATING_SYSTEMS = [("Windows 11 Home", 139.0, 50), ("Windows 11 Pro", 199.0, 15), ("Ubuntu 24.04 LTS", 0.0, 20), ("Fedora Workstation 40", 0.0, 10), ("Arch Linux", 0.0, 5)]
+
+FIRST_NAMES = ["alex", "sam", "jordan", "taylor", "casey", "riley", "morgan", "jamie", "avery", "quinn", "kai", "rowan", "sky", "drew", "emery", "finley"]
+LAST_NAMES = ["tan", "lim", "lee", "ng", "wong", "smith", "garcia", "muller", "rossi", "sato", "kim", "nguyen", "silva", "novak", "berg", "kowalski"]
+EMAIL_DOMAINS = ["example.com", "example.org", "example.net", "mail.example.com"]
+
+""" General Functions """
+def parse_scale(scale):
+	"""
+	Convert a scale to a number of rows
+
+	:: Params
+		scale
+			Description: A named scale, a number with a k/m suffix or a plain number
+			Type: String|Integer
+			Syntax: 10k | 100k | 1m | 10m | 250k | 50000
+
+	:: Returns
+		Value: Number of rows
+		Type: Integer
+	"""
+	if isinstance(scale, int):
+		return scale
+	scale = scale.strip().lower()
+	if scale in SCALES:
+		return SCALES[scale]
+	if scale.endswith("k"):
+		return int(float(scale[:-1]) * 1000)
+	if scale.endswith("m"):
+		return int(float(scale[:-1]) * 1000000)
+	return int(scale)
+
+def username(n):
+	"""
+	Username of the [n]th generated profile (deterministic, so lookups can be generated without storing the names)
+	"""
+	return "{}.{}{}".format(FIRST_NAMES[n % len(FIRST_NAMES)], LAST_NAMES[(n // len(FIRST_NAMES)) % len(LAST_NAMES)], n)
+
+def profiles(number_of_rows, seed=DEFAULT_SEED):
+	"""
+	Generate [number_of_rows] profiles as tuples in PROFILE_COLUMNS order (username, password, email)
+		- The passwords are random bytes in the 'pbkdf2_sha256$<iterations>$<salt>$<key>' format of modules/security.py,
+		  so rows have the size of real ones without paying for the hashing
+	"""
+	rng = random.Random(seed)
+	for n in range(number_of_rows):
+		name = username(n)
+		salt = base64.b64encode(rng.getrandbits(128).to_bytes(16, "big")).decode("ascii")
+		key = base64.b64encode(rng.getrandbits(256).to_bytes(32, "big")).decode("ascii")
+		yield (name, "pbkdf2_sha256$100000${}${}".format(salt, key), "{}@{}".format(name, EMAIL_DOMAINS[rng.randrange(len(EMAIL_DOMAINS))]))
+
+def build_catalog(rng):
+	"""
+	Expand CATALOG into the list of concrete parts of each category, sorted by list price
+		- Prices are spread over the category's range with more cheap parts than expensive ones
+
+	:: Returns
+		Value: {"<category>" : [{"name", "manufacturer", "price", "attribute"}, ...]}
+		Type: Dictionary
+	"""
+	catalog = {}
+	for category, (templates, (low, high), attributes) in CATALOG.items():
+		parts = []
+		for vendors, template, numbers, suffixes in templates:
+			for number in numbers:
+				for suffix in suffixes:
+					name = " ".join(template.format(n=number, s=suffix).split())
+					for vendor in rng.sample(vendors, min(2, len(vendors))):
+						parts.append({
+							"name" : name,
+							"manufacturer" : vendor,
+							"price" : round(low + (high - low) * (rng.random() ** 2), 2),
+							"attribute" : rng.choice(attributes) if attributes != None else None,
+						})
+		parts.sort(key=lambda part: part["price"])
+		catalog[category] = parts
+	return catalog
+
+def designs(number_of_rows, seed=DEFAULT_SEED):
+	"""
+	Generate [number_of_rows] designs as tuples in DESIGN_COLUMNS order
+		- Each build has a budget tier; each of its parts is picked around the tier's position in the category's price list
+		- Street prices vary +/-15% around the list price
+	"""
+	rng = random.Random(seed)
+	catalog = build_catalog(rng)
+	tier_weights = [weight for name, weight, position in TIERS]
+	os_weights = [weight for name, price, weight in OPERATING_SYSTEMS]
+
+	for i in range(number_of_rows):
+		position = rng.choices(TIERS, tier_weights)[0][2]
+		values = {}
+		for category, parts in catalog.items():
+			index = int(min(max(rng.gauss(position, 0.12), 0.0), 0.999) * len(parts))
+			part = parts[index]
+			values[category + "_name"] = part["name"]
+			values[category + "_manufacturer"] = part["manufacturer"]
+			values[category + "_price"] = round(part["price"] * rng.uniform(0.85, 1.15), 2)
+			if category == "psu":
+				values["psu_power_output"] = part["attribute"]
+			elif category in ("memory_device", "storage_device"):
+				values[category + "_size"] = part["attribute"]
+		values["peripheral_category"] = PERIPHERAL_CATEGORIES[rng.randrange(len(PERIPHERAL_CATEGORIES))]
+		os_name, os_price, os_weight = rng.choices(OPERATING_SYSTEMS, os_weights)[0]
+		values["operating_system_name"] = os_name
+		values["operating_system_price"] = os_price
+		yield tuple([values.get(c) for c in DESIGN_COLUMNS])
+
+def main():
+	argv = sys.argv[1:]
+	number_of_rows = parse_scale(argv[0]) if len(argv) > 0 else 5
+	for row in designs(number_of_rows):
+		print(dict(zip(DESIGN_COLUMNS, row)))
+	for row in profiles(number_of_rows):
+		print(row)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,223 @@
+"""
+Benchmark suite: the main operations of the program at a given scale, through the real SQLiteDBMgmt/BaseUtilities APIs,
+with the results written as JSON so that runs can be compared
+
+:: Phases
+	setup             : schema.migrate() of a new file up to the indexes (tables, total_price triggers, indexes)
+	bulk_insert       : insert_many() of [scale] profiles and [scale] designs (datagen.py, fixed seed), generation not timed
+	search_index      : schema.migrate() to the FTS5 index over the loaded designs (skipped without FTS5)
+	single_insert     : insert(..., commit=True) of one design at a time
+	login_lookup      : retrieve() of one profile by username (as Workspace.Security.login)
+	full_scan         : iter_retrieve() of every design
+	filtered_retrieve : retrieve() of the cheapest builds of a CPU vendor in a budget band (as the price report)
+	search            : search() of part names (skipped without FTS5)
+	export            : export_csv() of the designs table
+
+:: Usage
+	python -m benchmarks.suite [scale] [output-file] [baseline-file] [tolerance]
+		scale         : 10k | 100k | 1m | 10m | <n>k | <n>m | <n> (default 10k)
+		output-file   : Where to write the JSON results (default: benchmark-<scale>.json in the current directory)
+		baseline-file : Results of an earlier run to compare with; the exit status is 1 if a phase regressed
+		tolerance     : Slow-down allowed before a phase counts as a regression (default 0.2 = 20%)
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import sqlite3
+import itertools
+import modules.dblib as dblib
+import modules.schema as schema
+from benchmarks import common
+from benchmarks import datagen
+
+SEARCHES = ["RTX 4070", "Noctua", "Ryzen 7800X3D", "Trident Z5"]
+BULK_CHUNK_SIZE = 100000	# Rows generated, then inserted (one transaction), at a time
+
+def phase(results, name, func, operations, unit):
+	"""
+	Time func() as one phase and store {"seconds", "operations", "rate", "unit"} in [results]
+	"""
+	res, seconds = common.timed(func)
+	record(results, name, seconds, operations, unit)
+	return res
+
+def record(results, name, seconds, operations, unit):
+	"""
+	Store an already timed phase in [results]
+	"""
+	results[name] = {
+		"seconds" : seconds,
+		"operations" : operations,
+		"rate" : (operations / seconds) if seconds > 0 else 0.0,
+		"unit" : unit,
+	}
+	print("\t{:<18} : {:>12.3f} {} ({:.3f}s)".format(name, results[name]["rate"], unit, seconds))
+
+def run(scale="10k", seed=datagen.DEFAULT_SEED, profile=None, output_file=None):
+	"""
+	Run every phase on a new database in a scratch directory
+
+	:: Params
+		scale
+			Description: Number of profiles and of designs to load
+			Type: String|Integer
+			Syntax: See datagen.parse_scale()
+			Default: 10k
+
+		seed
+			Description: Seed of the data generator
+			Type: Integer
+			Default: datagen.DEFAULT_SEED
+
+		profile
+			Description: The storage-performance profile of the connection (see dblib.STORAGE_PROFILES)
+			Type: String
+			Default: None
+
+		output_file
+			Description: Where to write the JSON results
+			Type: String
+			Default: None (not written)
+
+	:: Returns
+		Value: {"meta" : {...}, "phases" : {"<phase>" : {"seconds", "operations", "rate", "unit"}, ...}}
+		Type: Dictionary
+	"""
+	number_of_rows = datagen.parse_scale(scale)
+	number_of_calls = min(max(number_of_rows // 100, 100), 2000)		# Statements that commit (one journal sync each)
+	number_of_lookups = min(max(number_of_rows // 10, 1000), 50000)	# Point reads
+	rng = random.Random(seed)
+	results = {}
+
+	work_dir = common.temp_dir()
+	try:
+		mgt = dblib.SQLiteDBMgmt("bench.db", work_dir, profile=profile)
+		utils = mgt.BaseUtilities()
+		conn = mgt.conn
+		fts = utils.fts_available(conn)
+		print("=== Benchmark suite: {} rows, seed {} (profile: {}) ===".format(number_of_rows, seed, profile))
+
+		phase(results, "setup", lambda: schema.migrate(conn, utils, target_version=3), 1, "runs/s")
+
+		# Only insert_many() is timed: the generators are slower than the inserts, so each chunk is generated first
+		seconds = 0.0
+		for table_name, rows, columns in [("profiles", datagen.profiles(number_of_rows, seed), datagen.PROFILE_COLUMNS), ("designs", datagen.designs(number_of_rows, seed), datagen.DESIGN_COLUMNS)]:
+			while True:
+				chunk = list(itertools.islice(rows, BULK_CHUNK_SIZE))
+				if len(chunk) == 0:
+					break
+				seconds += common.timed(utils.insert_many, conn, table_name, chunk, columns, 5000)[1]
+		record(results, "bulk_insert", seconds, number_of_rows * 2, "rows/s")
+
+		if fts:
+			phase(results, "search_index", lambda: schema.migrate(conn, utils), number_of_rows, "rows/s")
+
+		new_designs = list(datagen.designs(number_of_calls, seed + 1))
+		def single_insert():
+			for row in new_designs:
+				utils.insert(conn, "designs", dict(zip(datagen.DESIGN_COLUMNS, row)), commit=True, get_result=False, completion_msg="", parameterized=True)
+		phase(results, "single_insert", single_insert, number_of_calls, "rows/s")
+
+		usernames = [datagen.username(rng.randrange(number_of_rows)) for i in range(number_of_lookups)]
+		def login_lookup():
+			for username in usernames:
+				utils.retrieve(conn, "profiles", "username,password", "username=?", fetch="one", completion_msg="", verbose=False, params=(username,))
+		phase(results, "login_lookup", login_lookup, number_of_lookups, "lookups/s")
+
+		def full_scan():
+			count = 0
+			for row in utils.iter_retrieve(conn, "designs", "ROW_ID, cpu_name, gpu_name, total_price", batch_size=5000):
+				count += 1
+			return count
+		phase(results, "full_scan", full_scan, number_of_rows + number_of_calls, "rows/s")
+
+		bands = [(rng.choice(["Intel", "AMD"]), rng.choice([800, 1200, 2000]), rng.choice([400, 800])) for i in range(1000)]
+		def filtered_retrieve():
+			for cpu_manufacturer, low, width in bands:
+				utils.retrieve(conn, "designs", "ROW_ID, cpu_name, gpu_name, total_price", "cpu_manufacturer=? AND total_price BETWEEN ? AND ?", "ORDER BY total_price LIMIT 20", verbose=False, params=(cpu_manufacturer, low, low + width))
+		phase(results, "filtered_retrieve", filtered_retrieve, len(bands), "queries/s")
+
+		if fts:
+			phase(results, "search", lambda: [utils.search(conn, "designs", text, col="ROW_ID, total_price", limit=20) for i in range(25) for text in SEARCHES], 25 * len(SEARCHES), "queries/s")
+
+		phase(results, "export", lambda: utils.export_csv(conn, "designs", os.path.join(work_dir, "designs.csv")), number_of_rows + number_of_calls, "rows/s")
+
+		utils.close_db(conn)
+		report = {
+			"meta" : {
+				"scale" : number_of_rows,
+				"seed" : seed,
+				"profile" : profile,
+				"fts5" : fts,
+				"database_bytes" : os.path.getsize(os.path.join(work_dir, "bench.db")),
+				"python" : platform.python_version(),
+				"sqlite" : sqlite3.sqlite_version,
+				"platform" : platform.platform(),
+				"time" : time.strftime("%Y-%m-%d %H:%M:%S"),
+			},
+			"phases" : results,
+		}
+	finally:
+		common.remove_dir(work_dir)
+
+	if output_file != None:
+		with open(output_file, "w") as result_file:
+			json.dump(report, result_file, indent=4)
+		print("Results written to {}".format(output_file))
+	return report
+
+def compare(report, baseline, tolerance=0.2):
+	"""
+	Compare the phases of two runs
+
+	:: Params
+		report
+			Description: The result of run()
+			Type: Dictionary
+
+		baseline
+			Description: The result of an earlier run() (i.e. loaded from its JSON file)
+			Type: Dictionary
+
+		tolerance
+			Description: Relative drop of a phase's rate allowed before it counts as a regression
+			Type: Float
+			Default: 0.2
+
+	:: Returns
+		Value: Names of the regressed phases
+		Type: List
+	"""
+	regressions = []
+	if report["meta"]["scale"] != baseline["meta"]["scale"]:
+		print("Warning: comparing scale {} with a baseline at scale {}".format(report["meta"]["scale"], baseline["meta"]["scale"]))
+	print("=== Compared with the baseline of {} ===".format(baseline["meta"]["time"]))
+	for name, current in report["phases"].items():
+		previous = baseline["phases"].get(name)
+		if (previous == None) or (previous["rate"] == 0):
+			continue
+		change = current["rate"] / previous["rate"] - 1
+		regressed = change < -tolerance
+		if regressed:
+			regressions.append(name)
+		print("\t{:<18} : {:>+8.1f}%{}".format(name, change * 100, "  REGRESSION" if regressed else ""))
+	return regressions
+
+def main():
+	argv = sys.argv[1:]
+	scale = argv[0] if len(argv) > 0 else "10k"
+	output_file = argv[1] if len(argv) > 1 else "benchmark-{}.json".format(scale)
+	baseline_file = argv[2] if len(argv) > 2 else None
+	tolerance = float(argv[3]) if len(argv) > 3 else 0.2
+
+	report = run(scale, output_file=output_file)
+	if baseline_file != None:
+		with open(baseline_file) as baseline:
+			if len(compare(report, json.load(baseline), tolerance)) > 0:
+				sys.exit(1)
+
+if __name__ == "__main__":
+	main()
@@ -49,7 +49,7 @@ PC Parts Picker Profile Database Management System (DBMS)
 
 	Table: designs
 	Columns:
-		Total columns: 37
+		Total columns: 38
 		==================================================================================================================
 		name, 							type, 		key, 			null, 		autoincrement, 	default-value,	remarks
 		==================================================================================================================
@@ -90,6 +90,7 @@ PC Parts Picker Profile Database Management System (DBMS)
 		peripheral_price,				FLOAT,						NULL,						0.00,
 		operating_system_name,			TEXT,						NULL,						"",				multiline
 		operating_system_price,			FLOAT,						NULL,						0.00,			IF Linux => 0.00
+		total_price,					FLOAT,						NULL,						NIL,			Sum of *_price; maintained by triggers
 
 :: Logic
 
@@ -102,6 +103,9 @@ import sqlite3 as db
 import csv						# To export to csv
 import modules.dblib as dblib
 import modules.security as sec
+import modules.reports as reports
+import modules.schema as schema
+import modules.profiler as profiler
 from pathlib import Path
 
 # GUI Frameworks
@@ -148,59 +152,7 @@ class Workspace(object):
 		Initialize
 		"""
 		self.security = self.Security()
-		self.table_properties = [
-			{
-				"name" : "profiles",
-				"columns" : {
-					"ROW_ID" 	: {"type" : "INTEGER",		"key" : "PRIMARY KEY",	"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
-					"username" 	: {"type" : "VARCHAR(255)",	"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
-					"password" 	: {"type" : "VARCHAR(255)",	"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
-					"email" 	: {"type" : "VARCHAR(255)",	"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""}
-				}
-			},
-			{
-				"name" : "designs",
-				"columns" : {
-					"ROW_ID" 						: {"type" : "INTEGER",	"key" : "PRIMARY KEY",	"null" : False,	"default" : None,		"unique" : True,	"others" : ""},
-					"case_name" 					: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"case_manufacturer" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"case_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.0,		"unique" : False,	"others" : ""},
-					"motherboard_name" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"motherboard_manufacturer" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"motherboard_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-					"cpu_name" 						: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"cpu_manufacturer" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"cpu_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-					"gpu_name" 						: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"gpu_manufacturer" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"gpu_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-					"psu_name" 						: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"psu_manufacturer" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"psu_power_output"				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : "\"0W\"",	"unique" : False,	"others" : ""},
-					"psu_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-					"cooling_device_name" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"cooling_device_manufacturer" 	: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"cooling_device_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-					"io_devices_name" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"io_devices_manufacturer" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"io_devices_price" 				: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-					"memory_device_name" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"memory_device_manufacturer" 	: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"memory_device_size"			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"memory_device_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-					"storage_device_name" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"storage_device_manufacturer" 	: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"storage_device_size"			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"storage_device_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-					"peripheral_category"			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"peripheral_name"				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"peripheral_manufacturer" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"peripheral_price" 				: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-					"operating_system_name" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
-					"operating_system_price" 		: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
-				}
-			}
-		]
+		self.table_properties = schema.table_properties	# Shared with modules/setup.py; see modules/schema.py
 		self.options = {
 			"Quit" : {
 				"syntax" : ["q", "quit", "(q)uit"],
@@ -216,54 +168,209 @@ class Workspace(object):
 				"syntax" : ["r", "register", "(r)egister"],
 				"function" : self.security.registration,
 				"parameters" : None
+			},
+			"Export" : {
+				"syntax" : ["e", "export", "(e)xport"],
+				"function" : self.export_csv,
+				"parameters" : None
+			},
+			"Import" : {
+				"syntax" : ["i", "import", "(i)mport"],
+				"function" : self.import_file,
+				"parameters" : None
+			},
+			"Backup" : {
+				"syntax" : ["b", "backup", "(b)ackup"],
+				"function" : self.backup,
+				"parameters" : None
+			},
+			"Index Advisor" : {
+				"syntax" : ["a", "advise", "(a)dvise"],
+				"function" : self.advise_indexes,
+				"parameters" : None
+			},
+			"Price Report" : {
+				"syntax" : ["p", "prices", "(p)rices"],
+				"function" : self.price_report,
+				"parameters" : None
+			},
+			"Search" : {
+				"syntax" : ["s", "search", "(s)earch"],
+				"function" : self.search,
+				"parameters" : None
+			},
+			"Rebuild Search Index" : {
+				"syntax" : ["ri", "reindex", "(r)e(i)ndex"],
+				"function" : self.rebuild_search_index,
+				"parameters" : None
+			},
+			"Cache Statistics" : {
+				"syntax" : ["c", "cache", "(c)ache"],
+				"function" : self.cache_stats,
+				"parameters" : None
+			},
+			"Query Statistics" : {
+				"syntax" : ["qs", "stats", "(q)uery (s)tats"],
+				"function" : self.query_stats,
+				"parameters" : None
 			}
 		}
 
 	def setup(self):
-		def db():
-			"""
-			Setup Database File
-			"""
-			number_of_tables = len(self.table_properties)
-			for table_ID in range(number_of_tables):
-				"""
-				Dynamically create tables based on definition
-				"""
-				curr_table = self.table_properties[table_ID]
-				table_name = curr_table["name"]
-				table_cols = curr_table["columns"]
-				# print("Creating table [{}] with\n\tColumn Definitions [{}]".format(table_name, table_cols))
-				result = csdb_utils.create_table(csdb_mgt.conn, table_name, table_cols, True, None, True, True)
-				# print("Result: {}".format(result))
-		db()
+		"""
+		Setup Database File
+			- Applies the schema migrations the file is missing (modules/schema.py); only reads PRAGMA user_version when it is up to date
+		"""
+		schema.migrate(csdb_mgt.conn, csdb_utils)
 	
+	def export_csv(self):
+		"""
+		Export every table to '<directory>/<table>.csv'
+		"""
+		export_dir = input("Export directory: ")
+		for curr_table in self.table_properties:
+			table_name = curr_table["name"]
+			file_path = os.path.join(export_dir, "{}.csv".format(table_name))
+			rows_written = csdb_utils.export_csv(
+				csdb_mgt.conn, table_name, file_path,
+				other_options="ORDER BY ROW_ID",
+				progress_callback=lambda n: print("\t{} : {} rows".format(table_name, n), end="\r")
+			)
+			print("Exported {} rows to {}".format(rows_written, file_path))
+
+	def import_file(self):
+		"""
+		Import/Recover a table from a CSV/JSON/JSON Lines file
+		"""
+		table_names = [t["name"] for t in self.table_properties]
+		table_name = input("Table ({}): ".format("|".join(table_names)))
+		if table_name not in table_names:
+			print("Unknown table: {}".format(table_name))
+			return
+		file_path = input("File path: ")
+		dry_run = input("Dry run? [y/N]: ").lower() in ("y", "yes")
+
+		stats = csdb_utils.import_file(
+			csdb_mgt.conn, table_name, file_path,
+			self.table_properties[table_names.index(table_name)]["columns"],
+			dry_run=dry_run, verbose=True
+		)
+		for line, err_msg in stats["errors"]:
+			print("\tRecord {} : {}".format(line, err_msg))
+
+	def backup(self):
+		"""
+		Online backup of the database file
+		"""
+		target = input("Backup file (leave empty for res/database/backups): ")
+		if target == "":
+			target = None
+		csdb_mgt.backup(target, verbose=True)
+
+	def advise_indexes(self):
+		"""
+		Print the index advisor report for the queries executed so far
+		"""
+		print(csdb_utils.advisor.format_report(csdb_utils.advisor.analyze(csdb_mgt.conn)))
+
+	def price_report(self):
+		"""
+		Print the budget brackets and the cheapest builds in a price band
+		"""
+		low = input("Budget from (leave empty for none): ")
+		high = input("Budget to (leave empty for none): ")
+		low = float(low) if low != "" else None
+		high = float(high) if high != "" else None
+
+		print("Builds per budget bracket:")
+		for bracket_low, bracket_high, count in reports.price_brackets(csdb_mgt.conn, [0, 500, 1000, 1500, 2000, 3000, 5000, float("inf")], utils=csdb_utils):
+			print("\t{:>8.2f} - {:<8.2f} : {}".format(bracket_low, bracket_high, count))
+
+		print("Cheapest builds:")
+		for row_id, cpu_name, gpu_name, total_price in reports.top_builds(csdb_mgt.conn, 10, low=low, high=high, col="ROW_ID, cpu_name, gpu_name, total_price", utils=csdb_utils):
+			print("\t[{}] {} / {} : {:.2f}".format(row_id, cpu_name, gpu_name, total_price))
+
+	def search(self):
+		"""
+		Full-text search over the part names and manufacturers of every design
+		"""
+		if not csdb_utils.fts_available(csdb_mgt.conn):
+			print("Full-text search is not available: SQLite was built without FTS5")
+			return
+		text = input("Search (i.e. RTX 4070, Noctua): ")
+		results = csdb_utils.search(csdb_mgt.conn, "designs", text, col="ROW_ID, cpu_name, gpu_name, total_price")
+		for row_id, cpu_name, gpu_name, total_price in results:
+			print("\t[{}] {} / {} : {}".format(row_id, cpu_name, gpu_name, total_price))
+		print("{} result(s)".format(len(results)))
+
+	def rebuild_search_index(self):
+		"""
+		Rebuild the full-text index of every table with a "search" definition
+		"""
+		for curr_table in self.table_properties:
+			if "search" in curr_table:
+				csdb_utils.rebuild_fts_index(csdb_mgt.conn, "{}_fts".format(curr_table["name"]), verbose=True)
+
+	def cache_stats(self):
+		"""
+		Print the query-result cache counters
+		"""
+		if csdb_utils.result_cache == None:
+			print("Result cache is disabled")
+			return
+		for counter, value in csdb_utils.result_cache.stats().items():
+			print("\t{:<14} : {}".format(counter, value))
+
+	def query_stats(self):
+		"""
+		Print the per-statement timings and slow queries, and optionally dump them to a JSON file
+			- Enabled by the PCBUILDDB_INSTRUMENT environment variable (slow-query threshold in milliseconds)
+		"""
+		if csdb_utils.instrumentation == None:
+			print("Query instrumentation is disabled (set PCBUILDDB_INSTRUMENT=<slow-query-ms> to enable)")
+			return
+		print(csdb_utils.instrumentation.format_report())
+		file_path = input("Dump to JSON file (leave empty to skip): ")
+		if file_path != "":
+			print("Written to {}".format(csdb_utils.instrumentation.dump(file_path)))
+
 	def main_menu(self):
 		"""
 		Index Page: Main Menu
 		"""
+		if ui.headless:
+			self.cli_menu()
+		else:
+			ui.mainloop()
+
+	def cli_menu(self):
+		"""
+		Command line Main Menu (headless backend)
+		"""
 		line = ""
-		# while line != "q":
-		# 	for k,v in self.options.items():
-		# 		print("{} : {}".format(" | ".join(v["syntax"]), k))
-		# 	line = input("Please enter an option: ")
-
-		# 	for opt_Keywords, opt_Params in self.options.items():
-		# 		syntaxes = opt_Params["syntax"]
-		# 		functions = opt_Params["function"]
-		# 		parameters = opt_Params["parameters"]
-		# 		if line in syntaxes:
-		# 			# Execute function
-		# 			if parameters == None:
-		# 				if functions != None:
-		# 					functions()
-		# 			else:
-		# 				functions(parameters)
-
-		# 	if self.security.token:
-		# 		# Success
-		# 		self.home_page()
-		root = tk.Tk()
-		root.mainloop()
+		while line not in self.options["Quit"]["syntax"]:
+			for k,v in self.options.items():
+				print("{} : {}".format(" | ".join(v["syntax"]), k))
+			try:
+				line = input("Please enter an option: ").strip().lower()
+			except EOFError:
+				break
+
+			for opt_Keywords, opt_Params in self.options.items():
+				syntaxes = opt_Params["syntax"]
+				functions = opt_Params["function"]
+				parameters = opt_Params["parameters"]
+				if line in syntaxes:
+					# Execute function
+					if parameters == None:
+						if functions != None:
+							functions()
+					else:
+						functions(parameters)
+
+			if self.security.token:
+				# Success
+				self.home_page()
 		
 
 	def home_page(self):
@@ -306,20 +413,33 @@ class Workspace(object):
 
 			# 1. Get Password Hash, 
 			# 2. Ask user to input password and 
-			# 3. Compare
-			if sec.encrypt_sha256(input("Password: ")) == \
-				csdb_utils.retrieve(
-					csdb_mgt.conn, 
-					ws.table_properties[0]["name"], 
-					"username,password",  
-					"username=\"{}\"".format(self.uname), 
-					fetch="one", 
-					completion_msg=""
-				)[1]:
+			# 3. Compare on the hashing pool (PBKDF2 or legacy SHA-256 hashes; an unknown username is checked against a dummy hash)
+			# Credentials are never kept in (nor served from) the result cache
+			account = csdb_utils.retrieve(
+				csdb_mgt.conn, 
+				ws.table_properties[0]["name"], 
+				"username,password",  
+				"username=?", 
+				fetch="one", 
+				completion_msg="",
+				params=(self.uname,),
+				cache=False
+			)
+			stored_hash = account.password if account != None else None
+			password = input("Password: ")
+			if hashing.verify(password, stored_hash):
 				print("Login Successful")
 				self.token = True
+
+				# Upgrade legacy/weak hashes now that the password is known
+				if sec.needs_rehash(stored_hash, iterations=hashing.iterations):
+					csdb_utils.query_exec(
+						csdb_mgt.conn, None, "UPDATE {} SET password=? WHERE username=?;".format(ws.table_properties[0]["name"]),
+						True, completion_msg="", params=(hashing.hash(password), self.uname)
+					)
 			else:
 				print("Login failed.")
+			password = None
 
 		def registration(self):
 			"""
@@ -341,11 +461,11 @@ class Workspace(object):
 			ret_code = csdb_utils.insert(
 				csdb_mgt.conn, ws.table_properties[0]["name"], 
 				{
-					"username" : "\"{}\"".format(self.uname), 
-					"password" : "\"{}\"".format(sec.encrypt_sha256(input("Password: "))), 
-			 		"email"    : "\"{}\"".format(email)
+					"username" : self.uname, 
+					"password" : hashing.hash(input("Password: ")), 
+			 		"email"    : email
 				}, 
-				commit=True, completion_msg=""
+				commit=True, completion_msg="", parameterized=True
 			)
 			print(ret_code)
 
@@ -356,15 +476,20 @@ def init():
 	- Variables
 	- Classes
 	"""
-	global csdb_mgt, csdb_utils, csdb_queries, tk, gui_TK, gui_Qt, ws, test
+	global csdb_mgt, csdb_utils, csdb_queries, hashing, ui, ws, test
 
 	# External Class Objects
-	csdb_mgt = dblib.SQLiteDBMgmt("PCPartsList.db")
+	csdb_mgt = dblib.SQLiteDBMgmt("PCPartsList.db", row_factory=dblib.SQLiteDBMgmt.RecordFactory(schema.table_properties))	# Rows are named records (row.password)
 	csdb_utils = csdb_mgt.BaseUtilities()
+	csdb_utils.advisor = csdb_mgt.QueryAdvisor()
+	csdb_utils.result_cache = csdb_mgt.ResultCache()
+	if os.environ.get("PCBUILDDB_INSTRUMENT", "") != "":
+		# PCBUILDDB_INSTRUMENT=<slow-query threshold in ms>; slow queries are also appended to PCBUILDDB_SLOW_LOG if set
+		csdb_utils.instrumentation = csdb_mgt.Instrumentation(float(os.environ["PCBUILDDB_INSTRUMENT"]) / 1000.0, slow_log_path=os.environ.get("PCBUILDDB_SLOW_LOG"))
+		csdb_utils.instrumentation.attach(csdb_mgt.conn)
 	csdb_queries = csdb_mgt.Queries()
-	tk = gui.tk
-	gui_TK = gui.TKinterUtils()
-	gui_Qt = gui.Qt5Utils()
+	hashing = sec.HashingService(iterations=sec.configured_iterations())	# Fixed count ($PCBUILDDB_HASH_ITERATIONS): stored hashes below it are upgraded on login
+	ui = gui.get_backend(gui.backend_from_argv(sys.argv[1:]))	# --gui <tk|qt5|headless> | --headless, else $PCBUILDDB_GUI
 
 	# Internal Class Objects
 	ws = Workspace()
@@ -373,8 +498,20 @@ def init():
 def startup():
 	"""
 	Processes to run during boot/startup
+		- With --profile[=<dir>] [--profile-memory] (or $PCBUILDDB_PROFILE), init(), Workspace.setup and
+		  every menu option are profiled as separate phases (see modules/profiler.py)
 	"""
-	init()
+	global prof
+	prof = profiler.get_profiler(sys.argv[1:])
+	if prof == None:
+		init()
+		return
+
+	prof.run("startup", init)
+	ws.setup = prof.wrap("setup", ws.setup)
+	for opt_Keywords, opt_Params in ws.options.items():
+		if opt_Params["function"] != None:
+			opt_Params["function"] = prof.wrap(opt_Keywords, opt_Params["function"])
 
 def main():
 	ws.main()
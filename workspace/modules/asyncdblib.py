@@ -0,0 +1,246 @@
+"""
+asyncio facade for SQLiteDBMgmt/BaseUtilities
+
+All database work runs on one dedicated thread that opens and owns the connection
+(sqlite3 connections are bound to the thread that created them), so coroutines never block the event loop.
+	- Calls are queued in order on that thread; many coroutines can await at the same time
+	- timeout/cancellation: a call still queued is dropped, a running statement is stopped with conn.interrupt()
+	- Large results are streamed in fetchmany() batches as an async iterator
+	- Each call costs a thread round trip: group many small statements into one run() call
+
+:: Usage
+	import asyncio
+	import modules.asyncdblib as asyncdblib
+
+	async def main():
+		async with asyncdblib.AsyncSQLiteDB("PCPartsList.db") as adb:
+			row = await adb.retrieve("profiles", "username,password", "username=?", fetch="one", params=("asura",), timeout=2.0, cache=False)
+			async for row in adb.iter_retrieve("designs", "ROW_ID, total_price", batch_size=500):
+				...
+	asyncio.run(main())
+"""
+import os
+import sys
+import asyncio
+import threading
+import modules.dblib as dblib
+
+class AsyncSQLiteDB():
+	"""
+	asyncio facade over one SQLiteDBMgmt connection, owned by a dedicated worker thread
+	"""
+	def __init__(self, db_name, db_path=None, statement_cache_size=128, profile=None):
+		"""
+		:: Params
+			db_name
+				Description: The file name of your database
+				Type: String
+
+			db_path
+				Description: The directory containing your database
+				Type: String
+				Default: None (SQLiteDBMgmt's default, res/database)
+
+			statement_cache_size
+				Description: Number of compiled statements cached per connection
+				Type: Integer
+				Default: 128
+
+			profile
+				Description: The storage-performance profile to apply on open (see dblib.STORAGE_PROFILES)
+				Type: String|Dictionary
+				Default: None
+		"""
+		self.db_name = db_name
+		self.db_path = db_path
+		self.statement_cache_size = statement_cache_size
+		self.profile = profile
+		self.mgt = None			# SQLiteDBMgmt, created on the worker thread
+		self.utils = None		# BaseUtilities used for every call
+		self.executor = None
+		self.lock = threading.Lock()
+		self.running = None		# Token of the call running on the worker thread
+		self.counters = {"calls" : 0, "cancelled" : 0, "interrupted" : 0}
+
+	async def __aenter__(self):
+		await self.open()
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		await self.close()
+
+	async def open(self):
+		"""
+		Start the worker thread and open the database on it
+		"""
+		if self.executor != None:
+			return
+		# Imported here, like the other executors in this project, to keep module import cheap
+		from concurrent.futures import ThreadPoolExecutor
+		self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asyncdb")
+
+		def connect():
+			if self.db_path == None:
+				mgt = dblib.SQLiteDBMgmt(self.db_name, statement_cache_size=self.statement_cache_size, profile=self.profile)
+			else:
+				mgt = dblib.SQLiteDBMgmt(self.db_name, self.db_path, statement_cache_size=self.statement_cache_size, profile=self.profile)
+			return mgt, mgt.BaseUtilities()
+		self.mgt, self.utils = await asyncio.get_running_loop().run_in_executor(self.executor, connect)
+
+	async def close(self):
+		"""
+		Close the database on the worker thread and stop the thread (queued calls run first)
+		"""
+		if self.executor == None:
+			return
+		try:
+			await asyncio.get_running_loop().run_in_executor(self.executor, self.mgt.__exit__)
+		finally:
+			self.executor.shutdown(wait=True)
+			self.executor = None
+			self.mgt = None
+			self.utils = None
+
+	async def run(self, func, *args, timeout=None, **kwargs):
+		"""
+		Run func(conn, utils, *args, **kwargs) on the worker thread
+
+		:: Params
+			func
+				Description: The function to run; it gets the worker's connection and BaseUtilities first
+				Type: Function
+
+			timeout
+				Description: Seconds to wait; then the call is dropped (queued) or interrupted (running)
+				Type: Float
+				Default: None (no limit)
+
+		:: Returns
+			Value: What [func] returned
+			Type: Any
+
+		:: Remarks
+			- Raises asyncio.TimeoutError on timeout and asyncio.CancelledError if the awaiting task is cancelled
+			- Interrupting makes the running statement fail with sqlite3.OperationalError('interrupted');
+			  the current transaction is rolled back by SQLite if the statement was a write
+		"""
+		if self.executor == None:
+			raise RuntimeError("Database is not open: await open() or use 'async with'")
+
+		token = object()
+
+		def call():
+			with self.lock:
+				self.running = token
+			try:
+				return func(self.mgt.conn, self.utils, *args, **kwargs)
+			finally:
+				with self.lock:
+					self.running = None
+
+		self.counters["calls"] += 1
+		future = asyncio.get_running_loop().run_in_executor(self.executor, call)
+		try:
+			return await asyncio.wait_for(asyncio.shield(future), timeout)
+		except (asyncio.TimeoutError, asyncio.CancelledError):
+			self.cancel_call(future, token)
+			raise
+
+	def cancel_call(self, future, token):
+		"""
+		Drop a queued call, or interrupt it if it is running on the worker thread
+		"""
+		self.counters["cancelled"] += 1
+		future.cancel()
+		with self.lock:
+			if self.running is token:
+				self.mgt.conn.interrupt()
+				self.counters["interrupted"] += 1
+
+	async def query_exec(self, query_stmt, commit=True, get_result=False, fetch="all", params=None, timeout=None):
+		"""
+		BaseUtilities.query_exec on the worker thread
+		"""
+		return await self.run(
+			lambda conn, utils: utils.query_exec(conn, None, query_stmt, commit, get_result, fetch, completion_msg="", params=params),
+			timeout=timeout
+		)
+
+	async def retrieve(self, table_name, col="*", where_condition="", other_options="", fetch="all", params=None, timeout=None, cache=True):
+		"""
+		BaseUtilities.retrieve on the worker thread
+		"""
+		return await self.run(
+			lambda conn, utils: utils.retrieve(conn, table_name, col, where_condition, other_options, fetch=fetch, completion_msg="", verbose=False, params=params, cache=cache),
+			timeout=timeout
+		)
+
+	async def insert(self, table_name, value_definitions, commit=True, timeout=None):
+		"""
+		BaseUtilities.insert (parameterized) on the worker thread
+		"""
+		return await self.run(
+			lambda conn, utils: utils.insert(conn, table_name, value_definitions, commit=commit, completion_msg="", parameterized=True),
+			timeout=timeout
+		)
+
+	async def insert_many(self, table_name, rows, columns=None, batch_size=1000, conflict="", timeout=None):
+		"""
+		BaseUtilities.insert_many on the worker thread
+		"""
+		return await self.run(
+			lambda conn, utils: utils.insert_many(conn, table_name, rows, columns, batch_size, conflict),
+			timeout=timeout
+		)
+
+	async def iter_retrieve(self, table_name, col="*", where_condition="", other_options="", batch_size=1000, params=None, timeout=None):
+		"""
+		Stream the rows of a query as an async iterator; one fetchmany([batch_size]) per round trip to the worker thread
+
+		:: Params
+			timeout
+				Description: Seconds allowed for each batch
+				Type: Float
+				Default: None (no limit)
+
+		:: Remarks
+			- Other calls are served between batches; the cursor is closed on the worker thread when the iteration ends
+		"""
+		def start(conn, utils):
+			query_stmt = utils.select_stmt(table_name, col, where_condition, other_options)
+			if utils.advisor != None:
+				utils.advisor.record(query_stmt, params)
+			cursor = conn.cursor()
+			if params == None:
+				cursor.execute(query_stmt)
+			else:
+				cursor.execute(query_stmt, params)
+			return cursor
+
+		cursor = await self.run(start, timeout=timeout)
+		try:
+			while True:
+				batch = await self.run(lambda conn, utils: cursor.fetchmany(batch_size), timeout=timeout)
+				if len(batch) == 0:
+					break
+				for row in batch:
+					yield row
+		finally:
+			if self.executor != None:
+				await asyncio.shield(asyncio.get_running_loop().run_in_executor(self.executor, cursor.close))
+
+	def stats(self):
+		"""
+		Return the call counters
+
+		:: Returns
+			Value: {"calls", "cancelled", "interrupted"}
+			Type: Dictionary
+		"""
+		return dict(self.counters)
+
+def main():
+	print("Beginning debugging for {}".format(__file__))
+
+if __name__ == "__main__":
+	main()
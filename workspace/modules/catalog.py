@@ -0,0 +1,352 @@
+"""
+Normalized Parts Catalog for the 'designs' table
+
+The 37-column 'designs' table repeats the name/manufacturer/price of every part category in every row.
+The normalized layout stores each distinct part and manufacturer once:
+
+	manufacturers	(ROW_ID, name)
+	parts			(ROW_ID, category, name, manufacturer_id => manufacturers, attribute)
+	builds			(ROW_ID)									One row per design, same ROW_ID as in 'designs'
+	design_parts	(design_id => builds, category, part_id => parts, price)	WITHOUT ROWID, keyed by (design_id, category)
+
+A compatibility view (default: 'designs_compat') joins them back into the exact column layout of 'designs'.
+
+:: Usage
+	Migrate in place (the normalized tables are added next to 'designs')
+		python -m modules.catalog res/database/PCPartsList.db
+
+	Migrate into a new database file
+		python -m modules.catalog res/database/PCPartsList.db res/database/PCPartsList-normalized.db
+"""
+import os
+import sys
+import time
+import modules.dblib as dblib
+
+# Column layout of 'designs' per part category, in table order
+# - field : name | manufacturer | attribute (category specific detail) | price
+PART_CATEGORIES = [
+	{"category" : "case",				"columns" : [("case_name", "name"), ("case_manufacturer", "manufacturer"), ("case_price", "price")]},
+	{"category" : "motherboard",		"columns" : [("motherboard_name", "name"), ("motherboard_manufacturer", "manufacturer"), ("motherboard_price", "price")]},
+	{"category" : "cpu",				"columns" : [("cpu_name", "name"), ("cpu_manufacturer", "manufacturer"), ("cpu_price", "price")]},
+	{"category" : "gpu",				"columns" : [("gpu_name", "name"), ("gpu_manufacturer", "manufacturer"), ("gpu_price", "price")]},
+	{"category" : "psu",				"columns" : [("psu_name", "name"), ("psu_manufacturer", "manufacturer"), ("psu_power_output", "attribute"), ("psu_price", "price")]},
+	{"category" : "cooling_device",		"columns" : [("cooling_device_name", "name"), ("cooling_device_manufacturer", "manufacturer"), ("cooling_device_price", "price")]},
+	{"category" : "io_devices",			"columns" : [("io_devices_name", "name"), ("io_devices_manufacturer", "manufacturer"), ("io_devices_price", "price")]},
+	{"category" : "memory_device",		"columns" : [("memory_device_name", "name"), ("memory_device_manufacturer", "manufacturer"), ("memory_device_size", "attribute"), ("memory_device_price", "price")]},
+	{"category" : "storage_device",		"columns" : [("storage_device_name", "name"), ("storage_device_manufacturer", "manufacturer"), ("storage_device_size", "attribute"), ("storage_device_price", "price")]},
+	{"category" : "peripheral",			"columns" : [("peripheral_category", "attribute"), ("peripheral_name", "name"), ("peripheral_manufacturer", "manufacturer"), ("peripheral_price", "price")]},
+	{"category" : "operating_system",	"columns" : [("operating_system_name", "name"), ("operating_system_price", "price")]},
+]
+
+# Normalized tables, in the column-definition format of BaseUtilities.create_table()
+table_properties = [
+	{
+		"name" : "manufacturers",
+		"columns" : {
+			"ROW_ID" 	: {"type" : "INTEGER",	"key" : "PRIMARY KEY",	"null" : False,	"default" : None,	"unique" : False,	"others" : ""},
+			"name" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
+		}
+	},
+	{
+		"name" : "parts",
+		"columns" : {
+			"ROW_ID" 			: {"type" : "INTEGER",	"key" : "PRIMARY KEY",	"null" : False,	"default" : None,	"unique" : False,	"others" : ""},
+			"category" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : False,	"default" : None,	"unique" : False,	"others" : ""},
+			"name" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,	"unique" : False,	"others" : ""},
+			"manufacturer_id" 	: {"type" : "INTEGER",	"key" : "NIL",			"null" : True,	"default" : None,	"unique" : False,	"others" : "REFERENCES manufacturers(ROW_ID)"},
+			"attribute" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,	"unique" : False,	"others" : ""},
+		},
+		"indexes" : {
+			# One entry per (category, name, manufacturer, attribute); NULLs compare equal through IFNULL
+			"idx_parts_identity" 		: {"columns" : ["category", "IFNULL(name, '')", "IFNULL(manufacturer_id, 0)", "IFNULL(attribute, '')"],	"unique" : True,	"where" : ""},
+			"idx_parts_name" 			: {"columns" : ["name"],				"unique" : False,	"where" : ""},
+			"idx_parts_manufacturer" 	: {"columns" : ["manufacturer_id"],		"unique" : False,	"where" : ""},
+		}
+	},
+	{
+		"name" : "builds",
+		"columns" : {
+			"ROW_ID" 	: {"type" : "INTEGER",	"key" : "PRIMARY KEY",	"null" : False,	"default" : None,	"unique" : False,	"others" : ""},
+		}
+	},
+]
+
+# Statements for what create_table() cannot express
+# - design_parts has a composite key (design_id, category) and no rowid; category is the position in PART_CATEGORIES
+schema_statements = [
+	"CREATE TABLE IF NOT EXISTS design_parts (design_id INTEGER NOT NULL REFERENCES builds(ROW_ID) ON DELETE CASCADE, category INTEGER NOT NULL, part_id INTEGER REFERENCES parts(ROW_ID), price FLOAT NULL, PRIMARY KEY (design_id, category)) WITHOUT ROWID;",
+	# "Which builds use part X"
+	"CREATE INDEX IF NOT EXISTS idx_design_parts_part ON design_parts (part_id);",
+]
+
+""" General Functions """
+def design_columns():
+	"""
+	Get the columns of 'designs' (without ROW_ID) in table order
+	"""
+	return [col for part in PART_CATEGORIES for col, field in part["columns"]]
+
+def create_schema(conn, utils=None, view_name="designs_compat", total_price=True, verbose=False):
+	"""
+	Create the normalized tables, their indexes and the compatibility view (idempotent)
+
+	:: Params
+		conn
+			Description: The connection to create the schema in
+			Type: sqlite3.connect()
+
+		utils
+			Description: The BaseUtilities object to use
+			Type: dblib.SQLiteDBMgmt.BaseUtilities
+			Default: None (a new one is created)
+
+		view_name
+			Description: The name of the compatibility view
+			Type: String
+			Default: designs_compat
+
+		total_price
+			Description: Add the 'total_price' column to the view (see compat_view_stmt)
+			Type: Boolean
+			Default: True
+
+		verbose
+			Description: To set if you want messages to be displayed
+			Type: Boolean
+	"""
+	if utils == None:
+		utils = dblib.SQLiteDBMgmt.BaseUtilities()
+
+	for curr_table in table_properties:
+		utils.create_table(conn, curr_table["name"], curr_table["columns"], True, None, False, False, verbose=verbose)
+		utils.create_indexes(conn, curr_table["name"], curr_table.get("indexes"), commit=False, verbose=verbose)
+	for stmt in schema_statements:
+		utils.query_exec(conn, None, stmt, False, verbose=verbose)
+	utils.query_exec(conn, None, compat_view_stmt(view_name, total_price), True, verbose=verbose)
+
+def compat_view_stmt(view_name="designs_compat", total_price=True):
+	"""
+	Generate the 'CREATE VIEW' statement of the view that looks like the original 'designs' table
+		- A category without a design_parts entry shows NULL name/manufacturer/attribute and a price of 0.0 (the column default)
+		- With [total_price], the last column is the sum of the part prices, computed like the designs.total_price triggers
+		  (schema.py migration 2), so that the view has the same columns as 'designs'
+	"""
+	select_cols = ["b.ROW_ID AS ROW_ID"]
+	price_terms = []
+	joins = []
+	for category_id, part in enumerate(PART_CATEGORIES):
+		alias = part["category"]
+		joins.append("LEFT JOIN design_parts dp_{0} ON dp_{0}.design_id = b.ROW_ID AND dp_{0}.category = {1}".format(alias, category_id))
+		joins.append("LEFT JOIN parts p_{0} ON p_{0}.ROW_ID = dp_{0}.part_id".format(alias))
+		joins.append("LEFT JOIN manufacturers m_{0} ON m_{0}.ROW_ID = p_{0}.manufacturer_id".format(alias))
+		for col, field in part["columns"]:
+			if field == "name":
+				select_cols.append("p_{}.name AS {}".format(alias, col))
+			elif field == "manufacturer":
+				select_cols.append("m_{}.name AS {}".format(alias, col))
+			elif field == "attribute":
+				select_cols.append("p_{}.attribute AS {}".format(alias, col))
+			else:
+				select_cols.append("CASE WHEN dp_{0}.design_id IS NULL THEN 0.0 ELSE dp_{0}.price END AS {1}".format(alias, col))
+				price_terms.append("IFNULL(dp_{}.price, 0)".format(alias))
+	if total_price:
+		select_cols.append("{} AS total_price".format(" + ".join(price_terms)))
+
+	return "CREATE VIEW IF NOT EXISTS {} AS SELECT {} FROM builds b {};".format(view_name, ", ".join(select_cols), " ".join(joins))
+
+def migrate(source_conn, target_conn=None, source_table="designs", batch_size=5000, view_name="designs_compat", progress_callback=None, verbose=False):
+	"""
+	Convert the rows of the 37-column 'designs' table into the normalized layout
+		- Rows are read in ROW_ID order in batches of [batch_size]; each batch is committed in its own transaction
+		- The migration is resumable: rows already present in 'builds' are skipped
+		- The source table is left untouched
+
+	:: Params
+		source_conn
+			Description: Connection to the database holding [source_table]
+			Type: sqlite3.connect()
+
+		target_conn
+			Description: Connection to the database receiving the normalized tables
+			Type: sqlite3.connect()
+			Default: None (same as source_conn)
+
+		source_table
+			Description: The table to migrate
+			Type: String
+			Default: designs
+
+		batch_size
+			Description: Number of designs per transaction
+			Type: Integer
+			Default: 5000
+
+		view_name
+			Description: The name of the compatibility view
+			Type: String
+			Default: designs_compat
+
+		progress_callback
+			Description: Function called after every batch
+			Type: Function
+			Syntax: progress_callback(designs_migrated)
+			Default: None
+
+		verbose
+			Description: To set if you want messages to be displayed
+			Type: Boolean
+
+	:: Returns
+		Value: Migration statistics
+		Type: Dictionary
+		Syntax:
+			{
+				"designs" : <number-of-designs-migrated>,
+				"parts" : <number-of-parts>,
+				"manufacturers" : <number-of-manufacturers>,
+				"links" : <number-of-design_parts-rows>,
+				"seconds" : <elapsed-time>
+			}
+	"""
+	if target_conn == None:
+		target_conn = source_conn
+	utils = dblib.SQLiteDBMgmt.BaseUtilities()
+	stats = {"designs" : 0, "parts" : 0, "manufacturers" : 0, "links" : 0, "seconds" : 0.0}
+	start = time.perf_counter()
+
+	# The view gets total_price only if the source table has it (schema.py migration 2)
+	source_columns = [row[1] for row in source_conn.execute("PRAGMA table_info({})".format(source_table))]
+	create_schema(target_conn, utils, view_name, "total_price" in source_columns)
+	cursor = target_conn.cursor()
+
+	manufacturer_ids = {}	# name : ROW_ID
+	part_ids = {}			# (category, name, manufacturer_id, attribute) : ROW_ID
+
+	def manufacturer_id(name):
+		if name == None:
+			return None
+		if name not in manufacturer_ids:
+			row = cursor.execute("SELECT ROW_ID FROM manufacturers WHERE name=?", (name,)).fetchone()
+			if row == None:
+				cursor.execute("INSERT INTO manufacturers (name) VALUES (?)", (name,))
+				manufacturer_ids[name] = cursor.lastrowid
+			else:
+				manufacturer_ids[name] = row[0]
+		return manufacturer_ids[name]
+
+	def part_id(category, name, manufacturer, attribute):
+		if name == None and manufacturer == None and attribute == None:
+			return None
+		key = (category, name, manufacturer_id(manufacturer), attribute)
+		if key not in part_ids:
+			row = cursor.execute(
+				"SELECT ROW_ID FROM parts WHERE category=? AND IFNULL(name, '')=IFNULL(?, '') AND IFNULL(manufacturer_id, 0)=IFNULL(?, 0) AND IFNULL(attribute, '')=IFNULL(?, '')",
+				key
+			).fetchone()
+			if row == None:
+				cursor.execute("INSERT INTO parts (category, name, manufacturer_id, attribute) VALUES (?, ?, ?, ?)", key)
+				part_ids[key] = cursor.lastrowid
+			else:
+				part_ids[key] = row[0]
+		return part_ids[key]
+
+	columns = design_columns()
+	last_row_id = target_conn.execute("SELECT IFNULL(MAX(ROW_ID), 0) FROM builds").fetchone()[0]
+	while True:
+		batch = utils.retrieve(
+			source_conn, source_table, "ROW_ID, {}".format(", ".join(columns)), "ROW_ID > ?",
+			"ORDER BY ROW_ID LIMIT {}".format(int(batch_size)), completion_msg="", verbose=False, params=(last_row_id,)
+		)
+		if batch == None:
+			break
+
+		links = []
+		try:
+			for row in batch:
+				values = dict(zip(columns, row[1:]))
+				for category_id, part in enumerate(PART_CATEGORIES):
+					fields = {"name" : None, "manufacturer" : None, "attribute" : None, "price" : None}
+					for col, field in part["columns"]:
+						fields[field] = values[col]
+					# Nothing chosen for this category: same as the column defaults, no entry needed
+					if fields["name"] == None and fields["manufacturer"] == None and fields["attribute"] == None and fields["price"] == 0.0:
+						continue
+					links.append((row[0], category_id, part_id(part["category"], fields["name"], fields["manufacturer"], fields["attribute"]), fields["price"]))
+
+			cursor.executemany("INSERT INTO builds (ROW_ID) VALUES (?)", [(row[0],) for row in batch])
+			cursor.executemany("INSERT INTO design_parts (design_id, category, part_id, price) VALUES (?, ?, ?, ?)", links)
+			target_conn.commit()
+		except Exception:
+			target_conn.rollback()
+			raise
+
+		last_row_id = batch[-1][0]
+		stats["designs"] += len(batch)
+		stats["links"] += len(links)
+		if progress_callback != None:
+			progress_callback(stats["designs"])
+		if verbose:
+			print("Migrated {} designs".format(stats["designs"]))
+
+	stats["parts"] = target_conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+	stats["manufacturers"] = target_conn.execute("SELECT COUNT(*) FROM manufacturers").fetchone()[0]
+	stats["seconds"] = time.perf_counter() - start
+	return stats
+
+def builds_using_part(conn, name, manufacturer=None, category=None):
+	"""
+	Get the ROW_ID of every design using a part (index lookups on parts/design_parts)
+
+	:: Params
+		name
+			Description: The part name (i.e. "RTX 4070")
+			Type: String
+
+		manufacturer
+			Description: Only parts from this manufacturer
+			Type: String
+			Default: None
+
+		category
+			Description: Only parts of this category (see PART_CATEGORIES)
+			Type: String
+			Default: None
+
+	:: Returns
+		Value: Sorted list of design ROW_IDs
+		Type: List
+	"""
+	query_stmt = "SELECT DISTINCT dp.design_id FROM parts p JOIN design_parts dp ON dp.part_id = p.ROW_ID"
+	conditions = ["p.name = ?"]
+	params = [name]
+	if manufacturer != None:
+		query_stmt += " JOIN manufacturers m ON m.ROW_ID = p.manufacturer_id"
+		conditions.append("m.name = ?")
+		params.append(manufacturer)
+	if category != None:
+		conditions.append("p.category = ?")
+		params.append(category)
+	query_stmt += " WHERE {} ORDER BY dp.design_id".format(" AND ".join(conditions))
+	return [row[0] for row in conn.execute(query_stmt, params)]
+
+def main():
+	argv = sys.argv[1:]
+	if len(argv) == 0:
+		print("Usage: python -m modules.catalog <source-db> [target-db]")
+		return
+
+	source_conn = dblib.db.connect(argv[0])
+	target_conn = source_conn
+	if len(argv) > 1:
+		target_conn = dblib.db.connect(argv[1])
+
+	stats = migrate(source_conn, target_conn, verbose=True)
+	print("Migrated {designs} designs ({links} part entries, {parts} parts, {manufacturers} manufacturers) in {seconds:.3f}s".format(**stats))
+
+	source_conn.close()
+	if target_conn is not source_conn:
+		target_conn.close()
+
+if __name__ == "__main__":
+	main()
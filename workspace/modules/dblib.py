@@ -3,11 +3,71 @@ Database Utilities for
 	- SQLite3
 """
 import os
+import re
 import sys
 import sqlite3 as db
 import csv					# To export to csv
+import time
+import json
+import base64
+import hashlib
+import bisect
+import itertools
+import threading
+import collections
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 
+""" Constants """
+# Storage-performance profiles applied by BaseUtilities.open_db(..., profile="<name>")
+# - None : Leave the SQLite default untouched
+# - page_size only takes effect on a new (empty) database or after VACUUM
+STORAGE_PROFILES = {
+	# Rollback journal + fsync on every commit; safest against power loss
+	"durable" : {
+		"journal_mode" : "DELETE",
+		"synchronous" : "FULL",
+		"cache_size" : -8000,			# 8 MiB
+		"mmap_size" : 0,
+		"temp_store" : "DEFAULT",
+		"page_size" : 4096,
+	},
+	# WAL + fsync on checkpoint only; durable against application crashes, recommended default
+	"balanced" : {
+		"journal_mode" : "WAL",
+		"synchronous" : "NORMAL",
+		"cache_size" : -32000,			# 32 MiB
+		"mmap_size" : 67108864,			# 64 MiB
+		"temp_store" : "MEMORY",
+		"page_size" : 4096,
+	},
+	# No fsync, in-memory journal; for seeding/restoring where the load can simply be re-run on failure
+	"bulk-load" : {
+		"journal_mode" : "MEMORY",
+		"synchronous" : "OFF",
+		"cache_size" : -256000,			# 256 MiB
+		"mmap_size" : 268435456,		# 256 MiB
+		"temp_store" : "MEMORY",
+		"page_size" : 8192,
+	},
+	# Large cache + mmap for scans, writes are rejected
+	"read-only-analytics" : {
+		"journal_mode" : None,
+		"synchronous" : "NORMAL",
+		"cache_size" : -128000,			# 128 MiB
+		"mmap_size" : 1073741824,		# 1 GiB
+		"temp_store" : "MEMORY",
+		"page_size" : None,
+		"query_only" : "ON",
+	},
+}
+
+# Open SQLiteDBMgmt.transaction() scopes per connection, innermost last : {id(conn) : [<scope>, ...]}
+TRANSACTION_SCOPES = {}
+
+# Locks serializing connections shared between threads (the writer of a ConnectionPool) : {id(conn) : threading.RLock}
+CONNECTION_LOCKS = {}
+
 """ General Functions """
 def get_parent_dir(file_path=__file__, jumps=1):
 	""" Get the parent directory of a file/folder
@@ -30,25 +90,271 @@ def get_parent_dir(file_path=__file__, jumps=1):
 		curr_dir = Path(curr_dir).parent
 	return curr_dir
 
+def transaction_scope(conn):
+	"""
+	Get the innermost SQLiteDBMgmt.transaction() scope open on a connection
+
+	:: Returns
+		Value: {"savepoint" : <name, None for the outermost scope>, "error" : <first error swallowed by query_exec()>, "invalidate" : [(<ResultCache>, <statement>), ...]}
+			or None if no scope is open
+		Type: Dictionary
+	"""
+	scopes = TRANSACTION_SCOPES.get(id(conn))
+	if not scopes:
+		return None
+	return scopes[-1]
+
+def connection_lock(conn):
+	"""
+	Get the lock to hold while writing on a connection
+		- The writer lock of a ConnectionPool for its writer connection (SQLiteDBMgmt.conn in pool mode)
+		- A no-op context for every other connection
+
+	:: Usage
+		with connection_lock(conn):
+			conn.execute(...)
+			conn.commit()
+	"""
+	lock = CONNECTION_LOCKS.get(id(conn))
+	if lock == None:
+		return nullcontext()
+	return lock
+
+def normalize_stmt(query_stmt):
+	"""
+	Normalize a statement for use as a key (collapse whitespace, strip the trailing ';')
+	"""
+	return " ".join(query_stmt.split()).rstrip(";").strip()
+
+def column_converter(col_type):
+	"""
+	Get the function converting a raw imported value (CSV text/JSON value) to the python type of a column definition type
+		- Follows the SQLite type affinity rules: INT => int, REAL/FLOA/DOUB => float, CHAR/CLOB/TEXT => str, BOOL => 0|1
+		- Empty strings and None become None (NULL)
+		- The converter raises ValueError if the value cannot be converted
+
+	:: Params
+		col_type
+			Description: The "type" of the column definition (i.e. INTEGER, FLOAT, VARCHAR(255))
+			Type: String
+
+	:: Returns
+		Value: converter(value)
+		Type: Function
+	"""
+	col_type = col_type.upper()
+
+	def to_bool(value):
+		if value == None or value == "":
+			return None
+		if isinstance(value, str):
+			if value.strip().lower() in ("1", "true", "t", "yes", "y"):
+				return 1
+			if value.strip().lower() in ("0", "false", "f", "no", "n"):
+				return 0
+			raise ValueError("not a boolean: {!r}".format(value))
+		return int(bool(value))
+
+	def to_int(value):
+		if value == None or value == "":
+			return None
+		if isinstance(value, float) or (isinstance(value, str) and "." in value):
+			value = float(value)
+			if not value.is_integer():
+				raise ValueError("not an integer: {!r}".format(value))
+		return int(value)
+
+	def to_float(value):
+		if value == None or value == "":
+			return None
+		return float(value)
+
+	def to_str(value):
+		if value == None or value == "":
+			return None
+		return str(value)
+
+	def to_any(value):
+		if value == "":
+			return None
+		return value
+
+	if "BOOL" in col_type:
+		return to_bool
+	if "INT" in col_type:
+		return to_int
+	if ("REAL" in col_type) or ("FLOA" in col_type) or ("DOUB" in col_type):
+		return to_float
+	if ("CHAR" in col_type) or ("CLOB" in col_type) or ("TEXT" in col_type):
+		return to_str
+	return to_any
+
+def coerce_value(value, col_type):
+	"""
+	Convert a raw imported value to the python type of a column definition type (see column_converter())
+	"""
+	return column_converter(col_type)(value)
+
+def coerce_rows(chunk, start_line, columns, col_definitions, file_format="csv"):
+	"""
+	Parse, validate and coerce a chunk of imported records against the column definitions
+		- Runs in the import worker pool (see BaseUtilities.import_file), so it must stay a module-level function
+
+	:: Params
+		chunk
+			Description: The raw records
+			Type: List
+			Syntax:
+				csv   : [[<value>, ...], ...] in the order of [columns]
+				jsonl : ["<json-object-text>", ...]
+				json  : [{"<column>" : <value>}, ...]
+
+		start_line
+			Description: Record number of the first record in the chunk (for error messages)
+			Type: Integer
+
+		columns
+			Description: The columns to produce, in order
+				- json/jsonl records with a field that is not in [columns] are rejected
+			Type: List
+
+		col_definitions
+			Description: The column definitions of the table (Workspace.table_properties[n]["columns"])
+			Type: Dictionary
+
+		file_format
+			Description: csv | json | jsonl
+			Type: String
+
+	:: Returns
+		Value: (rows, errors)
+			rows   : [(<value>, ...), ...] in the order of [columns]
+			errors : [(<record-number>, "<message>"), ...]
+		Type: Tuple
+	"""
+	rows = []
+	errors = []
+	converters = [column_converter(col_definitions[c]["type"]) for c in columns]
+	known_columns = set(columns)
+	# NOT NULL columns; an INTEGER PRIMARY KEY is assigned by SQLite when missing
+	required = [
+		(col_definitions[c]["null"] == False) and not (col_definitions[c]["key"] == "PRIMARY KEY" and "INT" in col_definitions[c]["type"].upper())
+		for c in columns
+	]
+
+	for offset, record in enumerate(chunk):
+		line = start_line + offset
+		try:
+			if file_format == "jsonl":
+				record = json.loads(record)
+			if isinstance(record, dict):
+				unknown = [k for k in record.keys() if k not in known_columns]
+				if len(unknown) > 0:
+					raise ValueError("unknown fields: {}".format(", ".join([str(k) for k in unknown])))
+				record = [record.get(c) for c in columns]
+			elif len(record) != len(columns):
+				raise ValueError("expected {} fields, got {}".format(len(columns), len(record)))
+
+			row = []
+			for i in range(len(columns)):
+				value = converters[i](record[i])
+				if value == None and required[i]:
+					raise ValueError("{} is required".format(columns[i]))
+				row.append(value)
+			rows.append(tuple(row))
+		except (ValueError, TypeError) as e:
+			errors.append((line, str(e)))
+
+	return rows, errors
+
 """ Classes """
 class SQLiteDBMgmt(object):
 	"""
 	SQLite3 Database Class
 	"""
-	def __init__(self, db_name, db_path=os.path.join(get_parent_dir(__file__, 2), "res", "database")):
+	def __init__(self, db_name, db_path=os.path.join(get_parent_dir(__file__, 2), "res", "database"), statement_cache_size=128, pool=False, pool_size=8, pool_idle_timeout=60.0, profile=None, row_factory=None):
+		"""
+		Open the Database
+
+		:: Params
+			db_name
+				Description: The file name of your database
+				Type: String
+
+			db_path
+				Description: The directory containing your database
+				Type: String
+				Default: res/database
+
+			statement_cache_size
+				Description: Number of compiled statements cached per connection
+				Type: Integer
+				Default: 128
+
+			pool
+				Description: Open the database in pool mode (see SQLiteDBMgmt.ConnectionPool)
+					- self.pool hands out per-thread read connections and a single serialized writer connection
+					- self.conn is the pool's writer connection; BaseUtilities writes and transaction() on it hold the pool's writer lock
+				Type: Boolean
+				Default: False
+
+			pool_size
+				Description: Maximum number of read connections kept by the pool
+				Type: Integer
+				Default: 8
+
+			pool_idle_timeout
+				Description: Seconds after which an unused read connection is closed
+				Type: Float
+				Default: 60.0
+
+			profile
+				Description: The storage-performance profile to apply on open (see STORAGE_PROFILES)
+				Type: String|Dictionary
+				Options: durable | balanced | bulk-load | read-only-analytics | {"<pragma>" : <value>}
+				Default: None (SQLite defaults)
+
+			row_factory
+				Description: How rows of self.conn are returned
+				Type: String|Function
+				Options:
+					None : Plain tuples
+					"records" : Named tuple-backed records (SQLiteDBMgmt.RecordFactory without table definitions)
+					"row" : sqlite3.Row
+					SQLiteDBMgmt.RecordFactory(table_properties) : Named records, with one class per table for 'SELECT *'
+					<function(cursor, row)> : Any sqlite3 row factory
+				Default: None
+		"""
 		global utils
 		utils = self.BaseUtilities()
 		self.db_name = db_name
 		self.db_path = db_path
 		self.full_path = os.path.join(db_path, db_name)
-		self.conn = utils.open_db(self.full_path)	# Create Database object
+		self.profile = profile
+		self.pool = None
+		if pool:
+			self.pool = self.ConnectionPool(self.full_path, pool_size, pool_idle_timeout, statement_cache_size, profile=profile)
+			self.conn = self.pool.writer_conn
+		else:
+			self.conn = utils.open_db(self.full_path, statement_cache_size=statement_cache_size, profile=profile)	# Create Database object
+		if row_factory == "records":
+			row_factory = self.RecordFactory()
+		elif row_factory == "row":
+			row_factory = db.Row
+		if row_factory != None:
+			self.conn.row_factory = row_factory
 		print("Opened Database")
 
 	def __exit__(self):
 		self.db_name = ""
 		self.db_path = ""
 		self.full_path = os.path.join(self.db_path, self.db_name)
-		self.conn = utils.close_db(self.conn)
+		if self.pool != None:
+			self.pool.close()
+			self.pool = None
+			self.conn = None
+		else:
+			self.conn = utils.close_db(self.conn)
 		print("Closed Database")
 	
 	class Queries():
@@ -103,7 +409,16 @@ class SQLiteDBMgmt(object):
 		"""
 		SQLite3 Database - Utilities Class
 		"""
-		def open_db(self, db_name, other_params=None):
+		def __init__(self):
+			"""
+			Initialize
+			"""
+			self.advisor = None		# SQLiteDBMgmt.QueryAdvisor recording the executed queries; None = disabled
+			self.result_cache = None	# SQLiteDBMgmt.ResultCache used by retrieve(); None = disabled
+			self.last_error = None		# Exception swallowed by the last query_exec(); None = success
+			self.instrumentation = None	# SQLiteDBMgmt.Instrumentation timing every statement; None = disabled
+
+		def open_db(self, db_name, other_params=None, statement_cache_size=128, profile=None):
 			"""
 			Create / Open Database
 
@@ -132,17 +447,77 @@ class SQLiteDBMgmt(object):
 					Syntax:
 						db.connect(..,.., *other_params) => List
 						db.connect(..,.., **other_params) => Dictionary
+
+				statement_cache_size
+					Description: Number of compiled (prepared) statements kept per connection
+						- Parameterized statements are re-used from this cache instead of being re-parsed by SQLite
+					Type: Integer
+					Default: 128
+
+				profile
+					Description: The storage-performance profile to apply after connecting (see apply_profile())
+					Type: String|Dictionary
+					Default: None
 			"""
 			conn = None
 			if not (db_name == ""):
-				if type(other_params) == type(dict):
+				if isinstance(other_params, dict):
+					other_params.setdefault("cached_statements", statement_cache_size)
 					conn = db.connect(db_name, **other_params)
-				elif type(other_params) == type(list):
+				elif isinstance(other_params, list):
 					conn = db.connect(db_name, *other_params)
 				else:
-					conn = db.connect(db_name)
+					conn = db.connect(db_name, cached_statements=statement_cache_size)
+
+				# REPLACE must fire the DELETE triggers of the replaced row (i.e. create_fts_index), which SQLite only does with recursive triggers
+				conn.execute("PRAGMA recursive_triggers = ON;")
+				if profile != None:
+					self.apply_profile(conn, profile)
 			return conn
 
+		def apply_profile(self, conn, profile="balanced", verbose=False):
+			"""
+			Apply a storage-performance profile (a set of PRAGMAs) to a connection
+
+			:: Params
+				conn
+					Description: The Database Connection
+					Type: sqlite3.connect('<dbname>')
+
+				profile
+					Description: The profile name in STORAGE_PROFILES, or your own mapping of PRAGMA to value
+					Type: String|Dictionary
+					Options: durable | balanced | bulk-load | read-only-analytics
+					Default: balanced
+
+				verbose
+					Description: To set if you want messages to be displayed
+					Type: Boolean
+
+			:: Returns
+				Value: The PRAGMA values as reported by SQLite after applying the profile
+				Type: Dictionary
+			"""
+			if isinstance(profile, dict):
+				pragmas = profile
+			else:
+				pragmas = STORAGE_PROFILES[profile]
+
+			# page_size must be set before the journal mode switches to WAL
+			order = ["page_size", "journal_mode"] + [k for k in pragmas.keys() if k not in ("page_size", "journal_mode")]
+			applied = {}
+			for pragma in order:
+				value = pragmas.get(pragma)
+				if value == None:
+					continue
+				conn.execute("PRAGMA {}={};".format(pragma, value))
+				applied[pragma] = conn.execute("PRAGMA {};".format(pragma)).fetchone()
+				if applied[pragma] != None:
+					applied[pragma] = applied[pragma][0]
+				if verbose:
+					print("PRAGMA {} = {}".format(pragma, applied[pragma]))
+			return applied
+
 		def gen_cursor(self, conn=None):
 			"""
 			Create cursor object using the cursor() method
@@ -156,7 +531,7 @@ class SQLiteDBMgmt(object):
 			cursor = conn.cursor()
 			return cursor
 
-		def query_exec(self, conn, cursor=None, query_stmt="", commit=True, get_result=False, fetch="all", completion_msg="Query executed successfully.", verbose=False):
+		def query_exec(self, conn, cursor=None, query_stmt="", commit=True, get_result=False, fetch="all", completion_msg="Query executed successfully.", verbose=False, params=None):
 			"""
 			Execute a SQLite Query
 
@@ -175,6 +550,7 @@ class SQLiteDBMgmt(object):
 
 				commit
 					Description: Confirm if you want to commit your query changes
+						- Ignored inside a SQLiteDBMgmt.transaction() scope, which commits once when it exits
 					Type: Boolean
 
 				get_result
@@ -205,9 +581,19 @@ class SQLiteDBMgmt(object):
 				verbose
 					Description: To set if you want messages to be displayed
 					Type: Boolean
+
+				params
+					Description: The values to bind to the placeholders in your Query Statement
+						- Binding re-uses the same statement string, so SQLite can serve it from the statement cache
+					Type: List|Tuple|Dictionary
+					Default: None
+					Syntax:
+						List|Tuple: Positional placeholders => "SELECT * FROM profiles WHERE username=?", ("asura",)
+						Dictionary: Named placeholders => "SELECT * FROM profiles WHERE username=:username", {"username" : "asura"}
 			"""
 			# Variables
 			result = None
+			self.last_error = None
 
 			# --- Validation
 			# Data Validation: Null Value
@@ -217,45 +603,105 @@ class SQLiteDBMgmt(object):
 			# --- Processing
 			if verbose:
 				print(query_stmt)
+				if params != None:
+					print("Parameters: {}".format(params))
 
-			# Execute Query Statement
-			try:
-				cursor.execute(query_stmt)
-				if completion_msg != "":
-					if verbose:
-						print(completion_msg)
-			except db.IntegrityError as ie:
-				if verbose:
-					err = str(ie).split(": ")
-					err_msg = err[0]
-					err_obj = err[1].split('.')[1]
-					if err_msg == "UNIQUE constraint failed":
-						print("{} exists.".format(err_obj))			
-			except Exception as e:
-				if verbose:
-					print("Exception:\n\t{}".format(e))
+			if self.advisor != None:
+				self.advisor.record(query_stmt, params)
 
-			# Commit changes in the database (i.e. like in Git/Github)
-			if commit:
-				# Confirm commiting
-				if verbose:
-					print("Commit completed.")
-				conn.commit()
-
-			# If want to get the result
-			if get_result:
-				if type(fetch) == type(dict):
-					if fetch[0] == "many":
-						size = fetch[1]
-						result = cursor.fetchmany(size)
-				else:
-					if fetch == "one":
-						result = cursor.fetchone()
+			instrumentation = self.instrumentation
+			if instrumentation != None:
+				token = instrumentation.start(conn)
+
+			# Execute Query Statement (other threads sharing the connection wait until its result is read)
+			with connection_lock(conn):
+				try:
+					if params == None:
+						cursor.execute(query_stmt)
+					else:
+						cursor.execute(query_stmt, params)
+					if completion_msg != "":
+						if verbose:
+							print(completion_msg)
+				except db.IntegrityError as ie:
+					self.last_error = ie
+					self.fail_scope(conn, ie)
+					if verbose:
+						err = str(ie).split(": ")
+						err_msg = err[0]
+						err_obj = err[1].split('.')[1]
+						if err_msg == "UNIQUE constraint failed":
+							print("{} exists.".format(err_obj))			
+				except Exception as e:
+					self.last_error = e
+					self.fail_scope(conn, e)
+					if verbose:
+						print("Exception:\n\t{}".format(e))
+
+				# Commit changes in the database (i.e. like in Git/Github)
+				if commit:
+					# Confirm commiting
+					if self.commit(conn) and verbose:
+						print("Commit completed.")
+
+				# Drop cached results of the tables written (after the commit, so other connections cannot re-cache the old rows)
+				if self.result_cache != None:
+					self.invalidate_stmt(conn, query_stmt)
+
+				# If want to get the result
+				if get_result:
+					if isinstance(fetch, dict):
+						if fetch["option"] == "many":
+							size = int(fetch["size"])
+							result = cursor.fetchmany(size)
 					else:
-						result = cursor.fetchall()
+						if fetch == "one":
+							result = cursor.fetchone()
+						else:
+							result = cursor.fetchall()
+
+			if instrumentation != None:
+				if not get_result:
+					rows = cursor.rowcount if cursor.rowcount >= 0 else None
+				elif isinstance(result, list):
+					rows = len(result)
+				else:
+					rows = 1 if result != None else 0
+				instrumentation.finish(conn, token, query_stmt, params, rows, self.last_error)
 
 			return result
 
+		def commit(self, conn):
+			"""
+			Commit the current transaction, unless it belongs to a SQLiteDBMgmt.transaction() scope
+
+			:: Returns
+				Value: True if committed, False if left to the scope
+				Type: Boolean
+			"""
+			if transaction_scope(conn) != None:
+				return False
+			conn.commit()
+			return True
+
+		def fail_scope(self, conn, error):
+			"""
+			Record an error swallowed by query_exec() in the innermost transaction() scope, which then rolls back and raises it
+			"""
+			scope = transaction_scope(conn)
+			if (scope != None) and (scope["error"] == None):
+				scope["error"] = error
+
+		def invalidate_stmt(self, conn, query_stmt):
+			"""
+			Drop the cached results a statement makes stale
+				- Inside a transaction() scope, the statement is invalidated again after the outermost commit,
+				  since other connections may have re-cached the old rows in between
+			"""
+			self.result_cache.invalidate_stmt(conn, query_stmt)
+			if (transaction_scope(conn) != None) and (self.result_cache.written_tables(conn, query_stmt) != []):
+				TRANSACTION_SCOPES[id(conn)][0]["invalidate"].append((self.result_cache, query_stmt))
+
 		def create_table(self, conn, table_name, col_definitions=None, validate_exists=False, cursor=None, commit=True, get_result=False, completion_msg="Table has been created successfully.", verbose=False):
 			"""
 			Create a table in database
@@ -353,36 +799,30 @@ class SQLiteDBMgmt(object):
 				res = self.query_exec(conn, cursor, query, commit, get_result, completion_msg=completion_msg, verbose=verbose)
 				return res
 
-		def retrieve(self, conn, table_name, col="*", where_condition="", other_options="", cursor=None, commit=False, get_result=True, fetch="all", completion_msg="Retrieval completed.", verbose=True):
+		def create_indexes(self, conn, table_name, index_definitions=None, cursor=None, commit=True, verbose=False):
 			"""
-			Query from Database Table and return the result using 'SELECT'
+			Create the secondary/composite indexes of a table (idempotent: CREATE INDEX IF NOT EXISTS)
 
 			:: Params
-
 				conn
 					Description: Your Database Connection Object
 					Type: sqlite3.connect("<database-name>")
 
 				table_name
-					Description: Your Table of choice
-					Type: String
-
-				col
-					Description: The column you want to select
-					Type: String
-					Default: "*" = Wildcard = All
-					Remarks:
-						- Please seperate all columns with delimiter ','
-
-				where_condition
-					Description: a filter / specifier for what you need (i.e. WHERE table=='name')
+					Description: The table the indexes belong to
 					Type: String
-					Default: ""
 
-				other_options
-					Description: Other options to use in the query
-					Type: String
-					Default: ""
+				index_definitions
+					Description: The indexes to create; the "indexes" entry of a table in table_properties
+					Type: Dictionary
+					Syntax:
+						{
+							"index name" : {
+								"columns" : ["<column>" | "<column> DESC" | "<expression>", ...],
+								"unique" : False (UNIQUE INDEX),
+								"where" : "" (Partial index condition)
+							}
+						}
 
 				cursor
 					Description: The cursor object generated from the connection
@@ -390,164 +830,2993 @@ class SQLiteDBMgmt(object):
 					Default: None
 
 				commit
-					Description: Confirm if you want to commit your query changes
+					Description: Confirm if you want to commit after creating the indexes
 					Type: Boolean
-					Default: False
+					Default: True
 
-				get_result
-					Description: Confirm if you want to get the result of the query
-						- Correlated to the argument field 'fetch'
+				verbose
+					Description: To set if you want messages to be displayed
 					Type: Boolean
-					Default: True
 
-				fetch
-					Description: Confirm the number of results
+			:: Returns
+				Value: The statements executed
+				Type: List
+			"""
+			statements = []
+			if index_definitions == None:
+				return statements
+
+			for index_name, index_definition in index_definitions.items():
+				query_stmt = "CREATE {}INDEX IF NOT EXISTS {} ON {} ({})".format(
+					"UNIQUE " if index_definition.get("unique", False) else "",
+					index_name, table_name, ", ".join(index_definition["columns"])
+				)
+				if index_definition.get("where", "") != "":
+					query_stmt += " WHERE {}".format(index_definition["where"])
+				query_stmt += ";"
+				self.query_exec(conn, cursor, query_stmt, False, completion_msg="Index {} created.".format(index_name), verbose=verbose)
+				statements.append(query_stmt)
+
+			if commit:
+				self.commit(conn)
+
+			return statements
+
+		def materialize_sum(self, conn, table_name, target_column, source_columns, key_column="ROW_ID", batch_size=5000, commit=True, verbose=False):
+			"""
+			Keep a stored column equal to the sum of other columns of the same row
+				- Adds [target_column] (FLOAT) if it does not exist yet
+				- Triggers recompute it after every INSERT and after every UPDATE of a source column, and put it back
+				  if it is edited by hand; each trigger only writes when the stored value differs from the sum
+				- Rows where it is still NULL are backfilled in [key_column] ranges of [batch_size] rows, one transaction per range
+				- Index the column (table_properties "indexes") so range filters on it become index range scans
+
+			:: Params
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				table_name
+					Description: The table holding the columns
 					Type: String
-					Default: "all"
-					Options: 
-						- {
-								"option" : "many",
-								"size" : "<number-of-rows>"
-						}
-						- one
-						- all 
 
-				completion_msg
-					Description: The message to display on completion.
+				target_column
+					Description: The stored aggregate column (i.e. total_price)
 					Type: String
-					Default: "Retrieval completed."
 
-				verbose
-					Description: To set if you want messages to be displayed
-					Type: Boolean
-			"""
-			res = ""
+				source_columns
+					Description: The columns to add up; NULL counts as 0
+					Type: List
 
-			# Generate Query
-			if where_condition != "":
-				query_stmt = "SELECT {} FROM {} WHERE {}".format(col, table_name, where_condition)
-			else:
-				query_stmt = "SELECT {} FROM {}".format(col, table_name)
+				key_column
+					Description: The INTEGER PRIMARY KEY of the table
+					Type: String
+					Default: ROW_ID
 
-			# Data Validation: Null Value
-			if other_options != "":
-				query_stmt += " {} ".format(other_options)
+				batch_size
+					Description: Number of rows per backfill transaction
+					Type: Integer
+					Default: 5000
 
-			if verbose:
-				print("Query Statement", query_stmt)
+				commit
+					Description: Commit after the triggers and after every backfill range
+						- False leaves everything in the caller's transaction (i.e. a schema migration)
+					Type: Boolean
+					Default: True
 
-			# Execute Query
-			res = self.query_exec(conn, cursor, query_stmt, commit, get_result, fetch, completion_msg, verbose)
+				verbose
+					Description: To set if you want messages to be displayed
+					Type: Boolean
 
-			if verbose:
-				print("Result: {}".format(res))
+			:: Returns
+				Value: {"rows_backfilled" : <number-of-rows>, "seconds" : <elapsed-time>}
+				Type: Dictionary
+			"""
+			stats = {"rows_backfilled" : 0, "seconds" : 0.0}
+			start = time.perf_counter()
+
+			# 1. Column
+			existing_columns = [row[1] for row in conn.execute("PRAGMA table_info({});".format(table_name)).fetchall()]
+			if target_column not in existing_columns:
+				self.query_exec(conn, None, "ALTER TABLE {} ADD COLUMN {} FLOAT NULL;".format(table_name, target_column), commit, verbose=verbose)
+
+			# 2. Triggers
+			# - The update trigger watches the source columns only: with [target_column] in its 'UPDATE OF' list, the UPDATE
+			#   run by the insert trigger fired it again and every inserted row paid for two extra UPDATEs
+			# - Hand edits of [target_column] are corrected by a separate trigger whose WHEN is false for the triggers' own UPDATEs
+			# - Triggers created by an earlier version are replaced (DROP + CREATE), so calling this again upgrades them
+			def total_expr(prefix):
+				return " + ".join(["IFNULL({}{}, 0)".format(prefix, c) for c in source_columns])
+
+			guard = "WHEN NEW.{} IS NOT ({})".format(target_column, total_expr("NEW."))
+			triggers = {
+				"trg_{}_{}_insert".format(table_name, target_column) : "AFTER INSERT ON {} {}".format(table_name, guard),
+				"trg_{}_{}_update".format(table_name, target_column) : "AFTER UPDATE OF {} ON {} {}".format(", ".join(source_columns), table_name, guard),
+				"trg_{}_{}_correct".format(table_name, target_column) : "AFTER UPDATE OF {} ON {} {}".format(target_column, table_name, guard),
+			}
+			for trigger_name, trigger_event in triggers.items():
+				self.query_exec(conn, None, "DROP TRIGGER IF EXISTS {};".format(trigger_name), False, verbose=verbose)
+				self.query_exec(conn, None, "CREATE TRIGGER {} {} BEGIN UPDATE {} SET {} = {} WHERE {} = NEW.{}; END;".format(
+					trigger_name, trigger_event, table_name, target_column, total_expr("NEW."), key_column, key_column
+				), False, verbose=verbose)
+			if commit:
+				self.commit(conn)
+
+			# 3. Backfill
+			if conn.execute("SELECT 1 FROM {} WHERE {} IS NULL LIMIT 1;".format(table_name, target_column)).fetchone() != None:
+				last_key = conn.execute("SELECT MIN({}) - 1 FROM {};".format(key_column, table_name)).fetchone()[0]
+				while last_key != None:
+					upper = conn.execute("SELECT MAX({0}) FROM (SELECT {0} FROM {1} WHERE {0} > ? ORDER BY {0} LIMIT ?);".format(key_column, table_name), (last_key, batch_size)).fetchone()[0]
+					if upper == None:
+						break
+					cursor = conn.execute("UPDATE {} SET {} = {} WHERE {} > ? AND {} <= ? AND {} IS NULL;".format(
+						table_name, target_column, total_expr(""), key_column, key_column, target_column
+					), (last_key, upper))
+					if commit:
+						self.commit(conn)
+					if self.result_cache != None:
+						self.result_cache.invalidate([table_name])
+					stats["rows_backfilled"] += cursor.rowcount
+					last_key = upper
+					if verbose:
+						print("Backfilled {} rows of {}.{}".format(stats["rows_backfilled"], table_name, target_column))
 
-			# Data Validation: Null Value
-			if len(res) == 0:
-				res = None
+			stats["seconds"] = time.perf_counter() - start
+			return stats
 
-			return res
+		def fts_available(self, conn):
+			"""
+			Check if the SQLite library was compiled with the FTS5 extension
 
-		def insert(self, conn, table_name, value_definitions=None, where_condition="", other_options="", cursor=None, commit=False, get_result=True, fetch="all", completion_msg="insert completed.", verbose=False):
+			:: Returns
+				Value: True if FTS5 tables can be created
+				Type: Boolean
 			"""
-			Query from Database Table and return the result using 'INSERT'
+			try:
+				conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(probe);")
+				conn.execute("DROP TABLE temp.fts5_probe;")
+				return True
+			except db.OperationalError:
+				return False
 
-			:: Params
+		def create_fts_index(self, conn, table_name, columns, fts_name=None, key_column="ROW_ID", tokenizer="unicode61 remove_diacritics 2", prefix="2 3", commit=True, verbose=False):
+			"""
+			Create an FTS5 full-text index over TEXT columns of a table and keep it in sync with triggers
+				- External content table: the text is not stored twice, FTS5 reads it back from [table_name]
+				- INSERT/DELETE, and UPDATE of an indexed column, update the index; updates of other columns (i.e. prices) do not touch it
+				- Existing rows are indexed (rebuild) when the FTS table is first created
+				- INSERT OR REPLACE deletes the old row without firing the delete trigger unless 'PRAGMA recursive_triggers' is ON:
+				  open_db() and insert_many(conflict="OR REPLACE") turn it on; other connections must do it themselves,
+				  or the index keeps the replaced row's words
+				- The triggers cut insert_many() throughput several times over: for large loads, load before creating the index
+				  (or drop the triggers), then rebuild_fts_index() once
 
+			:: Params
 				conn
 					Description: Your Database Connection Object
 					Type: sqlite3.connect("<database-name>")
 
 				table_name
-					Description: Your Table of choice
+					Description: The table holding the text
 					Type: String
 
-				values_definitions
-					Description: The new values you want to add into the table mapped to the column
-					Type: Dictionary
-					Default: None
-					Syntax:
-						{
-							"<column>" : <new-value>
-						}
-					Remarks:
-						- Please take note of your data type of the variables
-							- i.e.
-								- String: "string-value"
-								- Float (aka REAL): 1.0f
-								- Int: 0
-								- Boolean: True|False
-					Examples:
-						{
-							"name" : "asura",
-							"age" : 1000,
-							"money" : 10000.00f
-							"registered" : True
-						}
+				columns
+					Description: The TEXT columns to index
+					Type: List
 
-				where_condition
-					Description: a filter / specifier for what you need (i.e. WHERE table=='name')
+				fts_name
+					Description: Name of the FTS5 table
 					Type: String
-					Default: ""
+					Default: None ("<table_name>_fts")
 
-				other_options
-					Description: Other options to use in the query
+				key_column
+					Description: The INTEGER PRIMARY KEY of the table
 					Type: String
-					Default: ""
+					Default: ROW_ID
 
-				cursor
-					Description: The cursor object generated from the connection
-					Type: sqlite3.connect().cursor()
-					Default: None
+				tokenizer
+					Description: The FTS5 tokenizer definition
+					Type: String
+					Default: "unicode61 remove_diacritics 2"
+
+				prefix
+					Description: Prefix lengths to index so short prefix queries (i.e. "RT*") do not scan the whole term list
+					Type: String
+					Default: "2 3"
 
 				commit
-					Description: Confirm if you want to commit your query changes
+					Description: Commit when done (False leaves it in the caller's transaction)
 					Type: Boolean
-					Default: False
+					Default: True
 
-				get_result
-					Description: Confirm if you want to get the result of the query
-						- Correlated to the argument field 'fetch'
+				verbose
+					Description: To set if you want messages to be displayed
 					Type: Boolean
-					Default: True
 
-				fetch
-					Description: Confirm the number of results
-					Type: String
-					Default: "all"
-					Options: 
-						- {
-								"option" : "many",
-								"size" : "<number-of-rows>"
-						}
-						- one
-						- all 
+			:: Returns
+				Value: The name of the FTS5 table
+				Type: String
+			"""
+			if fts_name == None:
+				fts_name = "{}_fts".format(table_name)
+			conn.execute("PRAGMA recursive_triggers = ON;")
+
+			exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (fts_name,)).fetchone() != None
+			if not exists:
+				self.query_exec(conn, None, "CREATE VIRTUAL TABLE {} USING fts5({}, content='{}', content_rowid='{}', tokenize='{}', prefix='{}');".format(
+					fts_name, ", ".join(columns), table_name, key_column, tokenizer, prefix
+				), False, verbose=verbose)
+
+			new_values = ", ".join(["NEW.{}".format(c) for c in columns])
+			old_values = ", ".join(["OLD.{}".format(c) for c in columns])
+			insert_stmt = "INSERT INTO {0}(rowid, {1}) VALUES (NEW.{2}, {3});".format(fts_name, ", ".join(columns), key_column, new_values)
+			delete_stmt = "INSERT INTO {0}({0}, rowid, {1}) VALUES ('delete', OLD.{2}, {3});".format(fts_name, ", ".join(columns), key_column, old_values)
+			triggers = {
+				"trg_{}_insert".format(fts_name) : ("AFTER INSERT ON {}".format(table_name), insert_stmt),
+				"trg_{}_delete".format(fts_name) : ("AFTER DELETE ON {}".format(table_name), delete_stmt),
+				"trg_{}_update".format(fts_name) : ("AFTER UPDATE OF {} ON {}".format(", ".join(columns), table_name), delete_stmt + " " + insert_stmt),
+			}
+			for trigger_name, (trigger_event, trigger_body) in triggers.items():
+				self.query_exec(conn, None, "CREATE TRIGGER IF NOT EXISTS {} {} BEGIN {} END;".format(trigger_name, trigger_event, trigger_body), False, verbose=verbose)
+			if commit:
+				self.commit(conn)
 
-				completion_msg
+			if not exists:
+				self.rebuild_fts_index(conn, fts_name, commit=commit, verbose=verbose)
+			return fts_name
+
+		def rebuild_fts_index(self, conn, fts_name, optimize=True, commit=True, verbose=False):
+			"""
+			Rebuild an FTS5 index from its content table (i.e. after bulk changes made with the triggers dropped, or to repair it)
+
+			:: Params
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				fts_name
+					Description: Name of the FTS5 table
+					Type: String
+
+				optimize
+					Description: Merge the index b-trees into one afterwards (faster queries, slower rebuild)
+					Type: Boolean
+					Default: True
+
+				commit
+					Description: Commit when done (False leaves it in the caller's transaction)
+					Type: Boolean
+					Default: True
+
+				verbose
+					Description: To set if you want messages to be displayed
+					Type: Boolean
+
+			:: Returns
+				Value: Time taken in seconds
+				Type: Float
+			"""
+			start = time.perf_counter()
+			conn.execute("INSERT INTO {0}({0}) VALUES ('rebuild');".format(fts_name))
+			if optimize:
+				conn.execute("INSERT INTO {0}({0}) VALUES ('optimize');".format(fts_name))
+			if commit:
+				self.commit(conn)
+			if self.result_cache != None:
+				self.result_cache.invalidate([fts_name])
+			seconds = time.perf_counter() - start
+			if verbose:
+				print("Rebuilt full-text index {} in {:.3f}s".format(fts_name, seconds))
+			return seconds
+
+		def fts_query(self, text, columns=None, prefix=True):
+			"""
+			Turn free text (i.e. 'RTX 4070') into an FTS5 MATCH expression
+				- Every word becomes a quoted string, so punctuation and FTS5 operators in the input are matched literally
+				- All words must match (implicit AND); with [prefix], each word also matches longer terms ("407" -> "4070")
+
+			:: Params
+				text
+					Description: The words to search for
+					Type: String
+
+				columns
+					Description: Only match in these indexed columns
+					Type: List
+					Default: None (every indexed column)
+
+				prefix
+					Description: Treat every word as a prefix
+					Type: Boolean
+					Default: True
+
+			:: Returns
+				Value: The MATCH expression, or "" if [text] has no words
+				Type: String
+			"""
+			terms = []
+			for word in text.split():
+				terms.append('"{}"{}'.format(word.replace('"', '""'), "*" if prefix else ""))
+			if len(terms) == 0:
+				return ""
+			expression = " ".join(terms)
+			if columns != None:
+				expression = "{{{}}} : ({})".format(" ".join(columns), expression)
+			return expression
+
+		def search(self, conn, table_name, text, col=None, columns=None, fts_name=None, key_column="ROW_ID", limit=20, prefix=True, raw=False, cursor=None, verbose=False):
+			"""
+			Full-text search over a table indexed with create_fts_index, best matches (bm25) first
+
+			:: Params
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				table_name
+					Description: The content table
+					Type: String
+
+				text
+					Description: The words to search for (or an FTS5 query if [raw] is set)
+					Type: String
+
+				col
+					Description: The columns of [table_name] to return
+					Type: String
+					Default: None ("<table_name>.*")
+
+				columns
+					Description: Only match in these indexed columns
+					Type: List
+					Default: None (every indexed column)
+
+				fts_name
+					Description: Name of the FTS5 table
+					Type: String
+					Default: None ("<table_name>_fts")
+
+				key_column
+					Description: The INTEGER PRIMARY KEY of the table
+					Type: String
+					Default: ROW_ID
+
+				limit
+					Description: Maximum number of rows
+					Type: Integer
+					Default: 20
+
+				prefix
+					Description: Treat every word as a prefix (see fts_query)
+					Type: Boolean
+					Default: True
+
+				raw
+					Description: Pass [text] to MATCH unchanged (FTS5 query syntax: OR, NOT, NEAR, "phrases", column filters)
+					Type: Boolean
+					Default: False
+
+			:: Returns
+				Value: The matching rows, best first
+				Type: List
+
+			:: Remarks
+				- Raises sqlite3.OperationalError for an invalid [raw] query
+			"""
+			if fts_name == None:
+				fts_name = "{}_fts".format(table_name)
+			if col == None:
+				col = "{}.*".format(table_name)
+
+			expression = text if raw else self.fts_query(text, columns, prefix)
+			if expression == "":
+				return []
+
+			# Rank and limit inside the FTS table first, then join: only [limit] rows are read from [table_name]
+			query_stmt = "SELECT {0} FROM (SELECT rowid AS fts_rowid, rank AS fts_rank FROM {1} WHERE {1} MATCH ? ORDER BY rank LIMIT ?) AS hits JOIN {2} ON {2}.{3} = hits.fts_rowid ORDER BY hits.fts_rank;".format(
+				col, fts_name, table_name, key_column
+			)
+			if verbose:
+				print("Query Statement", query_stmt, expression)
+
+			if cursor == None:
+				cursor = conn.cursor()
+			return cursor.execute(query_stmt, (expression, limit)).fetchall()
+
+		def retrieve(self, conn, table_name, col="*", where_condition="", other_options="", cursor=None, commit=False, get_result=True, fetch="all", completion_msg="Retrieval completed.", verbose=True, params=None, cache=True):
+			"""
+			Query from Database Table and return the result using 'SELECT'
+
+			:: Params
+
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				table_name
+					Description: Your Table of choice
+					Type: String
+
+				col
+					Description: The column you want to select
+					Type: String
+					Default: "*" = Wildcard = All
+					Remarks:
+						- Please seperate all columns with delimiter ','
+
+				where_condition
+					Description: a filter / specifier for what you need (i.e. WHERE table=='name')
+					Type: String
+					Default: ""
+
+				other_options
+					Description: Other options to use in the query
+					Type: String
+					Default: ""
+
+				cursor
+					Description: The cursor object generated from the connection
+					Type: sqlite3.connect().cursor()
+					Default: None
+
+				commit
+					Description: Confirm if you want to commit your query changes
+					Type: Boolean
+					Default: False
+
+				get_result
+					Description: Confirm if you want to get the result of the query
+						- Correlated to the argument field 'fetch'
+					Type: Boolean
+					Default: True
+
+				fetch
+					Description: Confirm the number of results
+					Type: String
+					Default: "all"
+					Options: 
+						- {
+								"option" : "many",
+								"size" : "<number-of-rows>"
+						}
+						- one
+						- all 
+
+				completion_msg
 					Description: The message to display on completion.
 					Type: String
-					Default: "insert completed."
+					Default: "Retrieval completed."
+
+				verbose
+					Description: To set if you want messages to be displayed
+					Type: Boolean
+
+				params
+					Description: The values to bind to the placeholders used in 'where_condition'/'other_options'
+					Type: List|Tuple|Dictionary
+					Default: None
+					Examples:
+						retrieve(conn, "profiles", "username,password", "username=?", params=("asura",))
+
+				cache
+					Description: Use [self.result_cache] for this read
+						- False always reads the database and keeps the result out of the cache (i.e. credential lookups)
+					Type: Boolean
+					Default: True
+
+			:: Remarks
+				- If [self.result_cache] is set (SQLiteDBMgmt.ResultCache), repeated reads are answered from it until a write touches the table
 			"""
 			res = ""
 
-			# Generate and Execute Query
-			res = self.query_exec(conn, cursor, "INSERT INTO {} ({}) VALUES ({});".format(table_name, ",".join(list(value_definitions.keys())), ",".join(list(value_definitions.values()))), commit, get_result, fetch, completion_msg, verbose=verbose)
+			# Generate Query
+			query_stmt = self.select_stmt(table_name, col, where_condition, other_options)
+
+			if verbose:
+				print("Query Statement", query_stmt)
+
+			# Serve repeated reads from the result cache
+			cache_key = None
+			if (self.result_cache != None) and cache and get_result and (not commit):
+				cache_key = self.result_cache.make_key(conn, query_stmt, params, fetch)
+				hit, res = self.result_cache.get(cache_key)
+				if hit:
+					if verbose:
+						print("Result (cached): {}".format(res))
+					return res
+
+			# Execute Query
+			res = self.query_exec(conn, cursor, query_stmt, commit, get_result, fetch, completion_msg, verbose, params)
+
+			if verbose:
+				print("Result: {}".format(res))
 
 			# Data Validation: Null Value
-			if len(res) == 0:
+			if (res == None) or (len(res) == 0):
 				res = None
 
+			# Rows read inside a transaction() scope may never be committed
+			if (cache_key != None) and (self.last_error == None) and (transaction_scope(conn) == None):
+				self.result_cache.put(conn, cache_key, query_stmt, res)
+
 			return res
 
+		def select_stmt(self, table_name, col="*", where_condition="", other_options=""):
+			"""
+			Generate a 'SELECT' statement
 
-		def close_db(self, conn=None):
+			:: Returns
+				Value: SELECT {col} FROM {table_name} [WHERE {where_condition}] [{other_options}]
+				Type: String
 			"""
-			Close Database
+			if where_condition != "":
+				query_stmt = "SELECT {} FROM {} WHERE {}".format(col, table_name, where_condition)
+			else:
+				query_stmt = "SELECT {} FROM {}".format(col, table_name)
+
+			# Data Validation: Null Value
+			if other_options != "":
+				query_stmt += " {} ".format(other_options)
+
+			return query_stmt
+
+		def iter_retrieve(self, conn, table_name, col="*", where_condition="", other_options="", batch_size=1000, cursor=None, verbose=False, params=None):
 			"""
-			if not (conn == None):
-				conn.close()
-				conn = None
-			return conn
+			Query from Database Table using 'SELECT' and yield the rows one at a time
+				- Rows are read from SQLite with fetchmany([batch_size]), so at most one batch is held in memory
+				- Use this instead of retrieve() for exports/reports over whole tables
+
+			:: Params
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				table_name
+					Description: Your Table of choice
+					Type: String
+
+				col
+					Description: The column you want to select
+					Type: String
+					Default: "*" = Wildcard = All
+
+				where_condition
+					Description: a filter / specifier for what you need (i.e. WHERE table=='name')
+					Type: String
+					Default: ""
+
+				other_options
+					Description: Other options to use in the query
+					Type: String
+					Default: ""
+
+				batch_size
+					Description: Number of rows fetched from SQLite at a time
+					Type: Integer
+					Default: 1000
+
+				cursor
+					Description: The cursor object to iterate with
+						- Use a dedicated cursor; executing another statement on it stops the iteration
+					Type: sqlite3.connect().cursor()
+					Default: None (a new cursor is created)
+
+				verbose
+					Description: To set if you want messages to be displayed
+					Type: Boolean
+
+				params
+					Description: The values to bind to the placeholders used in 'where_condition'/'other_options'
+					Type: List|Tuple|Dictionary
+					Default: None
+
+			:: Returns
+				Value: Generator of rows
+				Type: Generator
+			"""
+			query_stmt = self.select_stmt(table_name, col, where_condition, other_options)
+
+			if verbose:
+				print("Query Statement", query_stmt)
+
+			# Data Validation: Null Value
+			if cursor == None:
+				cursor = conn.cursor()
+
+			if self.advisor != None:
+				self.advisor.record(query_stmt, params)
+
+			if params == None:
+				cursor.execute(query_stmt)
+			else:
+				cursor.execute(query_stmt, params)
+
+			try:
+				while True:
+					batch = cursor.fetchmany(batch_size)
+					if len(batch) == 0:
+						break
+					for row in batch:
+						yield row
+			finally:
+				cursor.close()
+
+		def paginate(self, conn, table_name, col="*", where_condition="", page_size=50, token=None, sort_column=None, descending=False, key_column="ROW_ID", cursor=None, verbose=False, params=None):
+			"""
+			Page through a Database Table with keyset (seek) pagination
+				- Instead of 'LIMIT n OFFSET m', every page seeks past the last row seen: WHERE (sort, ROW_ID) > (last_sort, last_ROW_ID)
+				- With an index on [sort_column] (or none, sorting on [key_column]) a deep page costs the same as the first page
+
+			:: Params
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				table_name
+					Description: Your Table of choice
+					Type: String
+
+				col
+					Description: The columns to return in each row
+					Type: String
+					Default: "*" = Wildcard = All
+
+				where_condition
+					Description: a filter applied to every page (i.e. "cpu_manufacturer=?")
+					Type: String
+					Default: ""
+
+				page_size
+					Description: Number of rows per page
+					Type: Integer
+					Default: 50
+
+				token
+					Description: The continuation token returned as "next"/"previous" by the previous call
+						- Only valid for the same table, columns, filter, params, sort and key_column; raises ValueError otherwise
+					Type: String
+					Default: None (First page)
+
+				sort_column
+					Description: An optional column to order by; ties are broken by [key_column]
+						- The column should be NOT NULL, rows with NULL values are skipped by the seek condition
+					Type: String
+					Default: None (Order by [key_column])
+
+				descending
+					Description: Sort in descending order
+					Type: Boolean
+					Default: False
+
+				key_column
+					Description: A unique column used as the tie-breaker of the cursor
+					Type: String
+					Default: ROW_ID
+
+				cursor
+					Description: The cursor object generated from the connection
+					Type: sqlite3.connect().cursor()
+					Default: None
+
+				verbose
+					Description: To set if you want messages to be displayed
+					Type: Boolean
+
+				params
+					Description: The values to bind to the placeholders used in 'where_condition'
+					Type: List|Tuple|Dictionary
+					Default: None
+
+			:: Returns
+				Value: The page and the tokens to move forward/backward
+				Type: Dictionary
+				Syntax:
+					{
+						"rows" : [<row>, ...],
+						"next" : "<token>" | None (Last page),
+						"previous" : "<token>" | None (First page)
+					}
+			"""
+			# Data Validation: Null Value
+			if cursor == None:
+				cursor = conn.cursor()
+
+			# Fingerprint of the rest of the query, so that a token cannot seek into a different result set
+			query_hash = hashlib.sha256(json.dumps([where_condition, col, params, key_column], sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+			# Decode the continuation token
+			direction = "forward"
+			last_seen = None
+			if token != None:
+				state = json.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+				if (state["t"] != table_name) or (state["s"] != sort_column) or (state["o"] != descending) or (state.get("q") != query_hash):
+					raise ValueError("Pagination token does not belong to this query")
+				direction = state["d"]
+				last_seen = state["v"]
+
+			key_cols = [key_column]
+			if sort_column != None:
+				key_cols = [sort_column, key_column]
+			number_of_keys = len(key_cols)
+
+			# Walking backward is walking forward in the opposite order
+			reverse = (descending != (direction == "backward"))
+			order = "DESC" if reverse else "ASC"
+			comparison = "<" if reverse else ">"
+
+			conditions = []
+			if where_condition != "":
+				conditions.append("({})".format(where_condition))
+
+			bind = params
+			if last_seen != None:
+				if isinstance(params, dict):
+					placeholders = [":__page_key_{}".format(i) for i in range(number_of_keys)]
+					bind = dict(params)
+					for i in range(number_of_keys):
+						bind["__page_key_{}".format(i)] = last_seen[i]
+				else:
+					placeholders = ["?"] * number_of_keys
+					bind = list(params if params != None else []) + list(last_seen)
+				conditions.append("({}) {} ({})".format(",".join(key_cols), comparison, ",".join(placeholders)))
+
+			# Generate Query: the cursor keys are selected in front of the requested columns, and stripped afterwards
+			query_stmt = self.select_stmt(
+				table_name,
+				"{}, {}".format(",".join(key_cols), col),
+				" AND ".join(conditions),
+				"ORDER BY {} LIMIT {}".format(", ".join(["{} {}".format(k, order) for k in key_cols]), int(page_size) + 1)
+			)
+
+			if verbose:
+				print("Query Statement", query_stmt)
+
+			if self.advisor != None:
+				self.advisor.record(query_stmt, bind)
+
+			if bind == None:
+				cursor.execute(query_stmt)
+			else:
+				cursor.execute(query_stmt, bind)
+			rows = cursor.fetchall()
+
+			has_more = len(rows) > page_size
+			rows = rows[:page_size]
+			if direction == "backward":
+				rows.reverse()
+
+			def make_token(row, token_direction):
+				state = {"t" : table_name, "s" : sort_column, "o" : descending, "q" : query_hash, "d" : token_direction, "v" : list(row[:number_of_keys])}
+				return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+			page = {"rows" : [row[number_of_keys:] for row in rows], "next" : None, "previous" : None}
+			if len(rows) > 0:
+				# Forward: more rows after if the page overflowed, rows before if we came from a token
+				# Backward: the opposite
+				if (direction == "forward" and has_more) or (direction == "backward"):
+					page["next"] = make_token(rows[-1], "forward")
+				if (direction == "forward" and token != None) or (direction == "backward" and has_more):
+					page["previous"] = make_token(rows[0], "backward")
+
+			return page
+
+		def insert(self, conn, table_name, value_definitions=None, where_condition="", other_options="", cursor=None, commit=False, get_result=True, fetch="all", completion_msg="insert completed.", verbose=False, parameterized=False):
+			"""
+			Query from Database Table and return the result using 'INSERT'
+
+			:: Params
+
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				table_name
+					Description: Your Table of choice
+					Type: String
+
+				values_definitions
+					Description: The new values you want to add into the table mapped to the column
+					Type: Dictionary
+					Default: None
+					Syntax:
+						{
+							"<column>" : <new-value>
+						}
+					Remarks:
+						- Please take note of your data type of the variables
+							- i.e.
+								- String: "string-value"
+								- Float (aka REAL): 1.0f
+								- Int: 0
+								- Boolean: True|False
+					Examples:
+						{
+							"name" : "asura",
+							"age" : 1000,
+							"money" : 10000.00f
+							"registered" : True
+						}
+
+				where_condition
+					Description: a filter / specifier for what you need (i.e. WHERE table=='name')
+					Type: String
+					Default: ""
+
+				other_options
+					Description: Other options to use in the query
+					Type: String
+					Default: ""
+
+				cursor
+					Description: The cursor object generated from the connection
+					Type: sqlite3.connect().cursor()
+					Default: None
+
+				commit
+					Description: Confirm if you want to commit your query changes
+					Type: Boolean
+					Default: False
+
+				get_result
+					Description: Confirm if you want to get the result of the query
+						- Correlated to the argument field 'fetch'
+					Type: Boolean
+					Default: True
+
+				fetch
+					Description: Confirm the number of results
+					Type: String
+					Default: "all"
+					Options: 
+						- {
+								"option" : "many",
+								"size" : "<number-of-rows>"
+						}
+						- one
+						- all 
+
+				completion_msg
+					Description: The message to display on completion.
+					Type: String
+					Default: "insert completed."
+
+				parameterized
+					Description: Bind the values in 'value_definitions' as named parameters instead of formatting them into the statement
+						- When True, pass raw python values (no manual quoting); the statement is identical for every row and is re-used from the statement cache
+						- When False, the values must already be SQL literals (i.e. "\"asura\"")
+					Type: Boolean
+					Default: False
+			"""
+			res = ""
+			columns = list(value_definitions.keys())
+
+			# Generate and Execute Query
+			if parameterized:
+				query_stmt = "INSERT INTO {} ({}) VALUES ({});".format(table_name, ",".join(columns), ",".join([":{}".format(c) for c in columns]))
+				res = self.query_exec(conn, cursor, query_stmt, commit, get_result, fetch, completion_msg, verbose=verbose, params=value_definitions)
+			else:
+				query_stmt = "INSERT INTO {} ({}) VALUES ({});".format(table_name, ",".join(columns), ",".join(list(value_definitions.values())))
+				res = self.query_exec(conn, cursor, query_stmt, commit, get_result, fetch, completion_msg, verbose=verbose)
+
+			# Data Validation: Null Value
+			if (res == None) or (len(res) == 0):
+				res = None
+
+			return res
+
+
+		def insert_many(self, conn, table_name, rows, columns=None, batch_size=1000, conflict="", cursor=None, commit=True, verbose=False):
+			"""
+			Bulk insert rows into a Database Table using executemany() in a single transaction
+
+			:: Params
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				table_name
+					Description: Your Table of choice
+					Type: String
+
+				rows
+					Description: The rows to insert; consumed lazily, so generators are streamed batch by batch
+					Type: Iterable of Dictionary|Tuple|List
+					Syntax:
+						Dictionary: {"<column>" : <value>, ...} => Bound as named parameters
+						Tuple|List: (<value>, ...) => Bound positionally, in the order of 'columns' (or of the table if 'columns' is None)
+					Remarks:
+						- Pass raw python values, values are bound and not formatted into the statement
+						- Every row must have the same shape as the first row
+
+				columns
+					Description: The columns to insert into
+					Type: List
+					Default: None
+						- Dictionary rows: The keys of the first row
+						- Tuple rows: All columns of the table, in table order
+
+				batch_size
+					Description: Number of rows sent to executemany() at a time
+					Type: Integer
+					Default: 1000
+
+				conflict
+					Description: Conflict resolution clause (i.e. "OR IGNORE", "OR REPLACE")
+						- "OR REPLACE" turns 'PRAGMA recursive_triggers' on, so that replaced rows leave the full-text index
+					Type: String
+					Default: ""
+
+				cursor
+					Description: The cursor object generated from the connection
+					Type: sqlite3.connect().cursor()
+					Default: None
+
+				commit
+					Description: Commit once after the last batch
+						- Set to False to leave the transaction open for the caller to commit
+					Type: Boolean
+					Default: True
+
+				verbose
+					Description: To set if you want messages to be displayed
+					Type: Boolean
+
+			:: Returns
+				Value: Statistics of the load
+				Type: Dictionary
+				Syntax:
+					{
+						"rows" : <number-of-rows-inserted>,
+						"batches" : <number-of-executemany-calls>,
+						"seconds" : <elapsed-time>,
+						"rows_per_sec" : <throughput>
+					}
+
+			:: Remarks
+				- Unlike query_exec(), errors are not swallowed: the transaction is rolled back and the exception is raised,
+				  so a partially loaded feed is never committed
+				- Inside a SQLiteDBMgmt.transaction() scope, the commit is left to the scope
+			"""
+			stats = {"rows" : 0, "batches" : 0, "seconds" : 0.0, "rows_per_sec" : 0.0}
+			start = time.perf_counter()
+
+			# Data Validation: Null Value
+			if cursor == None:
+				cursor = conn.cursor()
+
+			rows = iter(rows)
+			first_row = next(rows, None)
+			if first_row == None:
+				return stats
+
+			# Generate Query
+			if isinstance(first_row, dict):
+				if columns == None:
+					columns = list(first_row.keys())
+				placeholders = ",".join([":{}".format(c) for c in columns])
+			else:
+				placeholders = ",".join(["?"] * len(first_row))
+
+			if "REPLACE" in conflict.upper():
+				conn.execute("PRAGMA recursive_triggers = ON;")		# Fire the DELETE triggers of the replaced rows (see create_fts_index)
+
+			if columns == None:
+				query_stmt = "INSERT {} INTO {} VALUES ({});".format(conflict, table_name, placeholders)
+			else:
+				query_stmt = "INSERT {} INTO {} ({}) VALUES ({});".format(conflict, table_name, ",".join(columns), placeholders)
+
+			if verbose:
+				print(query_stmt)
+
+			# Execute in batches inside one transaction
+			rows = itertools.chain([first_row], rows)
+			instrumentation = self.instrumentation
+			if instrumentation != None:
+				token = instrumentation.start(conn)
+			with connection_lock(conn):
+				try:
+					if not conn.in_transaction:
+						cursor.execute("BEGIN")
+					while True:
+						batch = list(itertools.islice(rows, batch_size))
+						if len(batch) == 0:
+							break
+						cursor.executemany(query_stmt, batch)
+						stats["rows"] += len(batch)
+						stats["batches"] += 1
+						if verbose:
+							print("Batch {} : {} rows".format(stats["batches"], stats["rows"]))
+					if commit:
+						self.commit(conn)
+				except Exception as e:
+					if instrumentation != None:
+						instrumentation.finish(conn, token, query_stmt, None, stats["rows"], e)
+					# Inside a transaction() scope, the scope decides: it rolls back when the exception leaves it
+					if transaction_scope(conn) == None:
+						conn.rollback()
+						if self.result_cache != None:
+							self.result_cache.invalidate_stmt(conn, "ROLLBACK")
+					raise
+
+			if instrumentation != None:
+				instrumentation.finish(conn, token, query_stmt, None, stats["rows"])
+
+			if self.result_cache != None:
+				self.invalidate_stmt(conn, query_stmt)
+
+			stats["seconds"] = time.perf_counter() - start
+			if stats["seconds"] > 0:
+				stats["rows_per_sec"] = stats["rows"] / stats["seconds"]
+
+			if verbose:
+				print("Inserted {} rows in {:.3f}s ({:.0f} rows/sec)".format(stats["rows"], stats["seconds"], stats["rows_per_sec"]))
+
+			return stats
+
+		def export_csv(self, conn, table_name, file_path, col="*", where_condition="", other_options="", batch_size=5000, header=True, buffer_size=1048576, progress_callback=None, verbose=False, params=None):
+			"""
+			Export a Database Table to a CSV file, streamed straight from the cursor
+				- Rows are read with fetchmany([batch_size]) and written with a buffered writer,
+				  so at most one batch is held in memory regardless of the table size
+
+			:: Params
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				table_name
+					Description: The table to export
+					Type: String
+
+				file_path
+					Description: The CSV file to write (overwritten)
+					Type: String
+
+				col
+					Description: The columns to export (projection)
+					Type: String|List
+					Default: "*" = All
+
+				where_condition
+					Description: a filter / specifier for the rows to export
+					Type: String
+					Default: ""
+
+				other_options
+					Description: Other options to use in the query (i.e. "ORDER BY ROW_ID")
+					Type: String
+					Default: ""
+
+				batch_size
+					Description: Number of rows fetched and written at a time
+					Type: Integer
+					Default: 5000
+
+				header
+					Description: Write the column names as the first line
+					Type: Boolean
+					Default: True
+
+				buffer_size
+					Description: Size of the file write buffer in bytes
+					Type: Integer
+					Default: 1048576 (1 MiB)
+
+				progress_callback
+					Description: Function called after every batch with the number of rows written so far
+					Type: Function
+					Syntax: progress_callback(rows_written)
+					Default: None
+
+				verbose
+					Description: To set if you want messages to be displayed
+					Type: Boolean
+
+				params
+					Description: The values to bind to the placeholders used in 'where_condition'/'other_options'
+					Type: List|Tuple|Dictionary
+					Default: None
+
+			:: Returns
+				Value: Number of rows written
+				Type: Integer
+			"""
+			if isinstance(col, (list, tuple)):
+				col = ",".join(col)
+
+			query_stmt = self.select_stmt(table_name, col, where_condition, other_options)
+			if verbose:
+				print("Query Statement", query_stmt)
+
+			cursor = conn.cursor()
+			rows_written = 0
+			try:
+				if params == None:
+					cursor.execute(query_stmt)
+				else:
+					cursor.execute(query_stmt, params)
+
+				with open(file_path, "w", newline="", encoding="utf-8", buffering=buffer_size) as csv_file:
+					writer = csv.writer(csv_file)
+					if header:
+						writer.writerow([d[0] for d in cursor.description])
+					while True:
+						batch = cursor.fetchmany(batch_size)
+						if len(batch) == 0:
+							break
+						writer.writerows(batch)
+						rows_written += len(batch)
+						if progress_callback != None:
+							progress_callback(rows_written)
+			finally:
+				cursor.close()
+
+			if verbose:
+				print("Exported {} rows from {} to {}".format(rows_written, table_name, file_path))
+
+			return rows_written
+
+		def import_file(self, conn, table_name, file_path, col_definitions, file_format=None, chunk_size=5000, workers=None, dry_run=False, conflict="", max_errors=100, verbose=False):
+			"""
+			Import/Recover a table from a CSV, JSON or JSON Lines file
+				- The reader streams records in chunks to a worker pool that parses/validates/coerces them (coerce_rows())
+				- The calling thread is the single writer: valid rows go to insert_many() inside one transaction
+				- Chunks are consumed in file order and at most [workers * 2] chunks are in flight, so memory stays bounded
+				  for CSV and JSON Lines; a JSON array is loaded into memory in full first (use JSON Lines for large files)
+
+			:: Params
+				conn
+					Description: Your Database Connection Object
+					Type: sqlite3.connect("<database-name>")
+
+				table_name
+					Description: The table to import into
+					Type: String
+
+				file_path
+					Description: The file to import
+					Type: String
+
+				col_definitions
+					Description: The column definitions of the table, used for validation and type coercion
+					Type: Dictionary (see create_table())
+
+				file_format
+					Description: csv | json | jsonl
+						- csv   : First line is the header (as written by export_csv())
+						- json  : A single array of objects, loaded in full; the columns are the fields of all objects
+						- jsonl : One object per line, streamed; the columns are the fields of the first object,
+						          later objects with other fields are rejected
+					Type: String
+					Default: None (from the file extension)
+
+				chunk_size
+					Description: Number of records per worker job and per insert batch
+					Type: Integer
+					Default: 5000
+
+				workers
+					Description: Number of worker processes
+					Type: Integer
+					Default: None (os.cpu_count(), or in the calling process on a single CPU)
+					Remarks:
+						- 0 : Parse in the calling process (no pool)
+
+				dry_run
+					Description: Validate the file only; nothing is written to the database
+					Type: Boolean
+					Default: False
+
+				conflict
+					Description: Conflict resolution clause for the insert (i.e. "OR IGNORE", "OR REPLACE")
+					Type: String
+					Default: ""
+
+				max_errors
+					Description: Maximum number of errors kept in the result
+					Type: Integer
+					Default: 100
+
+				verbose
+					Description: To set if you want messages to be displayed
+					Type: Boolean
+
+			:: Returns
+				Value: Import statistics
+				Type: Dictionary
+				Syntax:
+					{
+						"rows_read" : <number-of-records>,
+						"rows_inserted" : <number-of-rows-written> (0 on dry run),
+						"rows_rejected" : <number-of-invalid-records>,
+						"errors" : [(<record-number>, "<message>"), ...],
+						"seconds" : <elapsed-time>,
+						"rows_per_sec" : <records-processed-per-second>
+					}
+
+			:: Remarks
+				- Invalid records are skipped and reported; any database error rolls back the whole import
+			"""
+			stats = {"rows_read" : 0, "rows_inserted" : 0, "rows_rejected" : 0, "errors" : [], "seconds" : 0.0, "rows_per_sec" : 0.0}
+			start = time.perf_counter()
+
+			if file_format == None:
+				file_format = os.path.splitext(file_path)[1].lstrip(".").lower()
+			if file_format not in ("csv", "json", "jsonl"):
+				raise ValueError("Unsupported import format: {}".format(file_format))
+
+			with open(file_path, newline="", encoding="utf-8") as import_file:
+				# Determine the columns and build the record reader
+				if file_format == "csv":
+					reader = csv.reader(import_file)
+					columns = next(reader, [])
+					records = reader
+				elif file_format == "json":
+					# json.load() needs the whole array in memory; JSON Lines and CSV are the streaming formats
+					records = json.load(import_file)
+					if not isinstance(records, list):
+						raise ValueError("Expected a JSON array of objects in {}".format(file_path))
+					fields = {}
+					for record in records:
+						if isinstance(record, dict):
+							fields.update(dict.fromkeys(record))
+					columns = list(fields.keys())
+				else:
+					records = (line for line in import_file if line.strip() != "")
+					first_line = next(records, None)
+					columns = list(json.loads(first_line).keys()) if first_line != None else []
+					if first_line != None:
+						records = itertools.chain([first_line], records)
+
+				unknown = [c for c in columns if c not in col_definitions]
+				if len(unknown) > 0:
+					raise ValueError("Unknown columns for {}: {}".format(table_name, ", ".join(unknown)))
+				if len(columns) == 0:
+					return stats
+
+				def chunks():
+					line = 1
+					records_iter = iter(records)
+					while True:
+						chunk = list(itertools.islice(records_iter, chunk_size))
+						if len(chunk) == 0:
+							break
+						yield chunk, line
+						line += len(chunk)
+
+				def valid_rows(results):
+					for rows, errors in results:
+						stats["rows_read"] += len(rows) + len(errors)
+						stats["rows_rejected"] += len(errors)
+						stats["errors"].extend(errors[:max(max_errors - len(stats["errors"]), 0)])
+						if verbose:
+							print("{} : {} records processed".format(table_name, stats["rows_read"]))
+						for row in rows:
+							yield row
+
+				def parse_serial():
+					for chunk, line in chunks():
+						yield coerce_rows(chunk, line, columns, col_definitions, file_format)
+
+				def parse_parallel(executor, in_flight):
+					pending = collections.deque()
+					for chunk, line in chunks():
+						pending.append(executor.submit(coerce_rows, chunk, line, columns, col_definitions, file_format))
+						if len(pending) >= in_flight:
+							yield pending.popleft().result()
+					while len(pending) > 0:
+						yield pending.popleft().result()
+
+				def load(results):
+					if dry_run:
+						for row in valid_rows(results):
+							pass
+					else:
+						res = self.insert_many(conn, table_name, valid_rows(results), columns, chunk_size, conflict)
+						stats["rows_inserted"] = res["rows"]
+
+				if workers == None:
+					workers = os.cpu_count() or 1
+					if workers == 1:
+						workers = 0
+				if workers == 0:
+					load(parse_serial())
+				else:
+					# Imported here: loading multiprocessing costs more than the rest of this module at startup
+					from concurrent.futures import ProcessPoolExecutor
+					with ProcessPoolExecutor(max_workers=workers) as executor:
+						load(parse_parallel(executor, workers * 2))
+
+			stats["seconds"] = time.perf_counter() - start
+			if stats["seconds"] > 0:
+				stats["rows_per_sec"] = stats["rows_read"] / stats["seconds"]
+
+			if verbose:
+				print("Imported {} of {} records into {} in {:.3f}s ({:.0f} records/sec, {} rejected){}".format(
+					stats["rows_inserted"], stats["rows_read"], table_name, stats["seconds"], stats["rows_per_sec"], stats["rows_rejected"],
+					" [dry run]" if dry_run else ""
+				))
+
+			return stats
+
+		def close_db(self, conn=None):
+			"""
+			Close Database
+			"""
+			if not (conn == None):
+				if self.result_cache != None:
+					self.result_cache.forget(conn)
+				conn.close()
+				conn = None
+			return conn
+
+	class ConnectionPool():
+		"""
+		Thread-safe SQLite3 connection pool
+			- Readers : One read-only connection per thread, up to [max_size] connections
+				- reader() may be nested: the inner block gets the same connection, which is released by the outermost block
+			- Writer  : A single connection shared by all threads, serialized with a lock
+				- BaseUtilities (query_exec(), insert_many(), ...) and SQLiteDBMgmt.transaction() take the same lock when given
+				  the writer connection (SQLiteDBMgmt.conn in pool mode); hold writer() for direct conn.execute() calls
+
+		The database is switched to WAL journal mode so that readers are not blocked while the writer is saving.
+
+		:: Usage
+			pool = SQLiteDBMgmt.ConnectionPool("PCPartsList.db")
+			with pool.reader() as conn:
+				conn.execute("SELECT * FROM designs").fetchall()
+			with pool.writer() as conn:
+				conn.execute("INSERT INTO designs (case_name) VALUES (?)", ("Meshify C",))
+		"""
+		def __init__(self, full_path, max_size=8, idle_timeout=60.0, statement_cache_size=128, timeout=30.0, profile=None):
+			"""
+			Initialize
+
+			:: Params
+				full_path
+					Description: The path to the database file
+					Type: String
+
+				max_size
+					Description: Maximum number of read connections
+						- When all are in use, acquiring threads wait until one is released
+					Type: Integer
+					Default: 8
+
+				idle_timeout
+					Description: Seconds after which a released read connection is closed
+					Type: Float
+					Default: 60.0
+
+				statement_cache_size
+					Description: Number of compiled statements cached per connection
+					Type: Integer
+					Default: 128
+
+				timeout
+					Description: Seconds to wait on a database lock (sqlite3.connect(timeout=...))
+					Type: Float
+					Default: 30.0
+
+				profile
+					Description: The storage-performance profile applied to every pooled connection
+						- The journal mode and query_only settings of the profile are ignored, the pool always uses WAL and only the readers are read-only
+					Type: String|Dictionary
+					Default: None
+			"""
+			self.full_path = full_path
+			self.max_size = max_size
+			self.idle_timeout = idle_timeout
+			self.statement_cache_size = statement_cache_size
+			self.timeout = timeout
+			self.profile = profile
+			if isinstance(profile, str):
+				self.profile = STORAGE_PROFILES[profile]
+			if self.profile != None:
+				self.profile = dict(self.profile, journal_mode=None, query_only=None)
+			self.utils = SQLiteDBMgmt.BaseUtilities()
+
+			self.lock = threading.Lock()
+			self.available = threading.Condition(self.lock)
+			self.readers = {}	# thread ident : {"conn" : connection, "in_use" : Boolean, "depth" : <open reader() blocks>, "last_used" : time}
+			self.counters = {"hits" : 0, "misses" : 0, "evictions" : 0, "waits" : 0}
+
+			self.writer_lock = threading.RLock()
+			self.writer_conn = self.open_connection()
+			self.writer_conn.execute("PRAGMA journal_mode=WAL;")
+			CONNECTION_LOCKS[id(self.writer_conn)] = self.writer_lock
+
+		def open_connection(self, read_only=False):
+			"""
+			Open a connection usable from any thread
+			"""
+			conn = self.utils.open_db(self.full_path, {"check_same_thread" : False, "timeout" : self.timeout}, self.statement_cache_size, self.profile)
+			if read_only:
+				conn.execute("PRAGMA query_only=ON;")
+			return conn
+
+		def evict_idle(self, now=None):
+			"""
+			Close read connections that have not been used for [idle_timeout] seconds
+
+			:: Remarks
+				- Must be called with self.lock held
+			"""
+			if now == None:
+				now = time.monotonic()
+			for ident in list(self.readers.keys()):
+				entry = self.readers[ident]
+				if (not entry["in_use"]) and (now - entry["last_used"] >= self.idle_timeout):
+					entry["conn"].close()
+					del self.readers[ident]
+					self.counters["evictions"] += 1
+
+		def evict_lru(self):
+			"""
+			Close the least recently used idle read connection to make room for a new thread
+
+			:: Remarks
+				- Must be called with self.lock held
+
+			:: Returns
+				Value: True if a connection was evicted
+				Type: Boolean
+			"""
+			idle = [(entry["last_used"], ident) for ident, entry in self.readers.items() if not entry["in_use"]]
+			if len(idle) == 0:
+				return False
+			_, ident = min(idle)
+			self.readers.pop(ident)["conn"].close()
+			self.counters["evictions"] += 1
+			return True
+
+		def acquire_reader(self):
+			"""
+			Get the read connection of the calling thread, opening one if required
+
+			:: Returns
+				Value: Read-only connection
+				Type: sqlite3.Connection
+			"""
+			ident = threading.get_ident()
+			with self.available:
+				self.evict_idle()
+				entry = self.readers.get(ident)
+				if entry != None:
+					self.counters["hits"] += 1
+					entry["in_use"] = True
+					entry["depth"] += 1
+					return entry["conn"]
+
+				self.counters["misses"] += 1
+				while len(self.readers) >= self.max_size:
+					if self.evict_lru():
+						break
+					self.counters["waits"] += 1
+					self.available.wait()
+
+				# Reserve the slot before opening the connection outside of the lock
+				entry = {"conn" : None, "in_use" : True, "depth" : 1, "last_used" : time.monotonic()}
+				self.readers[ident] = entry
+
+			try:
+				entry["conn"] = self.open_connection(read_only=True)
+			except Exception:
+				with self.available:
+					del self.readers[ident]
+					self.available.notify()
+				raise
+			return entry["conn"]
+
+		def release_reader(self):
+			"""
+			Release the read connection of the calling thread
+				- Only the outermost release (one per acquire_reader()) ends its read transaction and marks it idle
+			"""
+			with self.available:
+				entry = self.readers.get(threading.get_ident())
+				if entry == None:
+					self.available.notify()
+					return
+				entry["depth"] -= 1
+				if entry["depth"] > 0:
+					return
+
+			try:
+				# End the implicit read transaction so the WAL can be checkpointed
+				if (entry["conn"] != None) and entry["conn"].in_transaction:
+					entry["conn"].rollback()
+			finally:
+				with self.available:
+					entry["in_use"] = False
+					entry["last_used"] = time.monotonic()
+					self.available.notify()
+
+		@contextmanager
+		def reader(self):
+			"""
+			Context manager yielding the read connection of the calling thread
+				- Nested blocks on the same thread share the connection and its read transaction
+			"""
+			conn = self.acquire_reader()
+			try:
+				yield conn
+			finally:
+				self.release_reader()
+
+		@contextmanager
+		def writer(self):
+			"""
+			Context manager yielding the writer connection
+				- Only one thread holds the writer at a time
+				- Commits on success, rolls back on error
+			"""
+			with self.writer_lock:
+				try:
+					yield self.writer_conn
+				except Exception:
+					self.writer_conn.rollback()
+					raise
+				else:
+					if self.writer_conn.in_transaction:
+						self.writer_conn.commit()
+
+		def stats(self):
+			"""
+			Pool statistics
+
+			:: Returns
+				Value: {"hits", "misses", "evictions", "waits", "size", "in_use", "max_size"}
+				Type: Dictionary
+			"""
+			with self.lock:
+				res = dict(self.counters)
+				res["size"] = len(self.readers)
+				res["in_use"] = len([e for e in self.readers.values() if e["in_use"]])
+				res["max_size"] = self.max_size
+			return res
+
+		def close(self):
+			"""
+			Close every pooled connection
+			"""
+			with self.available:
+				for entry in self.readers.values():
+					if entry["conn"] != None:
+						entry["conn"].close()
+				self.readers = {}
+				self.available.notify_all()
+			with self.writer_lock:
+				if self.writer_conn != None:
+					CONNECTION_LOCKS.pop(id(self.writer_conn), None)
+				self.writer_conn = self.utils.close_db(self.writer_conn)
+
+	class QueryAdvisor():
+		"""
+		Index advisor using 'EXPLAIN QUERY PLAN' on the queries recorded by BaseUtilities
+			- Flags full table scans and suggests indexes for them, measuring the gain on the real data
+			- Flags redundant indexes (on the INTEGER PRIMARY KEY, prefixes of other indexes, unused by every recorded query)
+
+		:: Usage
+			utils.advisor = SQLiteDBMgmt.QueryAdvisor()
+			... run the application ...
+			report = utils.advisor.analyze(conn)
+			print(utils.advisor.format_report(report))
+		"""
+		# <column> <operator> in a WHERE clause
+		condition_pattern = re.compile(r"([A-Za-z_][A-Za-z0-9_]*\.)?([A-Za-z_][A-Za-z0-9_]*)\s*(==|=|<=|>=|<>|!=|<|>|\bLIKE\b|\bIN\b|\bBETWEEN\b|\bIS\b)", re.IGNORECASE)
+		# FROM/JOIN/UPDATE <table> [AS] [alias]
+		table_pattern = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+([A-Za-z_][A-Za-z0-9_]*)(?:\s+(?:AS\s+)?([A-Za-z_][A-Za-z0-9_]*))?", re.IGNORECASE)
+		keywords = set(["WHERE", "JOIN", "LEFT", "INNER", "CROSS", "OUTER", "ON", "ORDER", "GROUP", "LIMIT", "SET", "USING", "NATURAL", "HAVING", "WINDOW", "UNION", "EXCEPT", "INTERSECT"])
+
+		def __init__(self, max_queries=1000):
+			"""
+			Initialize
+
+			:: Params
+				max_queries
+					Description: Maximum number of distinct statements recorded
+					Type: Integer
+					Default: 1000
+			"""
+			self.max_queries = max_queries
+			self.queries = collections.OrderedDict()	# normalized statement : {"stmt", "params", "count"}
+			self.lock = threading.Lock()
+
+		def record(self, query_stmt, params=None):
+			"""
+			Record an executed statement (SELECT/UPDATE/DELETE only) with the first parameters seen for it
+			"""
+			stmt = normalize_stmt(query_stmt)
+			if stmt.split(" ", 1)[0].upper() not in ("SELECT", "UPDATE", "DELETE", "WITH"):
+				return
+			with self.lock:
+				entry = self.queries.get(stmt)
+				if entry != None:
+					entry["count"] += 1
+				elif len(self.queries) < self.max_queries:
+					self.queries[stmt] = {"stmt" : stmt, "params" : params, "count" : 1}
+
+		def tables_of(self, stmt):
+			"""
+			Map the aliases/names used in a statement to their table names
+			"""
+			aliases = {}
+			for table, alias in self.table_pattern.findall(stmt):
+				aliases[table] = table
+				if alias != "" and alias.upper() not in self.keywords:
+					aliases[alias] = table
+			return aliases
+
+		def explain(self, conn, stmt, params=None):
+			"""
+			Get the 'EXPLAIN QUERY PLAN' detail lines of a statement
+			"""
+			if params == None:
+				rows = conn.execute("EXPLAIN QUERY PLAN {}".format(stmt)).fetchall()
+			else:
+				rows = conn.execute("EXPLAIN QUERY PLAN {}".format(stmt), params).fetchall()
+			return [row[3] for row in rows]
+
+		def time_query(self, conn, stmt, params=None, repeat=5):
+			"""
+			Best time in milliseconds of [repeat] executions of a SELECT statement
+			"""
+			best = None
+			for i in range(repeat):
+				start = time.perf_counter()
+				if params == None:
+					conn.execute(stmt).fetchall()
+				else:
+					conn.execute(stmt, params).fetchall()
+				elapsed = (time.perf_counter() - start) * 1000
+				if best == None or elapsed < best:
+					best = elapsed
+			return best
+
+		def candidate_columns(self, conn, stmt, table, alias):
+			"""
+			Columns of [table] to index for a statement: equality conditions first, then one range condition,
+			or the ORDER BY columns when nothing in the WHERE clause applies
+			"""
+			table_columns = set([row[1] for row in conn.execute("PRAGMA table_info({})".format(table)).fetchall()])
+			upper = stmt.upper()
+			where = ""
+			if " WHERE " in upper:
+				where = stmt[upper.index(" WHERE ") + 7:]
+				for clause in (" GROUP BY ", " ORDER BY ", " LIMIT "):
+					if clause in where.upper():
+						where = where[:where.upper().index(clause)]
+
+			equality = []
+			ranges = []
+			for prefix, col, operator in self.condition_pattern.findall(where):
+				if prefix != "" and prefix[:-1] not in (table, alias):
+					continue
+				if col not in table_columns:
+					continue
+				if operator.upper() in ("=", "==", "IN", "IS"):
+					if col not in equality:
+						equality.append(col)
+				elif col not in ranges:
+					ranges.append(col)
+
+			columns = equality + [c for c in ranges if c not in equality][:1]
+			if len(columns) == 0 and " ORDER BY " in upper:
+				order_by = stmt[upper.index(" ORDER BY ") + 10:].split(" LIMIT ")[0]
+				for term in order_by.split(","):
+					col = term.strip().split(" ")[0].split(".")[-1]
+					if col in table_columns and col not in columns:
+						columns.append(col)
+			return columns
+
+		def index_definitions(self, conn, table):
+			"""
+			Get the indexes of a table
+
+			:: Returns
+				Value: [{"name", "unique", "origin", "partial", "columns"}, ...]
+				Type: List
+			"""
+			indexes = []
+			for seq, name, unique, origin, partial in conn.execute("PRAGMA index_list({})".format(table)).fetchall():
+				columns = [row[2] for row in conn.execute("PRAGMA index_info({})".format(name)).fetchall()]
+				indexes.append({"name" : name, "unique" : unique == 1, "origin" : origin, "partial" : partial == 1, "columns" : columns})
+			return indexes
+
+		def rowid_alias(self, conn, table):
+			"""
+			Get the INTEGER PRIMARY KEY column (the rowid alias) of a table, or None
+			"""
+			pk = [row for row in conn.execute("PRAGMA table_info({})".format(table)).fetchall() if row[5] > 0]
+			if len(pk) == 1 and pk[0][2].upper() == "INTEGER":
+				return pk[0][1]
+			return None
+
+		def analyze(self, conn, measure=True, repeat=5):
+			"""
+			Analyze the recorded queries
+
+			:: Params
+				conn
+					Description: The connection to analyze (the same database the queries ran against)
+					Type: sqlite3.connect()
+
+				measure
+					Description: Measure each suggested index by creating it inside a SAVEPOINT that is rolled back afterwards
+						- Only SELECT statements are timed
+					Type: Boolean
+					Default: True
+
+				repeat
+					Description: Executions per measurement (the best time is kept)
+					Type: Integer
+					Default: 5
+
+			:: Returns
+				Value: The analysis
+				Type: Dictionary
+				Syntax:
+					{
+						"queries" : [{"stmt", "count", "plan" : [<detail>, ...], "full_scans" : [<table>, ...]}, ...],
+						"suggestions" : [{"table", "columns", "stmt", "queries" : [<stmt>, ...], "before_ms", "after_ms", "speedup"}, ...],
+						"redundant_indexes" : [{"table", "index", "reason"}, ...]
+					}
+			"""
+			report = {"queries" : [], "suggestions" : [], "redundant_indexes" : []}
+			used_indexes = set()
+			queried_tables = set()
+			suggestions = collections.OrderedDict()	# (table, columns) : suggestion
+
+			with self.lock:
+				entries = list(self.queries.values())
+
+			# 1. Plans and full scans
+			for entry in entries:
+				try:
+					plan = self.explain(conn, entry["stmt"], entry["params"])
+				except db.Error as e:
+					report["queries"].append({"stmt" : entry["stmt"], "count" : entry["count"], "plan" : ["error: {}".format(e)], "full_scans" : []})
+					continue
+
+				aliases = self.tables_of(entry["stmt"])
+				queried_tables.update(aliases.values())
+				full_scans = []
+				for detail in plan:
+					# A virtual table (i.e. FTS5) picks its own access path: "SCAN designs_fts VIRTUAL TABLE INDEX 0:M3" is neither a full scan nor a named index
+					if "VIRTUAL TABLE" in detail:
+						continue
+					words = detail.split(" ")
+					if " INDEX " in " {} ".format(detail):
+						used_indexes.add(words[words.index("INDEX") + 1])
+					if len(words) >= 2 and words[0] == "SCAN" and ("USING" not in words):
+						alias = words[1]
+						table = aliases.get(alias, alias)
+						full_scans.append(table)
+						columns = self.candidate_columns(conn, entry["stmt"], table, alias)
+						if len(columns) > 0:
+							key = (table, tuple(columns))
+							if key not in suggestions:
+								suggestions[key] = {
+									"table" : table, "columns" : columns, "queries" : [],
+									"stmt" : "CREATE INDEX idx_{}_{} ON {} ({});".format(table, "_".join(columns), table, ", ".join(columns)),
+									"before_ms" : None, "after_ms" : None, "speedup" : None,
+								}
+							suggestions[key]["queries"].append(entry)
+				report["queries"].append({"stmt" : entry["stmt"], "count" : entry["count"], "plan" : plan, "full_scans" : full_scans})
+
+			# 2. Measure the suggested indexes
+			for suggestion in suggestions.values():
+				selects = [e for e in suggestion["queries"] if e["stmt"].upper().startswith("SELECT")]
+				if measure and len(selects) > 0:
+					before = sum([self.time_query(conn, e["stmt"], e["params"], repeat) for e in selects])
+					conn.execute("SAVEPOINT query_advisor;")
+					try:
+						conn.execute(suggestion["stmt"])
+						after = sum([self.time_query(conn, e["stmt"], e["params"], repeat) for e in selects])
+					finally:
+						conn.execute("ROLLBACK TO query_advisor;")
+						conn.execute("RELEASE query_advisor;")
+					suggestion["before_ms"] = before
+					suggestion["after_ms"] = after
+					if after > 0:
+						suggestion["speedup"] = before / after
+				suggestion["queries"] = [e["stmt"] for e in suggestion["queries"]]
+				report["suggestions"].append(suggestion)
+
+			# 3. Redundant indexes
+			tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';").fetchall()]
+			for table in tables:
+				indexes = self.index_definitions(conn, table)
+				rowid = self.rowid_alias(conn, table)
+				for index in indexes:
+					reason = None
+					if rowid != None and len(index["columns"]) > 0 and index["columns"][0] == rowid:
+						reason = "leads with the INTEGER PRIMARY KEY {}, which is the rowid and already unique and indexed".format(rowid)
+					else:
+						for other in indexes:
+							if other["name"] == index["name"] or index["partial"] or other["partial"] or (None in index["columns"]):
+								continue
+							is_prefix = other["columns"][:len(index["columns"])] == index["columns"]
+							if is_prefix and (not index["unique"]) and (len(other["columns"]) > len(index["columns"]) or index["name"] > other["name"]):
+								reason = "is a prefix of {} ({})".format(other["name"], ", ".join(other["columns"]))
+								break
+					if reason == None and table in queried_tables and index["name"] not in used_indexes:
+						reason = "is not used by any recorded query"
+						if index["unique"]:
+							reason += " (only enforces a UNIQUE constraint, drop it if the column does not need to be unique)"
+					if reason != None:
+						report["redundant_indexes"].append({"table" : table, "index" : index["name"], "columns" : index["columns"], "reason" : reason})
+
+			return report
+
+		def format_report(self, report):
+			"""
+			Format the result of analyze() as text
+			"""
+			lines = ["=== Query Plans ==="]
+			for query in report["queries"]:
+				lines.append("[{}x] {}".format(query["count"], query["stmt"]))
+				for detail in query["plan"]:
+					lines.append("\t{}".format(detail))
+				if len(query["full_scans"]) > 0:
+					lines.append("\t=> FULL SCAN of {}".format(", ".join(query["full_scans"])))
+
+			lines.append("=== Index Suggestions ===")
+			for suggestion in report["suggestions"]:
+				lines.append(suggestion["stmt"])
+				if suggestion["speedup"] != None:
+					lines.append("\t{:.3f} ms => {:.3f} ms ({:.1f}x) over {} queries".format(suggestion["before_ms"], suggestion["after_ms"], suggestion["speedup"], len(suggestion["queries"])))
+
+			lines.append("=== Redundant Indexes ===")
+			for index in report["redundant_indexes"]:
+				lines.append("{}.{} ({}) {}".format(index["table"], index["index"], ", ".join([str(c) for c in index["columns"]]), index["reason"]))
+
+			return "\n".join(lines)
+
+	class Instrumentation():
+		"""
+		Per-statement timing for BaseUtilities: latency histogram, rows, errors and a slow-query log
+			- Statements are grouped by their normalized text, so bind parameters (params=...) to get one entry per statement
+			- attach(conn) adds a trace callback counting every statement SQLite runs on the connection,
+			  including direct conn.execute() calls and trigger bodies, and optionally a progress handler
+			  counting virtual machine steps per statement
+			- Disabled (utils.instrumentation = None, the default) it costs one attribute check per call
+
+		:: Usage
+			utils.instrumentation = SQLiteDBMgmt.Instrumentation(slow_threshold=0.05, slow_log_path="slow-queries.jsonl")
+			utils.instrumentation.attach(conn)
+			... run the application ...
+			print(utils.instrumentation.format_report())
+			utils.instrumentation.dump("query-stats.json")
+		"""
+		# Upper bounds (seconds) of the latency histogram buckets; the last bucket counts everything slower
+		histogram_bounds = [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+		# String and number literals, replaced by '?' to group traced statements (the trace callback sees the values inlined)
+		literal_pattern = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+		def __init__(self, slow_threshold=0.1, slow_log_size=100, slow_log_path=None, max_statements=1000):
+			"""
+			Initialize
+
+			:: Params
+				slow_threshold
+					Description: Statements taking at least this many seconds are added to the slow-query log
+					Type: Float
+					Default: 0.1
+
+				slow_log_size
+					Description: Number of slow queries kept in memory (the oldest are dropped)
+					Type: Integer
+					Default: 100
+
+				slow_log_path
+					Description: File to which every slow query is also appended, as one JSON object per line
+					Type: String
+					Default: None
+
+				max_statements
+					Description: Maximum number of distinct statements tracked; any further statement is counted under "<other>"
+					Type: Integer
+					Default: 1000
+			"""
+			self.slow_threshold = slow_threshold
+			self.slow_log_path = slow_log_path
+			self.max_statements = max_statements
+			self.lock = threading.Lock()
+			self.statements = {}		# normalized statement : {"statement", "calls", "errors", "rows", "total_seconds", "min_seconds", "max_seconds", "vm_steps", "histogram"}
+			self.entries = {}		# statement as executed : its entry in self.statements (skips normalize_stmt() on repeats)
+			self.traced = collections.Counter()	# normalized statement (literals replaced) : executions seen by the trace callback
+			self.traced_keys = {}		# statement as traced : its key in self.traced
+			self.slow_queries = collections.deque(maxlen=slow_log_size)
+			self.progress_steps = {}	# id(conn) : [<VM steps / step size>, <step size>]
+
+		def attach(self, conn, trace=True, progress_steps=None):
+			"""
+			Install the trace callback and/or the progress handler on a connection
+
+			:: Params
+				trace
+					Description: Count every statement SQLite executes on [conn]
+						- A Python call per statement: it can halve the throughput of very short statements
+					Type: Boolean
+					Default: True
+
+				progress_steps
+					Description: Count virtual machine steps per statement, in units of [progress_steps] instructions
+						- Smaller is more precise and more expensive; 1000 costs a few percent
+					Type: Integer
+					Default: None (disabled)
+			"""
+			if trace:
+				def trace_callback(query_stmt):
+					with self.lock:
+						stmt = self.traced_keys.get(query_stmt)
+						if stmt == None:
+							stmt = self.literal_pattern.sub("?", normalize_stmt(query_stmt))
+							if (stmt not in self.traced) and (len(self.traced) >= self.max_statements):
+								stmt = "<other>"
+							if len(self.traced_keys) < self.max_statements * 4:
+								self.traced_keys[query_stmt] = stmt
+						self.traced[stmt] += 1
+				conn.set_trace_callback(trace_callback)
+			if progress_steps != None:
+				counter = [0, progress_steps]
+				def progress_handler():
+					counter[0] += 1
+					return 0
+				self.progress_steps[id(conn)] = counter
+				conn.set_progress_handler(progress_handler, progress_steps)
+
+		def detach(self, conn):
+			"""
+			Remove the trace callback and progress handler from a connection
+			"""
+			conn.set_trace_callback(None)
+			conn.set_progress_handler(None, 0)
+			self.progress_steps.pop(id(conn), None)
+
+		def start(self, conn):
+			"""
+			Mark the start of a statement
+
+			:: Returns
+				Value: Token to pass to finish()
+				Type: Tuple
+			"""
+			counter = self.progress_steps.get(id(conn))
+			return (time.perf_counter(), counter[0] if counter != None else None)
+
+		def finish(self, conn, token, query_stmt, params=None, rows=None, error=None):
+			"""
+			Record a statement started with start()
+
+			:: Params
+				token
+					Description: What start() returned
+					Type: Tuple
+
+				rows
+					Description: Rows returned (SELECT) or changed (INSERT/UPDATE/DELETE), None if unknown
+					Type: Integer
+
+				error
+					Description: The exception raised by the statement
+					Type: Exception
+					Default: None
+			"""
+			seconds = time.perf_counter() - token[0]
+			vm_steps = None
+			if token[1] != None:
+				counter = self.progress_steps.get(id(conn))
+				if counter != None:
+					vm_steps = (counter[0] - token[1]) * counter[1]
+			self.record(query_stmt, seconds, params, rows, error, vm_steps)
+
+		def record(self, query_stmt, seconds, params=None, rows=None, error=None, vm_steps=None):
+			"""
+			Add one execution of a statement to the statistics (and to the slow-query log if slow)
+			"""
+			bucket = bisect.bisect_left(self.histogram_bounds, seconds)
+			with self.lock:
+				entry = self.entries.get(query_stmt)
+				if entry == None:
+					stmt = normalize_stmt(query_stmt)
+					entry = self.statements.get(stmt)
+					if entry == None:
+						if len(self.statements) >= self.max_statements:
+							stmt = "<other>"
+							entry = self.statements.get(stmt)
+						if entry == None:
+							entry = {"statement" : stmt, "calls" : 0, "errors" : 0, "rows" : 0, "total_seconds" : 0.0, "min_seconds" : None, "max_seconds" : 0.0, "vm_steps" : 0, "histogram" : [0] * (len(self.histogram_bounds) + 1)}
+							self.statements[stmt] = entry
+					if len(self.entries) < self.max_statements * 4:
+						self.entries[query_stmt] = entry
+				entry["calls"] += 1
+				entry["total_seconds"] += seconds
+				entry["histogram"][bucket] += 1
+				if (entry["min_seconds"] == None) or (seconds < entry["min_seconds"]):
+					entry["min_seconds"] = seconds
+				if seconds > entry["max_seconds"]:
+					entry["max_seconds"] = seconds
+				if error != None:
+					entry["errors"] += 1
+				if rows != None:
+					entry["rows"] += rows
+				if vm_steps != None:
+					entry["vm_steps"] += vm_steps
+
+			if seconds >= self.slow_threshold:
+				slow_query = {
+					"time" : time.strftime("%Y-%m-%d %H:%M:%S"),
+					"seconds" : seconds,
+					"statement" : entry["statement"] if entry["statement"] != "<other>" else normalize_stmt(query_stmt),
+					"params" : repr(params)[:200] if params != None else None,
+					"rows" : rows,
+					"error" : str(error) if error != None else None,
+				}
+				with self.lock:
+					self.slow_queries.append(slow_query)
+					if self.slow_log_path != None:
+						with open(self.slow_log_path, "a") as slow_log:
+							slow_log.write(json.dumps(slow_query) + "\n")
+
+		def percentile(self, entry, fraction):
+			"""
+			Estimate a latency percentile of a statement from its histogram
+
+			:: Returns
+				Value: Upper bound (seconds) of the bucket holding the percentile; max_seconds for the last bucket
+				Type: Float
+			"""
+			target = entry["calls"] * fraction
+			seen = 0
+			for i in range(len(entry["histogram"])):
+				seen += entry["histogram"][i]
+				if seen >= target:
+					if i < len(self.histogram_bounds):
+						return min(self.histogram_bounds[i], entry["max_seconds"])
+					break
+			return entry["max_seconds"]
+
+		def report(self, order="total_seconds", top=None):
+			"""
+			Get the per-statement statistics
+
+			:: Params
+				order
+					Description: Sort key, descending
+					Type: String
+					Options: total_seconds | calls | errors | rows | max_seconds | avg_seconds | vm_steps
+					Default: total_seconds
+
+				top
+					Description: Number of statements to return
+					Type: Integer
+					Default: None (all)
+
+			:: Returns
+				Value: [{"statement", "calls", "errors", "rows", "total_seconds", "avg_seconds", "min_seconds", "max_seconds", "p50_seconds", "p95_seconds", "p99_seconds", "vm_steps", "histogram"}, ...]
+				Type: List
+			"""
+			with self.lock:
+				entries = [dict(entry, histogram=list(entry["histogram"])) for entry in self.statements.values()]
+			for entry in entries:
+				entry["avg_seconds"] = entry["total_seconds"] / entry["calls"]
+				entry["p50_seconds"] = self.percentile(entry, 0.50)
+				entry["p95_seconds"] = self.percentile(entry, 0.95)
+				entry["p99_seconds"] = self.percentile(entry, 0.99)
+			entries.sort(key=lambda entry: entry[order], reverse=True)
+			if top != None:
+				entries = entries[:top]
+			return entries
+
+		def format_report(self, order="total_seconds", top=20):
+			"""
+			Format report() and the slow-query log as text
+			"""
+			lines = ["=== Statements (by {}) ===".format(order)]
+			for entry in self.report(order, top):
+				lines.append("[{}x, {} errors, {} rows] total {:.3f} ms | avg {:.3f} ms | p95 <= {:.3f} ms | max {:.3f} ms".format(
+					entry["calls"], entry["errors"], entry["rows"], entry["total_seconds"] * 1000, entry["avg_seconds"] * 1000, entry["p95_seconds"] * 1000, entry["max_seconds"] * 1000
+				))
+				lines.append("\t{}".format(entry["statement"]))
+
+			lines.append("=== Slow Queries (>= {:.3f} ms) ===".format(self.slow_threshold * 1000))
+			with self.lock:
+				slow_queries = list(self.slow_queries)
+			for slow_query in slow_queries:
+				lines.append("{} {:.3f} ms {}{}".format(slow_query["time"], slow_query["seconds"] * 1000, slow_query["statement"], " [{}]".format(slow_query["error"]) if slow_query["error"] != None else ""))
+
+			with self.lock:
+				traced = self.traced.most_common(top)
+			if len(traced) > 0:
+				lines.append("=== Traced Statements ===")
+				for stmt, count in traced:
+					lines.append("[{}x] {}".format(count, stmt))
+			return "\n".join(lines)
+
+		def dump(self, file_path):
+			"""
+			Write the statistics, slow-query log and traced statements to a JSON file
+
+			:: Returns
+				Value: file_path
+				Type: String
+			"""
+			with self.lock:
+				slow_queries = list(self.slow_queries)
+				traced = dict(self.traced)
+			with open(file_path, "w") as dump_file:
+				json.dump({
+					"histogram_bounds" : self.histogram_bounds,
+					"statements" : self.report(),
+					"slow_queries" : slow_queries,
+					"traced" : traced,
+				}, dump_file, indent=4)
+			return file_path
+
+		def reset(self):
+			"""
+			Clear every statistic
+			"""
+			with self.lock:
+				self.statements.clear()
+				self.entries.clear()
+				self.traced.clear()
+				self.traced_keys.clear()
+				self.slow_queries.clear()
+
+	class BackgroundWriter():
+		"""
+		Single background writer thread with group commit
+			- Any thread can submit writes; each returns a Future
+			- The writer takes every queued write (up to [max_batch]) and runs them in one transaction:
+			  one commit (one journal sync) per batch instead of one per write. Writes submitted while a batch
+			  is committing form the next batch, so batches grow by themselves under load
+			- Every write runs inside its own SAVEPOINT: a failing write is rolled back and its Future gets the exception,
+			  the other writes of the batch are still committed
+
+		:: Durability
+			A Future completes only after the COMMIT of its batch has returned, so a successful result
+			is exactly as durable as a commit on that connection (see the 'synchronous' PRAGMA of [profile]).
+			Writes still queued when the process dies are lost: wait on the Future (or flush()) when it matters.
+
+		:: Usage
+			writer = SQLiteDBMgmt.BackgroundWriter(mgt.full_path)
+			future = writer.submit("INSERT INTO profiles (username, password, email) VALUES (?, ?, ?)", (username, password_hash, email))
+			row_id = future.result()	# lastrowid, once committed
+			writer.close()
+		"""
+		def __init__(self, full_path, max_batch=256, max_latency=0.0, max_queue=10000, statement_cache_size=128, timeout=30.0, profile=None, result_cache=None):
+			"""
+			Initialize and start the writer thread
+
+			:: Params
+				full_path
+					Description: The path to the database file
+					Type: String
+
+				max_batch
+					Description: Maximum number of writes per transaction
+					Type: Integer
+					Default: 256
+
+				max_latency
+					Description: Seconds the first write of a batch waits for more writes before the commit
+						- 0.0 commits as soon as the queue is empty, which adds no latency when idle
+					Type: Float
+					Default: 0.0
+
+				max_queue
+					Description: Maximum number of queued writes; submit() blocks while the queue is full
+					Type: Integer
+					Default: 10000
+
+				statement_cache_size
+					Description: Number of compiled statements cached by the writer connection
+					Type: Integer
+					Default: 128
+
+				timeout
+					Description: Seconds to wait on a database lock held by another connection
+					Type: Float
+					Default: 30.0
+
+				profile
+					Description: The storage-performance profile of the writer connection (see STORAGE_PROFILES)
+					Type: String|Dictionary
+					Default: None
+
+				result_cache
+					Description: A ResultCache to invalidate after every commit
+					Type: SQLiteDBMgmt.ResultCache
+					Default: None
+			"""
+			import queue
+			from concurrent.futures import Future
+			self.Future = Future
+			self.full_path = full_path
+			self.max_batch = max_batch
+			self.max_latency = max_latency
+			self.statement_cache_size = statement_cache_size
+			self.timeout = timeout
+			self.profile = profile
+			self.result_cache = result_cache
+			self.queue = queue.Queue(max_queue)
+			self.Empty = queue.Empty
+			self.lock = threading.Lock()
+			self.counters = {"writes" : 0, "batches" : 0, "errors" : 0, "commit_seconds" : 0.0}
+			self.submit_lock = threading.Lock()	# Makes the closed check + queue.put of enqueue() and close() atomic
+			self.closed = False
+			self.conn = None
+
+			opened = self.Future()
+			self.thread = threading.Thread(target=self.loop, args=(opened,), name="db-writer", daemon=True)
+			self.thread.start()
+			opened.result()
+
+		def __enter__(self):
+			return self
+
+		def __exit__(self, exc_type, exc_value, traceback):
+			self.close()
+
+		def submit(self, query_stmt, params=None):
+			"""
+			Queue one statement
+
+			:: Returns
+				Value: Future of the statement's cursor.lastrowid (or rowcount for UPDATE/DELETE), set after the commit
+				Type: concurrent.futures.Future
+			"""
+			return self.enqueue(("execute", query_stmt, params))
+
+		def submit_many(self, query_stmt, rows):
+			"""
+			Queue one statement for many parameter rows (executemany)
+
+			:: Returns
+				Value: Future of the number of rows written, set after the commit
+				Type: concurrent.futures.Future
+			"""
+			return self.enqueue(("executemany", query_stmt, list(rows)))
+
+		def submit_call(self, func):
+			"""
+			Queue func(conn): several statements that must succeed or fail together
+
+			:: Returns
+				Value: Future of what func returned, set after the commit
+				Type: concurrent.futures.Future
+
+			:: Remarks
+				- func must not commit or roll back; it runs inside the batch transaction
+			"""
+			return self.enqueue(("call", func, None))
+
+		def enqueue(self, operation):
+			"""
+			Queue an operation and return its Future
+				- Raises RuntimeError once close() has been called: nothing can be queued behind the stop marker
+			"""
+			with self.submit_lock:
+				if self.closed:
+					raise RuntimeError("BackgroundWriter is closed")
+				future = self.Future()
+				self.queue.put((operation, future))
+			return future
+
+		def fail_unfinished(self, items, error):
+			"""
+			Complete the Futures of [items] ((operation, future) pairs) that are not done yet with [error]
+
+			:: Returns
+				Value: Number of Futures failed
+				Type: Integer
+			"""
+			failed = 0
+			for item in items:
+				if item == None:
+					continue
+				future = item[1]
+				if not future.done():
+					future.set_exception(error)
+					failed += 1
+			if failed > 0:
+				with self.lock:
+					self.counters["errors"] += failed
+			return failed
+
+		def flush(self, timeout=None):
+			"""
+			Wait until every write submitted so far is committed (or failed)
+			"""
+			return self.submit_call(lambda conn: None).result(timeout)
+
+		def loop(self, opened):
+			"""
+			Writer thread: open the connection, then commit the queued writes batch by batch
+			"""
+			try:
+				self.conn = SQLiteDBMgmt.BaseUtilities().open_db(self.full_path, {"timeout" : self.timeout}, self.statement_cache_size, self.profile)
+				self.conn.isolation_level = None	# Transactions are managed explicitly below
+			except Exception as e:
+				opened.set_exception(e)
+				return
+			opened.set_result(True)
+
+			batch = []
+			try:
+				while True:
+					item = self.queue.get()
+					if item == None:
+						break
+					batch = [item]
+					deadline = time.monotonic() + self.max_latency
+					stop = False
+					while len(batch) < self.max_batch:
+						remaining = deadline - time.monotonic()
+						try:
+							item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+						except self.Empty:
+							break
+						if item == None:
+							stop = True
+							break
+						batch.append(item)
+					self.write_batch(batch)
+					batch = []
+					if stop:
+						break
+			finally:
+				# Only reached with writes left if the thread is dying on an unexpected error
+				self.fail_unfinished(batch, RuntimeError("BackgroundWriter stopped before the write was committed"))
+				self.conn.close()
+
+		def write_batch(self, batch):
+			"""
+			Run a batch in one transaction, each write in its own savepoint, then complete the Futures
+			"""
+			results = []
+			written = []
+			unknown_writes = False
+			try:
+				self.conn.execute("BEGIN IMMEDIATE;")
+				for (kind, target, params), future in batch:
+					if not future.set_running_or_notify_cancel():
+						continue
+					self.conn.execute("SAVEPOINT bg_write;")
+					try:
+						if kind == "execute":
+							cursor = self.conn.execute(target, params) if params != None else self.conn.execute(target)
+							result = cursor.lastrowid if target.lstrip().upper().startswith(("INSERT", "REPLACE")) else cursor.rowcount
+						elif kind == "executemany":
+							result = self.conn.executemany(target, params).rowcount
+						else:
+							changes = self.conn.total_changes
+							result = target(self.conn)
+							unknown_writes = unknown_writes or (self.conn.total_changes != changes)
+						self.conn.execute("RELEASE bg_write;")
+						results.append((future, result, None))
+						if kind != "call":
+							written.append(target)
+					except Exception as e:
+						self.conn.execute("ROLLBACK TO bg_write;")
+						self.conn.execute("RELEASE bg_write;")
+						results.append((future, None, e))
+				start = time.perf_counter()
+				self.conn.execute("COMMIT;")
+				commit_seconds = time.perf_counter() - start
+			except Exception as e:
+				# BEGIN, a savepoint or COMMIT failed (i.e. database locked): nothing of this batch is saved
+				try:
+					if self.conn.in_transaction:
+						self.conn.execute("ROLLBACK;")
+				except Exception:
+					pass
+				failed = 0
+				for request, future in batch:
+					if not future.done():
+						future.set_exception(e)
+						failed += 1
+				with self.lock:
+					self.counters["errors"] += failed
+				return
+
+			if self.result_cache != None:
+				if unknown_writes:
+					self.result_cache.clear()		# submit_call() wrote to tables it does not name
+				for query_stmt in written:
+					self.result_cache.invalidate_stmt(self.conn, query_stmt)
+
+			for future, result, error in results:
+				if error == None:
+					future.set_result(result)
+				else:
+					future.set_exception(error)
+			with self.lock:
+				self.counters["writes"] += len(results)
+				self.counters["batches"] += 1
+				self.counters["errors"] += len([r for r in results if r[2] != None])
+				self.counters["commit_seconds"] += commit_seconds
+
+		def stats(self):
+			"""
+			Return the writer counters
+
+			:: Returns
+				Value: {"writes", "batches", "errors", "commit_seconds", "queued", "writes_per_batch"}
+				Type: Dictionary
+			"""
+			with self.lock:
+				stats = dict(self.counters)
+			stats["queued"] = self.queue.qsize()
+			stats["writes_per_batch"] = (stats["writes"] / float(stats["batches"])) if stats["batches"] > 0 else 0.0
+			return stats
+
+		def close(self, timeout=None):
+			"""
+			Commit the queued writes, then stop the writer thread and close its connection
+				- Once the thread has stopped, writes it did not take (i.e. it died on an unexpected error) fail with RuntimeError
+			"""
+			with self.submit_lock:
+				if self.closed:
+					return
+				self.closed = True
+				self.queue.put(None)
+			self.thread.join(timeout)
+			if self.thread.is_alive():
+				return
+
+			remaining = []
+			while True:
+				try:
+					remaining.append(self.queue.get_nowait())
+				except self.Empty:
+					break
+			self.fail_unfinished(remaining, RuntimeError("BackgroundWriter stopped before the write was committed"))
+
+	class RecordFactory():
+		"""
+		sqlite3 row factory returning named, tuple-backed records instead of plain tuples
+			- Records are collections.namedtuple instances: tuples with __slots__ = (), so they take the memory of a plain tuple
+			  and still support row[1], unpacking, comparison and hashing like the tuples returned before
+			- Fields are read by name (row.password); row._asdict() builds a dictionary only when asked
+			- One record class per selected column list, created on first use and cached;
+			  the tables of [table_properties] get a named class ("ProfilesRecord", "DesignsRecord") for 'SELECT *'
+			- Column names that are not identifiers (i.e. COUNT(*)) or repeated are renamed to _<position>
+
+		:: Usage
+			csdb_mgt = SQLiteDBMgmt("PCPartsList.db", row_factory=SQLiteDBMgmt.RecordFactory(schema.table_properties))
+			account = csdb_utils.retrieve(csdb_mgt.conn, "profiles", "username,password", "username=?", fetch="one", params=(username,), cache=False)
+			account.password
+		"""
+		def __init__(self, table_properties=None, max_classes=256):
+			"""
+			Initialize
+
+			:: Params
+				table_properties
+					Description: Table definitions (see modules/schema.py) to create the full-row record classes from
+					Type: List
+					Default: None
+
+				max_classes
+					Description: Maximum number of record classes cached for other column lists; further ones are not cached
+					Type: Integer
+					Default: 256
+			"""
+			self.max_classes = max_classes
+			self.classes = {}			# (column name, ...) : record class
+			self.last = (None, None)	# (cursor.description, record class) of the last row: the same for every row of a query
+			self.new = tuple.__new__
+			if table_properties != None:
+				for curr_table in table_properties:
+					names = tuple(curr_table["columns"].keys())
+					self.classes[names] = collections.namedtuple("".join([w.title() for w in curr_table["name"].split("_")]) + "Record", names, rename=True)
+
+		def record_class(self, names):
+			"""
+			Get (or create) the record class of a column list
+
+			:: Params
+				names
+					Description: The column names, in order
+					Type: Tuple
+
+			:: Returns
+				Value: The record class
+				Type: collections.namedtuple
+			"""
+			cls = self.classes.get(names)
+			if cls == None:
+				cls = collections.namedtuple("Record", names, rename=True)
+				if len(self.classes) < self.max_classes:
+					self.classes[names] = cls
+			return cls
+
+		def __call__(self, cursor, row):
+			description, cls = self.last
+			if cursor.description is not description:
+				description = cursor.description
+				cls = self.record_class(tuple([column[0] for column in description]))
+				self.last = (description, cls)
+			return self.new(cls, row)
+
+	class ResultCache():
+		"""
+		LRU cache of query results for BaseUtilities.retrieve, invalidated per table
+			- Key : connection + normalized statement + parameters + fetch option
+			- Entries are dropped when a write through BaseUtilities (query_exec, insert, insert_many, create_table, ...)
+			  touches a table they read, including tables behind views and tables written by triggers
+			- Schema changes (CREATE/DROP/ALTER) and ROLLBACK clear the whole cache
+			- Bounded by number of entries and estimated size in bytes; entries may also expire after [ttl] seconds
+
+		:: Usage
+			utils.result_cache = SQLiteDBMgmt.ResultCache(max_entries=256, max_bytes=16 * 1024 * 1024, ttl=60)
+			... run the application ...
+			print(utils.result_cache.stats())
+
+		:: Remarks
+			- Writes made outside BaseUtilities (conn.execute, another process) are not seen: call invalidate([<table>, ...]) or clear()
+		"""
+		# INSERT/REPLACE INTO, UPDATE, DELETE FROM <table>
+		write_pattern = re.compile(r"\b(?:INSERT(?:\s+OR\s+[A-Za-z]+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+[A-Za-z]+)?|DELETE\s+FROM)\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+		# Statements that never change table contents
+		read_keywords = set(["SELECT", "VALUES", "EXPLAIN", "PRAGMA", "BEGIN", "COMMIT", "END", "SAVEPOINT", "RELEASE", "ANALYZE", "VACUUM"])
+		schema_keywords = set(["CREATE", "DROP", "ALTER", "ROLLBACK", "ATTACH", "DETACH"])
+
+		def __init__(self, max_entries=256, max_bytes=16777216, ttl=None):
+			"""
+			Initialize
+
+			:: Params
+				max_entries
+					Description: Maximum number of cached results
+					Type: Integer
+					Default: 256
+
+				max_bytes
+					Description: Maximum estimated size of all cached results; larger single results are not cached
+					Type: Integer
+					Default: 16777216 (16 MiB)
+
+				ttl
+					Description: Seconds after which an entry expires
+					Type: Float
+					Default: None (entries only leave on eviction/invalidation)
+			"""
+			self.max_entries = max_entries
+			self.max_bytes = max_bytes
+			self.ttl = ttl
+			self.entries = collections.OrderedDict()	# key : {"value", "tables", "size", "expires"}
+			self.by_table = {}							# table : set(keys)
+			self.bytes = 0
+			self.dependencies = {}						# id(conn) : {"views" : {view : set(tables)}, "triggers" : {table : set(tables)}}
+			self.counters = {"hits" : 0, "misses" : 0, "evictions" : 0, "expirations" : 0, "invalidations" : 0}
+			self.lock = threading.RLock()
+
+		def make_key(self, conn, query_stmt, params=None, fetch="all"):
+			"""
+			Build the cache key of a query
+			"""
+			if isinstance(params, dict):
+				params = tuple(sorted(params.items()))
+			elif params != None:
+				params = tuple(params)
+			if isinstance(fetch, dict):
+				fetch = tuple(sorted(fetch.items()))
+			return (id(conn), normalize_stmt(query_stmt), params, fetch)
+
+		def estimate_size(self, value):
+			"""
+			Estimated memory used by a result (list of rows, a row, or a value)
+			"""
+			if isinstance(value, (list, tuple)):
+				return sys.getsizeof(value) + sum([self.estimate_size(item) for item in value])
+			return sys.getsizeof(value)
+
+		def get(self, key):
+			"""
+			Look a result up
+
+			:: Returns
+				Value: (True, <result>) on a hit, (False, None) on a miss
+				Type: Tuple
+			"""
+			with self.lock:
+				entry = self.entries.get(key)
+				if (entry != None) and (entry["expires"] != None) and (entry["expires"] <= time.monotonic()):
+					self.remove(key)
+					self.counters["expirations"] += 1
+					entry = None
+				if entry == None:
+					self.counters["misses"] += 1
+					return (False, None)
+				self.entries.move_to_end(key)
+				self.counters["hits"] += 1
+				value = entry["value"]
+			if isinstance(value, list):
+				# Callers may modify the list they get back
+				value = list(value)
+			return (True, value)
+
+		def put(self, conn, key, query_stmt, value):
+			"""
+			Store a result, evicting the least recently used entries to stay within [max_entries] and [max_bytes]
+			"""
+			size = self.estimate_size(value)
+			if size > self.max_bytes:
+				return
+			tables = self.read_tables(conn, query_stmt)
+			with self.lock:
+				if key in self.entries:
+					self.remove(key)
+				self.entries[key] = {
+					"value" : value,
+					"tables" : tables,
+					"size" : size,
+					"expires" : (time.monotonic() + self.ttl) if self.ttl != None else None,
+				}
+				self.bytes += size
+				for table in tables:
+					self.by_table.setdefault(table, set()).add(key)
+				while (len(self.entries) > self.max_entries) or (self.bytes > self.max_bytes):
+					self.remove(next(iter(self.entries)))
+					self.counters["evictions"] += 1
+
+		def remove(self, key):
+			"""
+			Drop one entry
+			"""
+			with self.lock:
+				entry = self.entries.pop(key, None)
+				if entry == None:
+					return
+				self.bytes -= entry["size"]
+				for table in entry["tables"]:
+					keys = self.by_table.get(table)
+					if keys != None:
+						keys.discard(key)
+						if len(keys) == 0:
+							del self.by_table[table]
+
+		def load_dependencies(self, conn):
+			"""
+			Read the tables behind every view and the tables written by every trigger from sqlite_master (cached per connection)
+			"""
+			dependencies = self.dependencies.get(id(conn))
+			if dependencies != None:
+				return dependencies
+			dependencies = {"views" : {}, "triggers" : {}}
+			for obj_type, name, tbl_name, sql in conn.execute("SELECT type, name, tbl_name, sql FROM sqlite_master WHERE type IN ('view', 'trigger');").fetchall():
+				if sql == None:
+					continue
+				if obj_type == "view":
+					dependencies["views"][name.lower()] = set([table.lower() for table, alias in SQLiteDBMgmt.QueryAdvisor.table_pattern.findall(sql)])
+				else:
+					body = sql[sql.upper().find("BEGIN"):]
+					dependencies["triggers"].setdefault(tbl_name.lower(), set()).update([t.lower() for t in self.write_pattern.findall(body)])
+			with self.lock:
+				self.dependencies[id(conn)] = dependencies
+			return dependencies
+
+		def read_tables(self, conn, query_stmt):
+			"""
+			The tables a SELECT reads, with views expanded to their tables
+			"""
+			views = self.load_dependencies(conn)["views"]
+			pending = [t.lower() for t, alias in SQLiteDBMgmt.QueryAdvisor.table_pattern.findall(query_stmt)]
+			tables = set()
+			while len(pending) > 0:
+				table = pending.pop()
+				if table in tables:
+					continue
+				tables.add(table)
+				pending.extend(views.get(table, ()))
+			return tables
+
+		def written_tables(self, conn, query_stmt):
+			"""
+			The tables a statement writes, with the tables written by their triggers
+
+			:: Returns
+				Value: The table names; an empty set for read-only statements, None if the whole cache must be cleared
+				Type: Set|None
+			"""
+			keyword = query_stmt.lstrip().split(None, 1)[0].upper() if query_stmt.strip() != "" else ""
+			if keyword in self.read_keywords:
+				return set()
+			if keyword in self.schema_keywords:
+				return None
+			pending = [t.lower() for t in self.write_pattern.findall(query_stmt)]
+			if (len(pending) == 0) and (keyword != "WITH"):
+				return None
+			triggers = self.load_dependencies(conn)["triggers"]
+			tables = set()
+			while len(pending) > 0:
+				table = pending.pop()
+				if table in tables:
+					continue
+				tables.add(table)
+				pending.extend(triggers.get(table, ()))
+			return tables
+
+		def invalidate_stmt(self, conn, query_stmt):
+			"""
+			Drop the entries made stale by an executed statement
+			"""
+			tables = self.written_tables(conn, query_stmt)
+			if tables == None:
+				self.clear()
+			elif len(tables) > 0:
+				self.invalidate(tables)
+
+		def invalidate(self, tables):
+			"""
+			Drop every entry that read one of [tables]
+			"""
+			with self.lock:
+				for table in tables:
+					for key in list(self.by_table.get(table.lower(), ())):
+						self.remove(key)
+						self.counters["invalidations"] += 1
+
+		def forget(self, conn):
+			"""
+			Drop every entry of a connection (i.e. when it is closed)
+			"""
+			with self.lock:
+				for key in [k for k in self.entries.keys() if k[0] == id(conn)]:
+					self.remove(key)
+				self.dependencies.pop(id(conn), None)
+
+		def clear(self):
+			"""
+			Drop every entry and the cached view/trigger dependencies
+			"""
+			with self.lock:
+				self.counters["invalidations"] += len(self.entries)
+				self.entries.clear()
+				self.by_table.clear()
+				self.bytes = 0
+				self.dependencies.clear()
+
+		def stats(self):
+			"""
+			Return the cache counters
+
+			:: Returns
+				Value: {"hits", "misses", "evictions", "expirations", "invalidations", "entries", "bytes", "hit_rate"}
+				Type: Dictionary
+			"""
+			with self.lock:
+				stats = dict(self.counters)
+				stats["entries"] = len(self.entries)
+				stats["bytes"] = self.bytes
+			lookups = stats["hits"] + stats["misses"]
+			stats["hit_rate"] = (stats["hits"] / float(lookups)) if lookups > 0 else 0.0
+			return stats
+
+	@contextmanager
+	def transaction(self, mode="DEFERRED", conn=None, verbose=False):
+		"""
+		Transaction scope: everything run inside is committed once when the scope exits, or rolled back on error
+			- The per-call commits of BaseUtilities (query_exec(commit=True), insert(), insert_many(), ...) are suppressed inside the scope
+			- Nested scopes become SAVEPOINTs: an error leaving an inner scope only rolls back that scope
+			- An error swallowed by query_exec() inside the scope (see BaseUtilities.last_error) also rolls the scope back and is raised when it exits
+
+		:: Params
+			mode
+				Description: How the outermost scope locks the database
+				Type: String
+				Options:
+					DEFERRED  : Lock on the first read/write (readers are not blocked until the first write)
+					IMMEDIATE : Take the write lock now, so the scope cannot fail later with 'database is locked' half-way through
+					EXCLUSIVE : Also block readers (rollback journal mode only)
+				Default: DEFERRED
+				Remarks:
+					- Ignored by nested scopes
+
+			conn
+				Description: The connection to run the transaction on
+				Type: sqlite3.connect()
+				Default: None (self.conn)
+
+			verbose
+				Description: To set if you want messages to be displayed
+				Type: Boolean
+
+		:: Usage
+			with csdb_mgt.transaction("IMMEDIATE") as conn:
+				csdb_utils.insert(conn, "profiles", {...}, commit=True, parameterized=True)
+				with csdb_mgt.transaction():
+					csdb_utils.insert_many(conn, "designs", rows)
+
+		:: Remarks
+			- Raises RuntimeError if [conn] already has a transaction that was not opened by a scope (commit it first)
+			- Scopes are tracked per connection: use one connection from one thread at a time
+		"""
+		if conn == None:
+			conn = self.conn
+		mode = mode.upper()
+		if mode not in ("DEFERRED", "IMMEDIATE", "EXCLUSIVE"):
+			raise ValueError("Unknown transaction mode: {} (options: DEFERRED, IMMEDIATE, EXCLUSIVE)".format(mode))
+
+		# In pool mode the scope holds the writer lock, so other threads cannot write into the open transaction
+		with connection_lock(conn):
+			scopes = TRANSACTION_SCOPES.setdefault(id(conn), [])
+			if len(scopes) == 0:
+				if conn.in_transaction:
+					del TRANSACTION_SCOPES[id(conn)]
+					raise RuntimeError("The connection has an open transaction that was not started by transaction(); commit it first")
+				savepoint = None
+				stmt = "BEGIN {};".format(mode)
+			else:
+				savepoint = "scope_{}".format(len(scopes))
+				stmt = "SAVEPOINT {};".format(savepoint)
+			try:
+				conn.execute(stmt)
+			except Exception:
+				if len(scopes) == 0:
+					del TRANSACTION_SCOPES[id(conn)]
+				raise
+			if verbose:
+				print(stmt)
+
+			scope = {"savepoint" : savepoint, "error" : None, "invalidate" : []}
+			scopes.append(scope)
+			try:
+				yield conn
+			except BaseException:
+				self.end_transaction(conn, scope, False, verbose)
+				raise
+			error = scope["error"]
+			self.end_transaction(conn, scope, error == None, verbose)
+			if error != None:
+				raise error
+
+	def end_transaction(self, conn, scope, commit, verbose=False):
+		"""
+		Close a transaction() scope: COMMIT/RELEASE it, or ROLLBACK (TO) it
+		"""
+		scopes = TRANSACTION_SCOPES[id(conn)]
+		scopes.pop()
+		if len(scopes) == 0:
+			del TRANSACTION_SCOPES[id(conn)]
+
+		if commit:
+			if scope["savepoint"] != None:
+				conn.execute("RELEASE {};".format(scope["savepoint"]))
+			else:
+				try:
+					conn.commit()
+				except Exception:
+					self.rollback_scope(conn, scope, verbose)
+					raise
+				# Other connections may have cached the old rows while the scope was open
+				for result_cache, query_stmt in scope["invalidate"]:
+					result_cache.invalidate_stmt(conn, query_stmt)
+		else:
+			self.rollback_scope(conn, scope, verbose)
+		if verbose:
+			print("{} {}".format("Committed" if commit else "Rolled back", scope["savepoint"] or "transaction"))
+
+	def rollback_scope(self, conn, scope, verbose=False):
+		"""
+		Roll a transaction() scope back without raising, so that the error that caused the rollback is the one the caller sees
+			- SQLite rolls the whole transaction back by itself after some errors (i.e. SQLITE_FULL, SQLITE_IOERR, ON CONFLICT ROLLBACK):
+			  there is then nothing left to roll back, and ROLLBACK TO/RELEASE would fail with 'no such savepoint'
+			- If that happens inside a nested scope, the outermost scope is marked as failed so that it does not report a commit
+		"""
+		try:
+			if conn.in_transaction:
+				if scope["savepoint"] != None:
+					conn.execute("ROLLBACK TO {};".format(scope["savepoint"]))
+					conn.execute("RELEASE {};".format(scope["savepoint"]))
+				else:
+					conn.rollback()
+			elif scope["savepoint"] != None:
+				outer_scope = TRANSACTION_SCOPES.get(id(conn), [None])[0]
+				if (outer_scope != None) and (outer_scope["error"] == None):
+					outer_scope["error"] = db.OperationalError("The transaction was rolled back by SQLite inside a nested scope")
+		except Exception as e:
+			if verbose:
+				print("Rollback failed: {}".format(e))
+
+	def backup(self, target=None, pages=256, sleep=0.005, progress_callback=None, verbose=False):
+		"""
+		Online backup of the open database using the SQLite backup API (Connection.backup)
+			- Copies [pages] pages per step and sleeps [sleep] seconds between steps, so other connections are not blocked
+			- The copy is consistent: if another connection writes during the backup, SQLite restarts the copy
+
+		:: Params
+			target
+				Description: Where to write the backup
+				Type: String|sqlite3.Connection
+				Options:
+					None : res/database/backups/<db-name>-<YYYYmmdd-HHMMSS>.db
+					":memory:" : A new in-memory database
+					"<file-path>" : A backup file (written to "<file-path>.tmp" and renamed on success)
+					sqlite3.Connection : An open connection to copy into
+				Default: None
+
+			pages
+				Description: Number of pages copied per step (-1 or 0 : everything in a single step)
+				Type: Integer
+				Default: 256
+
+			sleep
+				Description: Seconds to sleep between steps
+				Type: Float
+				Default: 0.005
+
+			progress_callback
+				Description: Function called after every step
+				Type: Function
+				Syntax: progress_callback(pages_copied, total_pages)
+				Default: None
+
+			verbose
+				Description: To set if you want messages to be displayed
+				Type: Boolean
+
+		:: Returns
+			Value:
+				- File target : The path of the backup file
+				- Connection/":memory:" target : The connection holding the backup
+			Type: String|sqlite3.Connection
+		"""
+		def progress(status, remaining, total):
+			if progress_callback != None:
+				progress_callback(total - remaining, total)
+			if verbose:
+				print("Backup : {}/{} pages".format(total - remaining, total), end="\r")
+
+		if target == None:
+			backup_dir = os.path.join(self.db_path, "backups")
+			os.makedirs(backup_dir, exist_ok=True)
+			target = os.path.join(backup_dir, "{}-{}.db".format(os.path.splitext(self.db_name)[0], time.strftime("%Y%m%d-%H%M%S")))
+
+		if isinstance(target, db.Connection):
+			dest = target
+		elif target == ":memory:":
+			dest = db.connect(":memory:", check_same_thread=False)
+		else:
+			dest = db.connect("{}.tmp".format(target))
+			# The temporary file is only renamed into place once complete, so it needs no journal of its own
+			dest.execute("PRAGMA journal_mode=OFF;")
+			dest.execute("PRAGMA synchronous=OFF;")
+
+		def copy(source):
+			source.backup(dest, pages=pages, progress=progress, sleep=sleep)
+
+		try:
+			if self.pool != None:
+				# Read through a pooled connection, the writer stays available
+				with self.pool.reader() as source:
+					copy(source)
+			else:
+				copy(self.conn)
+		except Exception:
+			if not (isinstance(target, db.Connection) or target == ":memory:"):
+				dest.close()
+				os.remove("{}.tmp".format(target))
+			raise
+
+		if verbose:
+			print("")
+			print("Backup completed : {}".format(target if isinstance(target, str) else "connection"))
+
+		if isinstance(target, db.Connection) or target == ":memory:":
+			return dest
+
+		dest.close()
+		with open("{}.tmp".format(target), "rb+") as backup_file:
+			os.fsync(backup_file.fileno())
+		os.replace("{}.tmp".format(target), target)
+		return target
 
 	def verify_info(self, param="all"):
 		"""
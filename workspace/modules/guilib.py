@@ -1,33 +1,204 @@
 """
 GUI Utilities Library
+
+:: Backends
+	- tk       : TKinter
+	- qt5      : PyQt5
+	- headless : No GUI toolkit (command line menu), for servers and scripts
+
+	The toolkit of a backend is imported on first use only, so starting the program never loads
+	a toolkit it does not use, and a missing toolkit only fails when that backend is actually chosen.
+
+:: Usage
+	ui = guilib.get_backend()				# [GUI_ENV_VAR] or DEFAULT_BACKEND
+	ui = guilib.get_backend("headless")
+	name = guilib.backend_from_argv(sys.argv[1:])	# --gui <name> | --gui=<name> | --headless
 """
 
 import os
 import sys
-import tkinter as tk
-import PyQt5 as qt5
+import importlib
+
+""" Constants """
+GUI_ENV_VAR = "PCBUILDDB_GUI"
+DEFAULT_BACKEND = "tk"
+
+""" General Functions """
+def load_toolkit(module_name):
+	"""
+	Import a GUI toolkit module on demand
+
+	:: Params
+		module_name
+			Description: The module to import (i.e. tkinter, PyQt5.QtWidgets)
+			Type: String
+
+	:: Returns
+		Value: The imported module
+		Type: Module
+
+	:: Remarks
+		- Raises ImportError naming the headless backend as the alternative if the toolkit is not installed
+	"""
+	try:
+		return importlib.import_module(module_name)
+	except ImportError as ie:
+		raise ImportError("GUI toolkit '{}' is not available ({}); use the headless backend (--headless or {}=headless)".format(module_name, ie, GUI_ENV_VAR))
 
 class TKinterUtils():
 	"""
 	Class library for TKinter
 	"""
+	name = "tk"
+	headless = False
+
 	def __init__(self):
 		"""
 		Initialize
 		"""
+		self._tk = None
+
+	@property
+	def tk(self):
+		"""
+		The tkinter module, imported on first use
+		"""
+		if self._tk == None:
+			self._tk = load_toolkit("tkinter")
+		return self._tk
+
+	def main_window(self, title="PCPartsList Database Manager"):
+		"""
+		Create the main window
+		"""
+		root = self.tk.Tk()
+		root.title(title)
+		return root
+
+	def mainloop(self, title="PCPartsList Database Manager"):
+		"""
+		Create the main window and run the event loop until it is closed
+		"""
+		root = self.main_window(title)
+		root.mainloop()
 
 class Qt5Utils():
 	"""
 	Class library for PyQt5
 	"""
+	name = "qt5"
+	headless = False
+
 	def __init__(self):
 		"""
 		Initialize
 		"""
+		self._widgets = None
+		self.app = None
+
+	@property
+	def widgets(self):
+		"""
+		The PyQt5.QtWidgets module, imported on first use
+		"""
+		if self._widgets == None:
+			self._widgets = load_toolkit("PyQt5.QtWidgets")
+		return self._widgets
 
+	def main_window(self, title="PCPartsList Database Manager"):
+		"""
+		Create the QApplication (once) and the main window
+		"""
+		if self.app == None:
+			self.app = self.widgets.QApplication(sys.argv)
+		window = self.widgets.QMainWindow()
+		window.setWindowTitle(title)
+		return window
+
+	def mainloop(self, title="PCPartsList Database Manager"):
+		"""
+		Show the main window and run the event loop until it is closed
+		"""
+		window = self.main_window(title)
+		window.show()
+		return self.app.exec_()
+
+class HeadlessUtils():
+	"""
+	No GUI toolkit: the caller runs its command line menu instead
+	"""
+	name = "headless"
+	headless = True
+
+	def __init__(self):
+		"""
+		Initialize
+		"""
+
+	def mainloop(self, title=""):
+		"""
+		Nothing to run
+		"""
+
+BACKENDS = {
+	"tk" : TKinterUtils,
+	"qt5" : Qt5Utils,
+	"headless" : HeadlessUtils,
+}
+
+def backend_from_argv(argv):
+	"""
+	Read the backend from command line arguments
+
+	:: Params
+		argv
+			Description: The command line arguments (i.e. sys.argv[1:])
+			Type: List
+			Syntax:
+				--gui <tk|qt5|headless>
+				--gui=<tk|qt5|headless>
+				--headless
+
+	:: Returns
+		Value: The backend name, or None if not given
+		Type: String
+	"""
+	for i in range(len(argv)):
+		if argv[i] == "--headless":
+			return "headless"
+		if argv[i].startswith("--gui="):
+			return argv[i].split("=", 1)[1]
+		if (argv[i] == "--gui") and (i + 1 < len(argv)):
+			return argv[i + 1]
+	return None
+
+def get_backend(name=None):
+	"""
+	Create the utilities object of a backend, without importing its toolkit
+
+	:: Params
+		name
+			Description: The backend
+			Type: String
+			Default: None => [GUI_ENV_VAR] environment variable, else DEFAULT_BACKEND
+			Options:
+				- tk
+				- qt5
+				- headless
+
+	:: Returns
+		Value: The backend's utilities object
+		Type: TKinterUtils|Qt5Utils|HeadlessUtils
+	"""
+	if name == None:
+		name = os.environ.get(GUI_ENV_VAR, DEFAULT_BACKEND)
+	name = name.lower()
+	if name not in BACKENDS:
+		raise ValueError("Unknown GUI backend: {} (options: {})".format(name, ", ".join(BACKENDS.keys())))
+	return BACKENDS[name]()
 
 def main():
 	print("Debug")
 
 if __name__ == "__main__":
-	main()
\ No newline at end of file
+	main()
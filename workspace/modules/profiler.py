@@ -0,0 +1,234 @@
+"""
+CPU and memory profiling of the program's phases (start-up, setup, each menu option)
+
+Every profiled phase writes to the output directory:
+	- <nn>-<phase>.prof     : cProfile data (pstats.Stats, snakeviz, ...)
+	- <nn>-<phase>.txt      : Wall time, the top functions by cumulative and by own time and, in memory mode,
+	                          the top allocating lines and the peak traced memory
+	- phases.jsonl          : One JSON object per phase (name, seconds, peak_bytes, report file)
+
+:: Enabling
+	Command line:
+		--profile                 : Write to profiles/<YYYYmmdd-HHMMSS>
+		--profile=<directory>     : Write to <directory>
+		--profile-memory          : Also take tracemalloc snapshots
+	Environment:
+		PCBUILDDB_PROFILE=<directory>|1
+		PCBUILDDB_PROFILE_MEMORY=1
+
+:: Usage
+	prof = profiler.get_profiler(sys.argv[1:])	# None when profiling is off
+	if prof != None:
+		init = prof.wrap("startup", init)
+
+:: Remarks
+	- cProfile, pstats and tracemalloc are imported only when a profiler is created
+	- Only one phase is profiled at a time: a phase started inside another one runs unprofiled
+	- Memory mode slows the program down noticeably (every allocation is traced)
+"""
+import os
+import sys
+import time
+import json
+import functools
+
+""" Constants """
+PROFILE_ENV_VAR = "PCBUILDDB_PROFILE"
+PROFILE_MEMORY_ENV_VAR = "PCBUILDDB_PROFILE_MEMORY"
+DEFAULT_OUTPUT_DIR = "profiles"
+
+""" General Functions """
+def options_from_argv(argv):
+	"""
+	Read the profiling options from command line arguments, then from the environment
+
+	:: Params
+		argv
+			Description: The command line arguments (i.e. sys.argv[1:])
+			Type: List
+			Syntax:
+				--profile
+				--profile=<directory>
+				--profile-memory
+
+	:: Returns
+		Value: (<output directory or None if profiling is off>, <memory mode>)
+		Type: Tuple
+	"""
+	output_dir = None
+	memory = False
+	for arg in argv:
+		if arg == "--profile":
+			output_dir = ""
+		elif arg.startswith("--profile="):
+			output_dir = arg.split("=", 1)[1]
+		elif arg == "--profile-memory":
+			memory = True
+
+	if output_dir == None:
+		output_dir = os.environ.get(PROFILE_ENV_VAR)
+		if (output_dir != None) and (output_dir.strip().lower() in ("", "0", "false", "no", "off")):
+			output_dir = None
+		elif output_dir == "1":
+			output_dir = ""
+	if os.environ.get(PROFILE_MEMORY_ENV_VAR, "") not in ("", "0"):
+		memory = True
+
+	if output_dir == "":
+		output_dir = os.path.join(DEFAULT_OUTPUT_DIR, time.strftime("%Y%m%d-%H%M%S"))
+	if output_dir == None:
+		memory = False
+	return output_dir, memory
+
+def get_profiler(argv=None):
+	"""
+	Create a Profiler if profiling is enabled on the command line or in the environment
+
+	:: Params
+		argv
+			Description: The command line arguments
+			Type: List
+			Default: None (sys.argv[1:])
+
+	:: Returns
+		Value: Profiler, or None if profiling is off
+		Type: Profiler
+	"""
+	if argv == None:
+		argv = sys.argv[1:]
+	output_dir, memory = options_from_argv(argv)
+	if output_dir == None:
+		return None
+	return Profiler(output_dir, memory)
+
+""" Classes """
+class Profiler():
+	"""
+	Per-phase cProfile (and optional tracemalloc) reports written to a directory
+	"""
+	def __init__(self, output_dir, memory=False, top=30):
+		"""
+		Initialize
+
+		:: Params
+			output_dir
+				Description: Directory the reports are written to (created if missing)
+				Type: String
+
+			memory
+				Description: Also record the allocations of every phase with tracemalloc
+				Type: Boolean
+				Default: False
+
+			top
+				Description: Number of functions and allocating lines listed per report
+				Type: Integer
+				Default: 30
+		"""
+		import cProfile
+		import pstats
+		self.cProfile = cProfile
+		self.pstats = pstats
+		self.tracemalloc = None
+		if memory:
+			import tracemalloc
+			self.tracemalloc = tracemalloc
+		self.output_dir = output_dir
+		self.top = top
+		self.count = 0
+		self.active = None
+		os.makedirs(output_dir, exist_ok=True)
+		print("Profiling to {}{}".format(output_dir, " (with memory)" if memory else ""))
+
+	def file_name(self, name):
+		"""
+		Numbered file name of a phase: <nn>-<name> with anything but letters, digits, '-' and '_' replaced by '_'
+		"""
+		self.count += 1
+		return "{:02d}-{}".format(self.count, "".join([c if (c.isalnum() or c in "-_") else "_" for c in name.lower()]))
+
+	def run(self, name, func, *args, **kwargs):
+		"""
+		Run func(*args, **kwargs) as the phase [name] and write its reports
+
+		:: Returns
+			Value: What [func] returned
+			Type: Any
+		"""
+		if self.active != None:
+			return func(*args, **kwargs)
+		self.active = name
+
+		profile = self.cProfile.Profile()
+		tracing = False
+		if self.tracemalloc != None:
+			tracing = not self.tracemalloc.is_tracing()
+			if tracing:
+				self.tracemalloc.start(10)
+			self.tracemalloc.reset_peak()
+			before = self.tracemalloc.take_snapshot()
+
+		start = time.perf_counter()
+		profile.enable()
+		try:
+			return func(*args, **kwargs)
+		finally:
+			profile.disable()
+			seconds = time.perf_counter() - start
+			after = None
+			peak = None
+			if self.tracemalloc != None:
+				after = self.tracemalloc.take_snapshot()
+				peak = self.tracemalloc.get_traced_memory()[1]
+				if tracing:
+					self.tracemalloc.stop()
+				after = after.compare_to(before, "lineno")
+			self.active = None
+			self.write(name, profile, seconds, after, peak)
+
+	def wrap(self, name, func):
+		"""
+		Wrap a function so that every call is profiled as the phase [name]
+
+		:: Returns
+			Value: The wrapped function
+			Type: Function
+		"""
+		@functools.wraps(func)
+		def profiled(*args, **kwargs):
+			return self.run(name, func, *args, **kwargs)
+		return profiled
+
+	def write(self, name, profile, seconds, allocations=None, peak=None):
+		"""
+		Write the reports of a phase
+		"""
+		base_name = os.path.join(self.output_dir, self.file_name(name))
+		profile.dump_stats(base_name + ".prof")
+
+		with open(base_name + ".txt", "w") as report:
+			report.write("Phase: {}\nWall time: {:.6f}s\n".format(name, seconds))
+			if peak != None:
+				report.write("Peak traced memory: {:.1f} KiB\n".format(peak / 1024.0))
+			for sort_key in ("cumulative", "tottime"):
+				report.write("\n=== Top {} functions by {} time ===\n".format(self.top, sort_key))
+				stats = self.pstats.Stats(profile, stream=report)
+				stats.strip_dirs().sort_stats(sort_key).print_stats(self.top)
+			if allocations != None:
+				report.write("\n=== Top {} allocating lines (net change over the phase) ===\n".format(self.top))
+				for stat in allocations[:self.top]:
+					report.write("{}\n".format(stat))
+
+		with open(os.path.join(self.output_dir, "phases.jsonl"), "a") as phases:
+			phases.write(json.dumps({
+				"phase" : name,
+				"seconds" : seconds,
+				"peak_bytes" : peak,
+				"report" : base_name + ".txt",
+			}) + "\n")
+
+def main():
+	print("Beginning debugging for {}".format(__file__))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,258 @@
+"""
+Build Price Reports over the 'designs' table
+
+Top-K and bracket/histogram queries over build totals (total_price) and per-category prices.
+	- Build totals use the indexes on total_price, (cpu_manufacturer, total_price) and (gpu_manufacturer, total_price),
+	  so a top-K query reads K index entries instead of sorting the table
+	- Everything else streams rows through a bounded heap (heapq), so memory stays O(K)
+
+:: Usage
+	import modules.reports as reports
+	reports.top_builds(conn, 10, low=1000, high=1500, gpu_manufacturer="NVIDIA")
+	reports.price_brackets(conn, [0, 1000, 1500, 2000, 3000])
+"""
+import os
+import sys
+import heapq
+import modules.dblib as dblib
+
+PRICE_COLUMNS = [
+	"case_price", "motherboard_price", "cpu_price", "gpu_price", "psu_price", "cooling_device_price",
+	"io_devices_price", "memory_device_price", "storage_device_price", "peripheral_price", "operating_system_price"
+]
+
+""" General Functions """
+def band_conditions(column, low=None, high=None, filters=None):
+	"""
+	Build the WHERE condition and parameters for "[column] in [low, high]" plus equality filters
+
+	:: Params
+		column
+			Description: The price column to filter on
+			Type: String
+
+		low
+			Description: Lower bound (inclusive)
+			Type: Float
+			Default: None (unbounded)
+
+		high
+			Description: Upper bound (inclusive)
+			Type: Float
+			Default: None (unbounded)
+
+		filters
+			Description: Equality filters, None values are skipped
+			Type: Dictionary
+			Syntax: {"<column>" : <value>}
+
+	:: Returns
+		Value: (where_condition, params)
+		Type: Tuple
+	"""
+	conditions = []
+	params = []
+	for filter_col, value in (filters or {}).items():
+		if value != None:
+			conditions.append("{}=?".format(filter_col))
+			params.append(value)
+	if low != None:
+		conditions.append("{}>=?".format(column))
+		params.append(low)
+	if high != None:
+		conditions.append("{}<=?".format(column))
+		params.append(high)
+	if low == None and high == None:
+		conditions.append("{} IS NOT NULL".format(column))
+	return " AND ".join(conditions), params
+
+def bounded_top_k(rows, k, key, largest=False):
+	"""
+	The K smallest/largest items of an iterable, keeping at most K items in memory (heapq bounded heap)
+
+	:: Returns
+		Value: The K items, sorted
+		Type: List
+	"""
+	if largest:
+		return heapq.nlargest(k, rows, key=key)
+	return heapq.nsmallest(k, rows, key=key)
+
+def top_builds(conn, k=10, largest=False, low=None, high=None, cpu_manufacturer=None, gpu_manufacturer=None, col="ROW_ID, total_price", utils=None):
+	"""
+	The K cheapest (or most expensive) builds in a price band, optionally with a given CPU/GPU manufacturer
+
+	:: Params
+		conn
+			Description: Your Database Connection Object
+			Type: sqlite3.connect("<database-name>")
+
+		k
+			Description: Number of builds
+			Type: Integer
+			Default: 10
+
+		largest
+			Description: Most expensive first instead of cheapest first
+			Type: Boolean
+			Default: False
+
+		low, high
+			Description: The total_price band (inclusive)
+			Type: Float
+			Default: None (unbounded)
+
+		cpu_manufacturer, gpu_manufacturer
+			Description: Only builds with this CPU/GPU manufacturer
+			Type: String
+			Default: None
+
+		col
+			Description: The columns to return
+			Type: String
+			Default: "ROW_ID, total_price"
+
+		utils
+			Description: The BaseUtilities object to use
+			Type: dblib.SQLiteDBMgmt.BaseUtilities
+			Default: None (a new one is created)
+
+	:: Returns
+		Value: The rows, ordered by total_price
+		Type: List
+	"""
+	if utils == None:
+		utils = dblib.SQLiteDBMgmt.BaseUtilities()
+
+	where_condition, params = band_conditions("total_price", low, high, {"cpu_manufacturer" : cpu_manufacturer, "gpu_manufacturer" : gpu_manufacturer})
+	order = "DESC" if largest else "ASC"
+	res = utils.retrieve(
+		conn, "designs", col, where_condition, "ORDER BY total_price {}, ROW_ID {} LIMIT {}".format(order, order, int(k)),
+		completion_msg="", verbose=False, params=params
+	)
+	return res or []
+
+def top_by_category(conn, category, k=10, largest=False, low=None, high=None, manufacturer=None, utils=None):
+	"""
+	The K builds with the cheapest (or most expensive) part of one category (i.e. "gpu")
+
+	:: Params
+		category
+			Description: The part category; the "<category>_price" column is used
+			Type: String
+
+		manufacturer
+			Description: Only parts from this manufacturer ("<category>_manufacturer")
+			Type: String
+			Default: None
+
+	:: Returns
+		Value: [(ROW_ID, <category>_name, <category>_manufacturer, <category>_price), ...]
+		Type: List
+
+	:: Remarks
+		- Per-category prices are not indexed: SQLite scans the table once and keeps K rows in its sorter (ORDER BY ... LIMIT)
+	"""
+	if utils == None:
+		utils = dblib.SQLiteDBMgmt.BaseUtilities()
+
+	price_col = "{}_price".format(category)
+	if price_col not in PRICE_COLUMNS:
+		raise ValueError("Unknown category: {}".format(category))
+	manufacturer_col = "{}_manufacturer".format(category)
+	filters = {}
+	if category != "operating_system":
+		filters[manufacturer_col] = manufacturer
+
+	where_condition, params = band_conditions(price_col, low, high, filters)
+	order = "DESC" if largest else "ASC"
+	col = "ROW_ID, {}_name, {}, {}".format(category, manufacturer_col if category != "operating_system" else "NULL", price_col)
+	res = utils.retrieve(
+		conn, "designs", col, where_condition, "ORDER BY {} {}, ROW_ID {} LIMIT {}".format(price_col, order, order, int(k)),
+		completion_msg="", verbose=False, params=params
+	)
+	return res or []
+
+def top_parts(conn, k=10, largest=True, categories=None, where_condition="", params=None, batch_size=5000, utils=None):
+	"""
+	The K most expensive (or cheapest) parts across several categories of every build
+		- Streams the rows (iter_retrieve) through a bounded heap: memory is O(K) regardless of the table size
+
+	:: Params
+		categories
+			Description: The categories to compare
+			Type: List
+			Default: None (every category in PRICE_COLUMNS)
+
+		where_condition, params
+			Description: An optional filter on the builds
+			Type: String, List|Tuple|Dictionary
+
+	:: Returns
+		Value: [(<price>, ROW_ID, "<category>"), ...], sorted
+		Type: List
+	"""
+	if utils == None:
+		utils = dblib.SQLiteDBMgmt.BaseUtilities()
+
+	if categories == None:
+		categories = [c[:-len("_price")] for c in PRICE_COLUMNS]
+	price_cols = ["{}_price".format(c) for c in categories]
+
+	def entries():
+		for row in utils.iter_retrieve(conn, "designs", "ROW_ID, {}".format(", ".join(price_cols)), where_condition, batch_size=batch_size, params=params):
+			for i in range(len(categories)):
+				if row[i + 1] != None:
+					yield (row[i + 1], row[0], categories[i])
+
+	return bounded_top_k(entries(), k, key=lambda entry: entry[0], largest=largest)
+
+def price_histogram(conn, bucket_width=250.0, column="total_price", low=None, high=None, cpu_manufacturer=None, gpu_manufacturer=None, utils=None):
+	"""
+	Number of builds per price bucket of [bucket_width], aggregated inside SQLite (one pass, O(buckets) memory)
+
+	:: Returns
+		Value: [(<bucket-low>, <bucket-high>, <count>), ...] for the non-empty buckets
+		Type: List
+	"""
+	if utils == None:
+		utils = dblib.SQLiteDBMgmt.BaseUtilities()
+
+	where_condition, params = band_conditions(column, low, high, {"cpu_manufacturer" : cpu_manufacturer, "gpu_manufacturer" : gpu_manufacturer})
+	bucket = "CAST({} / {} AS INTEGER)".format(column, float(bucket_width))
+	res = utils.retrieve(
+		conn, "designs", "{} AS bucket, COUNT(*)".format(bucket), where_condition, "GROUP BY bucket ORDER BY bucket",
+		completion_msg="", verbose=False, params=params
+	)
+	return [(b * bucket_width, (b + 1) * bucket_width, count) for b, count in (res or [])]
+
+def price_brackets(conn, edges, column="total_price", cpu_manufacturer=None, gpu_manufacturer=None, utils=None):
+	"""
+	Number of builds in each budget bracket [edges[i], edges[i + 1]); one index range count per bracket
+
+	:: Params
+		edges
+			Description: The bracket boundaries, ascending (i.e. [0, 1000, 1500, 2000])
+			Type: List
+
+	:: Returns
+		Value: [(<low>, <high>, <count>), ...]
+		Type: List
+	"""
+	if utils == None:
+		utils = dblib.SQLiteDBMgmt.BaseUtilities()
+
+	brackets = []
+	for i in range(len(edges) - 1):
+		where_condition, params = band_conditions(column, edges[i], None, {"cpu_manufacturer" : cpu_manufacturer, "gpu_manufacturer" : gpu_manufacturer})
+		where_condition += " AND {}<?".format(column)
+		params.append(edges[i + 1])
+		res = utils.retrieve(conn, "designs", "COUNT(*)", where_condition, fetch="one", completion_msg="", verbose=False, params=params)
+		brackets.append((edges[i], edges[i + 1], res[0]))
+	return brackets
+
+def main():
+	print("Beginning debugging for {}".format(__file__))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,343 @@
+"""
+Database Schema and Migrations
+
+The table definitions used by the Workspace (main.py) and the Setup script (modules/setup.py),
+and the migrations that bring a database file up to them.
+
+:: Versioning
+	- The schema version of a file is stored in 'PRAGMA user_version' (0 = never migrated)
+	- migrate() applies every migration newer than the file, in order, each in its own transaction
+	  together with the new user_version: a failed migration leaves the file at the previous version
+	- If the file is already at SCHEMA_VERSION, migrate() only reads user_version (no DDL on startup)
+
+:: Changing the schema
+	1. Edit table_properties (the current layout, read by the Workspace and the benchmarks)
+	2. Append a migration to MIGRATIONS that brings existing files to the new layout
+		(i.e. ALTER TABLE ... ADD COLUMN, create a new index, copy data into a rebuilt table)
+		- A migration works from its own frozen definitions (TABLES_V1, AGGREGATES_V2, ...), never from table_properties,
+		  so that a new file replays exactly the steps an old file went through
+	3. Never edit a migration that has been released, nor its definitions: files that already applied it will not run it again
+
+:: Usage
+	import modules.schema as schema
+	schema.migrate(conn, utils)
+"""
+import os
+import sys
+import time
+
+""" Constants """
+# Current table definitions (see BaseUtilities.create_table, create_indexes, materialize_sum and create_fts_index)
+table_properties = [
+	{
+		"name" : "profiles",
+		"columns" : {
+			"ROW_ID" 	: {"type" : "INTEGER",		"key" : "PRIMARY KEY",	"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
+			"username" 	: {"type" : "VARCHAR(255)",	"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
+			"password" 	: {"type" : "VARCHAR(255)",	"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
+			"email" 	: {"type" : "VARCHAR(255)",	"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""}
+		},
+		"indexes" : {}
+	},
+	{
+		"name" : "designs",
+		"columns" : {
+			"ROW_ID" 						: {"type" : "INTEGER",	"key" : "PRIMARY KEY",	"null" : False,	"default" : None,		"unique" : True,	"others" : ""},
+			"case_name" 					: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"case_manufacturer" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"case_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.0,		"unique" : False,	"others" : ""},
+			"motherboard_name" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"motherboard_manufacturer" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"motherboard_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"cpu_name" 						: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"cpu_manufacturer" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"cpu_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"gpu_name" 						: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"gpu_manufacturer" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"gpu_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"psu_name" 						: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"psu_manufacturer" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"psu_power_output"				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : "\"0W\"",	"unique" : False,	"others" : ""},
+			"psu_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"cooling_device_name" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"cooling_device_manufacturer" 	: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"cooling_device_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"io_devices_name" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"io_devices_manufacturer" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"io_devices_price" 				: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"memory_device_name" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"memory_device_manufacturer" 	: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"memory_device_size"			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"memory_device_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"storage_device_name" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"storage_device_manufacturer" 	: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"storage_device_size"			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"storage_device_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"peripheral_category"			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"peripheral_name"				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"peripheral_manufacturer" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"peripheral_price" 				: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"operating_system_name" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"operating_system_price" 		: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"total_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+		},
+		"indexes" : {
+			# (manufacturer, total_price): equality filter + ordered price range, also serves manufacturer-only lookups
+			"idx_designs_cpu_manufacturer_total_price" 	: {"columns" : ["cpu_manufacturer", "total_price"],	"unique" : False,	"where" : ""},
+			"idx_designs_gpu_manufacturer_total_price" 	: {"columns" : ["gpu_manufacturer", "total_price"],	"unique" : False,	"where" : ""},
+			"idx_designs_total_price" 		: {"columns" : ["total_price"],			"unique" : False,	"where" : ""},
+		},
+		# FTS5 full-text index kept in sync by triggers (see BaseUtilities.create_fts_index)
+		"search" : [
+			"case_name", "case_manufacturer", "motherboard_name", "motherboard_manufacturer", "cpu_name", "cpu_manufacturer",
+			"gpu_name", "gpu_manufacturer", "psu_name", "psu_manufacturer", "cooling_device_name", "cooling_device_manufacturer",
+			"io_devices_name", "io_devices_manufacturer", "memory_device_name", "memory_device_manufacturer",
+			"storage_device_name", "storage_device_manufacturer", "peripheral_name", "peripheral_manufacturer", "operating_system_name"
+		],
+		# Stored sums kept up to date by triggers (see BaseUtilities.materialize_sum)
+		"aggregates" : {
+			"total_price" : [
+				"case_price", "motherboard_price", "cpu_price", "gpu_price", "psu_price", "cooling_device_price",
+				"io_devices_price", "memory_device_price", "storage_device_price", "peripheral_price", "operating_system_price"
+			],
+		}
+	}
+]
+
+# Frozen copies of what each released migration created; never edit these (see "Changing the schema")
+# Migration 1: the tables as first released (no total_price)
+TABLES_V1 = [
+	{
+		"name" : "profiles",
+		"columns" : {
+			"ROW_ID" 	: {"type" : "INTEGER",		"key" : "PRIMARY KEY",	"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
+			"username" 	: {"type" : "VARCHAR(255)",	"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
+			"password" 	: {"type" : "VARCHAR(255)",	"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
+			"email" 	: {"type" : "VARCHAR(255)",	"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""}
+		}
+	},
+	{
+		"name" : "designs",
+		"columns" : {
+			"ROW_ID" 						: {"type" : "INTEGER",	"key" : "PRIMARY KEY",	"null" : False,	"default" : None,		"unique" : True,	"others" : ""},
+			"case_name" 					: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"case_manufacturer" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"case_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.0,		"unique" : False,	"others" : ""},
+			"motherboard_name" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"motherboard_manufacturer" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"motherboard_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"cpu_name" 						: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"cpu_manufacturer" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"cpu_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"gpu_name" 						: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"gpu_manufacturer" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"gpu_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"psu_name" 						: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"psu_manufacturer" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"psu_power_output"				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : "\"0W\"",	"unique" : False,	"others" : ""},
+			"psu_price" 					: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"cooling_device_name" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"cooling_device_manufacturer" 	: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"cooling_device_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"io_devices_name" 				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"io_devices_manufacturer" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"io_devices_price" 				: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"memory_device_name" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"memory_device_manufacturer" 	: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"memory_device_size"			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"memory_device_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"storage_device_name" 			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"storage_device_manufacturer" 	: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"storage_device_size"			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"storage_device_price" 			: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"peripheral_category"			: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"peripheral_name"				: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"peripheral_manufacturer" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"peripheral_price" 				: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""},
+			"operating_system_name" 		: {"type" : "TEXT",		"key" : "NIL",			"null" : True,	"default" : None,		"unique" : False,	"others" : ""},
+			"operating_system_price" 		: {"type" : "FLOAT",	"key" : "NIL",			"null" : True,	"default" : 0.00,		"unique" : False,	"others" : ""}
+		}
+	}
+]
+
+# Migration 2: stored sums, {<table> : {<target-column> : [<source-column>, ...]}}
+AGGREGATES_V2 = {
+	"designs" : {
+		"total_price" : [
+			"case_price", "motherboard_price", "cpu_price", "gpu_price", "psu_price", "cooling_device_price",
+			"io_devices_price", "memory_device_price", "storage_device_price", "peripheral_price", "operating_system_price"
+		],
+	}
+}
+
+# Migration 3: indexes, {<table> : {<index-name> : <index-definition>}}
+INDEXES_V3 = {
+	"designs" : {
+		"idx_designs_cpu_manufacturer_total_price" 	: {"columns" : ["cpu_manufacturer", "total_price"],	"unique" : False,	"where" : ""},
+		"idx_designs_gpu_manufacturer_total_price" 	: {"columns" : ["gpu_manufacturer", "total_price"],	"unique" : False,	"where" : ""},
+		"idx_designs_total_price" 		: {"columns" : ["total_price"],			"unique" : False,	"where" : ""},
+	}
+}
+
+# Migration 4: full-text indexes, {<table> : [<column>, ...]}
+SEARCH_V4 = {
+	"designs" : [
+		"case_name", "case_manufacturer", "motherboard_name", "motherboard_manufacturer", "cpu_name", "cpu_manufacturer",
+		"gpu_name", "gpu_manufacturer", "psu_name", "psu_manufacturer", "cooling_device_name", "cooling_device_manufacturer",
+		"io_devices_name", "io_devices_manufacturer", "memory_device_name", "memory_device_manufacturer",
+		"storage_device_name", "storage_device_manufacturer", "peripheral_name", "peripheral_manufacturer", "operating_system_name"
+	]
+}
+
+""" General Functions """
+def check(utils, what):
+	"""
+	Raise the error swallowed by the last BaseUtilities.query_exec(), if any
+	"""
+	if utils.last_error != None:
+		raise RuntimeError("{} failed: {}".format(what, utils.last_error))
+
+def create_tables(conn, utils, verbose=False):
+	"""
+	Migration 1: Create every table of TABLES_V1 that does not exist yet
+	"""
+	for curr_table in TABLES_V1:
+		utils.create_table(conn, curr_table["name"], curr_table["columns"], True, None, False, False, completion_msg="", verbose=verbose)
+		check(utils, "Creating table {}".format(curr_table["name"]))
+
+def create_aggregates(conn, utils, verbose=False):
+	"""
+	Migration 2: Add the stored sums of AGGREGATES_V2 (i.e. designs.total_price) with their triggers, and backfill them
+	"""
+	for table_name, aggregates in AGGREGATES_V2.items():
+		for target_column, source_columns in aggregates.items():
+			utils.materialize_sum(conn, table_name, target_column, source_columns, commit=False, verbose=verbose)
+			check(utils, "Adding {}.{}".format(table_name, target_column))
+
+def create_indexes(conn, utils, verbose=False):
+	"""
+	Migration 3: Create the indexes of INDEXES_V3
+	"""
+	for table_name, indexes in INDEXES_V3.items():
+		for index_name, index_definition in indexes.items():
+			utils.create_indexes(conn, table_name, {index_name : index_definition}, commit=False, verbose=verbose)
+			check(utils, "Creating index {}".format(index_name))
+
+def create_search_indexes(conn, utils, verbose=False):
+	"""
+	Migration 4: Create the FTS5 full-text indexes of SEARCH_V4
+		- Skipped if SQLite was built without FTS5; Workspace.search then reports that search is unavailable
+	"""
+	if not utils.fts_available(conn):
+		if verbose:
+			print("FTS5 is not available: skipping the full-text indexes")
+		return
+	for table_name, columns in SEARCH_V4.items():
+		utils.create_fts_index(conn, table_name, columns, commit=False, verbose=verbose)
+		check(utils, "Creating the full-text index of {}".format(table_name))
+
+def replace_aggregate_triggers(conn, utils, verbose=False):
+	"""
+	Migration 5: Replace the triggers of the stored sums created by migration 2
+		- The old update trigger also watched the stored column, so the insert trigger's UPDATE fired it again
+		- materialize_sum() drops and re-creates its triggers (same AGGREGATES_V2); the backfill finds nothing to do
+	"""
+	create_aggregates(conn, utils, verbose)
+
+# Ordered list of migrations; the version of a file is the version of the last one applied
+MIGRATIONS = [
+	{"version" : 1, "description" : "Create the profiles and designs tables", 		"apply" : create_tables},
+	{"version" : 2, "description" : "Add designs.total_price maintained by triggers", "apply" : create_aggregates},
+	{"version" : 3, "description" : "Create the indexes", 							"apply" : create_indexes},
+	{"version" : 4, "description" : "Create the full-text search index of designs", 	"apply" : create_search_indexes},
+	{"version" : 5, "description" : "Replace the designs.total_price triggers", 		"apply" : replace_aggregate_triggers},
+]
+SCHEMA_VERSION = MIGRATIONS[-1]["version"]
+
+def get_version(conn):
+	"""
+	Get the schema version of a database file
+
+	:: Returns
+		Value: PRAGMA user_version
+		Type: Integer
+	"""
+	return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+def migrate(conn, utils, target_version=None, verbose=False):
+	"""
+	Bring a database file up to [target_version], applying the missing migrations in order
+
+	:: Params
+		conn
+			Description: Your Database Connection Object
+			Type: sqlite3.connect("<database-name>")
+
+		utils
+			Description: The BaseUtilities object to run the migrations with
+			Type: dblib.SQLiteDBMgmt.BaseUtilities
+
+		target_version
+			Description: The version to migrate to
+			Type: Integer
+			Default: None (SCHEMA_VERSION)
+
+		verbose
+			Description: To set if you want messages to be displayed
+			Type: Boolean
+
+	:: Returns
+		Value: {"from" : <version>, "to" : <version>, "applied" : [<version>, ...], "seconds" : <elapsed-time>}
+		Type: Dictionary
+
+	:: Remarks
+		- Each migration runs in its own 'BEGIN IMMEDIATE' transaction together with the new user_version;
+		  on error it is rolled back and the exception is raised
+		- Raises RuntimeError if the file is newer than [target_version] (written by a newer version of the program)
+		  or if [conn] has an open transaction
+	"""
+	if target_version == None:
+		target_version = SCHEMA_VERSION
+
+	start = time.perf_counter()
+	current_version = get_version(conn)
+	stats = {"from" : current_version, "to" : current_version, "applied" : [], "seconds" : 0.0}
+
+	# Fast path: nothing to do
+	if current_version == target_version:
+		stats["seconds"] = time.perf_counter() - start
+		return stats
+
+	if current_version > target_version:
+		raise RuntimeError("Database schema version {} is newer than this program (version {})".format(current_version, target_version))
+	if conn.in_transaction:
+		raise RuntimeError("migrate() needs a connection without an open transaction")
+
+	for migration in MIGRATIONS:
+		if (migration["version"] <= current_version) or (migration["version"] > target_version):
+			continue
+		if verbose:
+			print("Applying migration {} : {}".format(migration["version"], migration["description"]))
+		conn.execute("BEGIN IMMEDIATE;")
+		try:
+			migration["apply"](conn, utils, verbose)
+			conn.execute("PRAGMA user_version = {};".format(int(migration["version"])))
+			conn.commit()
+		except Exception:
+			conn.rollback()
+			raise
+		stats["applied"].append(migration["version"])
+		stats["to"] = migration["version"]
+
+	stats["seconds"] = time.perf_counter() - start
+	if verbose:
+		print("Schema at version {} ({} migrations applied in {:.3f}s)".format(stats["to"], len(stats["applied"]), stats["seconds"]))
+	return stats
+
+def main():
+	print("Beginning debugging for {}".format(__file__))
+	for migration in MIGRATIONS:
+		print("{} : {}".format(migration["version"], migration["description"]))
+
+if __name__ == "__main__":
+	main()
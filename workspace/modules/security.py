@@ -4,10 +4,26 @@ Security Library for general useful security functions
 
 import os
 import sys
+import hmac
+import time
+import base64
+import threading
+from queue import Full
 
 # Hashing Algorithms
 import hashlib
 
+""" Constants """
+# Encoded password hashes: "pbkdf2_<hash-algorithm>$<iterations>$<salt (base64)>$<key (base64)>"
+PBKDF2_PREFIX = "pbkdf2_"
+DEFAULT_ITERATIONS = 100000
+# Fixed PBKDF2 iteration count of new hashes (i.e. the output of 'python -m modules.security calibrate')
+ITERATIONS_ENV_VAR = "PCBUILDDB_HASH_ITERATIONS"
+SALT_SIZE = 16
+# Stand-in hash checked when the account does not exist, so an unknown username takes as long as a wrong password
+DUMMY_SALT = b"\x00" * SALT_SIZE
+DUMMY_KEY = b"\x00" * hashlib.sha256().digest_size
+
 def encrypt_sha256(uInput="", encoding_algorithm="utf-8"):
 	"""
 	Wrapper to use hashlib.sha256(<input>) to encrypt input in sha256
@@ -15,7 +31,7 @@ def encrypt_sha256(uInput="", encoding_algorithm="utf-8"):
 	if uInput != "":
 		return hashlib.sha256(uInput.encode(encoding_algorithm)).hexdigest()
 
-def encrypt_PBKDF2_HMAC(uInput="", hash_algorithm="sha256", encoding_algorithm="utf-8", salt=os.urandom(32), iterations=100000, digest_key_size=128):
+def encrypt_PBKDF2_HMAC(uInput="", hash_algorithm="sha256", encoding_algorithm="utf-8", salt=None, iterations=100000, digest_key_size=128):
 	"""
 	Wrapper to generate key using PBKDF2_HMAC for Salt + Hashing
 	
@@ -46,10 +62,7 @@ def encrypt_PBKDF2_HMAC(uInput="", hash_algorithm="sha256", encoding_algorithm="
 					- i.e. 
 						- os.random(32)
 			Default: 
-				os.urandom(number_of_bytes)	
-				- Where 
-					number_of_bytes = length/size of the string; 
-					Default: 32 = 32bytes
+				None => os.urandom(32), a new salt on every call
 
 		iterations
 			Description: Number of times/rotations SHA-256 hashing is applied
@@ -70,10 +83,16 @@ def encrypt_PBKDF2_HMAC(uInput="", hash_algorithm="sha256", encoding_algorithm="
 			- Raw text file
 		- This is used to be retrieved on login and compared with the user input after encryption
 	"""
-	if type(salt) == type(int):
+	if salt == None:
+		salt = os.urandom(32)
+	elif isinstance(salt, int):
 		# Length/Size of random string
 		# Generate salt text
 		salt = os.urandom(salt)
+	elif isinstance(salt, str):
+		salt = salt.encode(encoding_algorithm)
+	elif callable(salt):
+		salt = salt()
 
 	key = hashlib.pbkdf2_hmac(
 		hash_algorithm,						# Your Hash digest algorithm for HMAC
@@ -90,8 +109,313 @@ def encrypt_PBKDF2_HMAC(uInput="", hash_algorithm="sha256", encoding_algorithm="
 
 
 
+def hash_password(uInput, iterations=DEFAULT_ITERATIONS, hash_algorithm="sha256", salt=None, encoding_algorithm="utf-8"):
+	"""
+	Hash a password with PBKDF2-HMAC and encode everything needed to verify it into one string
+	
+	:: Parameters
+		uInput
+			Description: The password
+			Type: String
+
+		iterations
+			Description: Number of PBKDF2 iterations (see calibrate_iterations)
+			Type: Integer
+			Default: DEFAULT_ITERATIONS
+
+		hash_algorithm
+			Description: The HMAC hash digest algorithm
+			Type: String
+			Default: sha256
+
+		salt
+			Description: The salt
+			Type: Bytes
+			Default: None => os.urandom(SALT_SIZE)
+
+	:: Returns
+		Value: "pbkdf2_<hash_algorithm>$<iterations>$<salt>$<key>" (salt and key in base64)
+		Type: String
+
+	:: Remarks
+		- The key is as long as the hash digest: asking PBKDF2 for a longer key repeats the whole iteration count per extra block
+	"""
+	if salt == None:
+		salt = os.urandom(SALT_SIZE)
+	key = hashlib.pbkdf2_hmac(hash_algorithm, uInput.encode(encoding_algorithm), salt, iterations)
+	return "{}{}${}${}${}".format(
+		PBKDF2_PREFIX, hash_algorithm, iterations,
+		base64.b64encode(salt).decode("ascii"), base64.b64encode(key).decode("ascii")
+	)
+
+def verify_password(uInput, encoded, encoding_algorithm="utf-8", dummy_iterations=DEFAULT_ITERATIONS):
+	"""
+	Check a password against a stored hash, in constant time
+	
+	:: Parameters
+		uInput
+			Description: The password entered
+			Type: String
+
+		encoded
+			Description: The stored hash
+			Type: String
+			Options:
+				- "pbkdf2_<hash_algorithm>$<iterations>$<salt>$<key>" (hash_password)
+				- 64 hexadecimal characters (encrypt_sha256, legacy)
+				- None (no such account): a dummy hash is still checked, then False is returned
+
+		dummy_iterations
+			Description: PBKDF2 iterations of the dummy hash checked when [encoded] is None
+				- Use the iteration count of new hashes (see calibrate_iterations), so that an unknown username
+				  takes as long as a wrong password and cannot be told apart by timing
+			Type: Integer
+			Default: DEFAULT_ITERATIONS
+
+	:: Returns
+		Value: True if the password matches
+		Type: Boolean
+	"""
+	if uInput == None:
+		return False
+
+	if encoded == None:
+		attempt = hashlib.pbkdf2_hmac("sha256", uInput.encode(encoding_algorithm), DUMMY_SALT, dummy_iterations)
+		hmac.compare_digest(attempt, DUMMY_KEY)
+		return False
+
+	if encoded.startswith(PBKDF2_PREFIX):
+		try:
+			algorithm, iterations, salt, key = encoded.split("$")
+			salt = base64.b64decode(salt)
+			key = base64.b64decode(key)
+			attempt = hashlib.pbkdf2_hmac(algorithm[len(PBKDF2_PREFIX):], uInput.encode(encoding_algorithm), salt, int(iterations), len(key))
+		except ValueError:
+			return False
+		return hmac.compare_digest(attempt, key)
+
+	# Legacy: unsalted SHA-256 hex digest (compared as bytes: compare_digest() rejects non-ASCII strings)
+	return hmac.compare_digest(hashlib.sha256(uInput.encode(encoding_algorithm)).hexdigest().encode("ascii"), encoded.encode(encoding_algorithm))
+
+def needs_rehash(encoded, iterations=DEFAULT_ITERATIONS, hash_algorithm="sha256"):
+	"""
+	Check if a stored hash is legacy SHA-256 or weaker than [iterations]; rehash it on the next successful login
+
+	:: Returns
+		Value: True if the hash should be replaced
+		Type: Boolean
+	"""
+	if (encoded == None) or (not encoded.startswith(PBKDF2_PREFIX)):
+		return True
+	try:
+		algorithm, stored_iterations = encoded.split("$")[:2]
+		return (algorithm != PBKDF2_PREFIX + hash_algorithm) or (int(stored_iterations) < iterations)
+	except ValueError:
+		return True
+
+def configured_iterations(default=DEFAULT_ITERATIONS):
+	"""
+	Get the PBKDF2 iteration count of new hashes: $PCBUILDDB_HASH_ITERATIONS, else [default]
+		- The count must stay the same from one run to the next: needs_rehash() upgrades every stored hash below it,
+		  so a value measured at each start (calibrate_iterations()) would keep rewriting hashes as the timing varies
+
+	:: Returns
+		Value: The iteration count
+		Type: Integer
+	"""
+	value = os.environ.get(ITERATIONS_ENV_VAR, "").strip()
+	if value == "":
+		return default
+	iterations = int(value)
+	if iterations < 1:
+		raise ValueError("{} must be a positive integer".format(ITERATIONS_ENV_VAR))
+	return iterations
+
+def calibrate_iterations(target_seconds=0.25, hash_algorithm="sha256", minimum=DEFAULT_ITERATIONS, samples=3, sample_iterations=20000):
+	"""
+	Pick the PBKDF2 iteration count that takes about [target_seconds] on this host
+	
+	:: Parameters
+		target_seconds
+			Description: The time one hash should take
+			Type: Float
+			Default: 0.25
+
+		minimum
+			Description: Never return less than this
+			Type: Integer
+			Default: DEFAULT_ITERATIONS
+
+		samples
+			Description: Number of timing samples; the fastest is used (least disturbed by other load)
+			Type: Integer
+			Default: 3
+
+		sample_iterations
+			Description: Iterations per timing sample
+			Type: Integer
+			Default: 20000
+
+	:: Returns
+		Value: The iteration count, rounded down to a multiple of 1000
+		Type: Integer
+
+	:: Remarks
+		- The result varies from run to run: calibrate once and store it in $PCBUILDDB_HASH_ITERATIONS (see configured_iterations())
+	"""
+	best = None
+	for i in range(samples):
+		start = time.perf_counter()
+		hashlib.pbkdf2_hmac(hash_algorithm, b"calibration", b"0" * SALT_SIZE, sample_iterations)
+		elapsed = time.perf_counter() - start
+		if (best == None) or (elapsed < best):
+			best = elapsed
+	iterations = int(sample_iterations * target_seconds / best) // 1000 * 1000
+	return max(iterations, minimum)
+
+class HashingService():
+	"""
+	Runs password hashing/verification on a worker pool so the calling (UI/request) thread does not stall
+		- hashlib.pbkdf2_hmac releases the GIL, so threads hash in parallel on multi-core hosts
+		- At most [max_pending] jobs may be queued or running; more raise queue.Full instead of piling up
+	"""
+	def __init__(self, workers=None, max_pending=64, iterations=DEFAULT_ITERATIONS, hash_algorithm="sha256", use_processes=False, submit_timeout=0.0):
+		"""
+		:: Params
+			workers
+				Description: Number of worker threads/processes
+				Type: Integer
+				Default: None (os.cpu_count())
+
+			max_pending
+				Description: Maximum number of jobs queued or running at once
+				Type: Integer
+				Default: 64
+
+			iterations
+				Description: PBKDF2 iterations for new hashes (verification uses the count stored in the hash)
+				Type: Integer
+				Default: DEFAULT_ITERATIONS
+
+			use_processes
+				Description: Use a process pool instead of threads
+				Type: Boolean
+				Default: False
+
+			submit_timeout
+				Description: Seconds to wait for a free slot before raising queue.Full
+				Type: Float
+				Default: 0.0 (do not wait)
+		"""
+		if workers == None:
+			workers = os.cpu_count() or 1
+		self.workers = workers
+		self.iterations = iterations
+		self.hash_algorithm = hash_algorithm
+		self.submit_timeout = submit_timeout
+		self.slots = threading.BoundedSemaphore(max_pending)
+		self.lock = threading.Lock()
+		self.counters = {"submitted" : 0, "completed" : 0, "rejected" : 0}
+		# Executors are imported here so importing this module stays cheap (multiprocessing is only loaded for use_processes)
+		if use_processes:
+			from concurrent.futures import ProcessPoolExecutor
+			self.executor = ProcessPoolExecutor(max_workers=workers)
+		else:
+			from concurrent.futures import ThreadPoolExecutor
+			self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hashing")
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def submit(self, func, *args):
+		"""
+		Queue [func](*args) on the pool
+
+		:: Returns
+			Value: The job's Future
+			Type: concurrent.futures.Future
+
+		:: Remarks
+			- Raises queue.Full if [max_pending] jobs are already queued or running
+		"""
+		if self.submit_timeout > 0:
+			acquired = self.slots.acquire(timeout=self.submit_timeout)
+		else:
+			acquired = self.slots.acquire(blocking=False)
+		if not acquired:
+			with self.lock:
+				self.counters["rejected"] += 1
+			raise Full("Hashing queue is full")
+		with self.lock:
+			self.counters["submitted"] += 1
+		try:
+			future = self.executor.submit(func, *args)
+		except Exception:
+			self.slots.release()
+			raise
+		future.add_done_callback(self.job_done)
+		return future
+
+	def job_done(self, future):
+		self.slots.release()
+		with self.lock:
+			self.counters["completed"] += 1
+
+	def submit_hash(self, uInput):
+		"""
+		Hash a new password in the background; the Future's result is the encoded hash (see hash_password)
+		"""
+		return self.submit(hash_password, uInput, self.iterations, self.hash_algorithm)
+
+	def submit_verify(self, uInput, encoded):
+		"""
+		Verify a password in the background; the Future's result is True/False (see verify_password)
+		"""
+		return self.submit(verify_password, uInput, encoded, "utf-8", self.iterations)
+
+	def hash(self, uInput, timeout=None):
+		"""
+		Hash a new password on the pool and wait for the result
+		"""
+		return self.submit_hash(uInput).result(timeout)
+
+	def verify(self, uInput, encoded, timeout=None):
+		"""
+		Verify a password on the pool and wait for the result
+		"""
+		return self.submit_verify(uInput, encoded).result(timeout)
+
+	def stats(self):
+		"""
+		Return the job counters
+
+		:: Returns
+			Value: {"workers", "iterations", "submitted", "completed", "rejected", "pending"}
+			Type: Dictionary
+		"""
+		with self.lock:
+			stats = dict(self.counters)
+		stats["workers"] = self.workers
+		stats["iterations"] = self.iterations
+		stats["pending"] = stats["submitted"] - stats["completed"]
+		return stats
+
+	def close(self, wait=True):
+		"""
+		Shut the pool down
+		"""
+		self.executor.shutdown(wait=wait)
+
 def main():
 	print("Beginning debugging for {}".format(__file__))
+	argv = sys.argv[1:]
+	if (len(argv) > 0) and (argv[0] == "calibrate"):
+		target_ms = float(argv[1]) if len(argv) > 1 else 250.0
+		print("PBKDF2-HMAC-SHA256 iterations for ~{}ms on this host: {}".format(target_ms, calibrate_iterations(target_ms / 1000.0)))
+		print("Set {}=<iterations> to use it for new hashes".format(ITERATIONS_ENV_VAR))
 
 if __name__ == "__main__":
 	main()
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Shared fixtures of the test suite
+
+:: Usage
+	cd workspace
+	python -m pytest -q
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.dblib as dblib
+
+@pytest.fixture
+def mgt(tmp_path):
+	"""
+	SQLiteDBMgmt of a new database file in a temporary directory
+	"""
+	db_mgmt = dblib.SQLiteDBMgmt("test.db", str(tmp_path))
+	yield db_mgmt
+	if db_mgmt.conn != None:
+		db_mgmt.conn.close()
+
+@pytest.fixture
+def utils(mgt):
+	return mgt.BaseUtilities()
+
+@pytest.fixture
+def parts(mgt):
+	"""
+	A small 'parts' table with 5 rows
+	"""
+	mgt.conn.execute("CREATE TABLE parts (ROW_ID INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, price REAL)")
+	mgt.conn.executemany("INSERT INTO parts (name, price) VALUES (?, ?)", [("part-{}".format(i), i * 10.0) for i in range(5)])
+	mgt.conn.commit()
+	return "parts"
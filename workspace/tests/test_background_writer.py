@@ -0,0 +1,106 @@
+"""
+SQLiteDBMgmt.BackgroundWriter: results, per-write failures, batch-level failures and close()
+"""
+import sqlite3
+import threading
+import pytest
+
+def test_writes_are_committed(mgt, parts):
+	with mgt.BackgroundWriter(mgt.full_path) as writer:
+		futures = [writer.submit("INSERT INTO parts (name, price) VALUES (?, ?)", ("new-{}".format(i), 1.0)) for i in range(10)]
+		row_ids = [f.result(timeout=5) for f in futures]
+	assert len(set(row_ids)) == 10
+	assert mgt.conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0] == 15
+
+def test_failing_write_does_not_fail_the_batch(mgt, parts):
+	with mgt.BackgroundWriter(mgt.full_path) as writer:
+		good = writer.submit("INSERT INTO parts (name, price) VALUES (?, ?)", ("new", 1.0))
+		bad = writer.submit("INSERT INTO parts (name, price) VALUES (?, ?)", ("part-0", 1.0))
+		with pytest.raises(sqlite3.IntegrityError):
+			bad.result(timeout=5)
+		assert good.result(timeout=5) != None
+		assert writer.stats()["errors"] == 1
+	assert mgt.conn.execute("SELECT COUNT(*) FROM parts WHERE name = 'new'").fetchone()[0] == 1
+
+def test_locked_database_fails_every_future(mgt, parts):
+	blocker = sqlite3.connect(mgt.full_path, isolation_level=None)
+	blocker.execute("BEGIN IMMEDIATE;")
+	try:
+		writer = mgt.BackgroundWriter(mgt.full_path, timeout=0.2)
+		futures = [writer.submit("INSERT INTO parts (name, price) VALUES (?, ?)", ("locked-{}".format(i), 1.0)) for i in range(3)]
+		for future in futures:
+			with pytest.raises(sqlite3.OperationalError):
+				future.result(timeout=3)
+		assert writer.stats()["errors"] >= len(futures)
+	finally:
+		blocker.execute("ROLLBACK;")
+		blocker.close()
+
+	# The writer is still usable once the lock is released
+	assert writer.submit("INSERT INTO parts (name, price) VALUES (?, ?)", ("after", 1.0)).result(timeout=5) != None
+	writer.close()
+	assert mgt.conn.execute("SELECT COUNT(*) FROM parts WHERE name LIKE 'locked-%'").fetchone()[0] == 0
+
+def test_failing_call_is_rolled_back_as_a_whole(mgt, parts):
+	def transfer(conn):
+		conn.execute("UPDATE parts SET price = price - 5 WHERE name = 'part-1'")
+		conn.execute("INSERT INTO parts (name, price) VALUES ('part-2', 5.0)")	# UNIQUE violation
+	with mgt.BackgroundWriter(mgt.full_path) as writer:
+		with pytest.raises(sqlite3.IntegrityError):
+			writer.submit_call(transfer).result(timeout=5)
+		writer.flush()
+	assert mgt.conn.execute("SELECT price FROM parts WHERE name = 'part-1'").fetchone()[0] == 10.0
+
+def test_cancelled_future_is_skipped(mgt, parts):
+	blocker = sqlite3.connect(mgt.full_path, isolation_level=None)
+	blocker.execute("BEGIN IMMEDIATE;")
+	with mgt.BackgroundWriter(mgt.full_path, timeout=2.0) as writer:
+		first = writer.submit("INSERT INTO parts (name, price) VALUES ('first', 1.0)")
+		second = writer.submit("INSERT INTO parts (name, price) VALUES ('second', 1.0)")
+		cancelled = second.cancel()
+		blocker.execute("ROLLBACK;")
+		blocker.close()
+		assert first.result(timeout=5) != None
+	current = [row[0] for row in mgt.conn.execute("SELECT name FROM parts")]
+	assert "first" in current
+	assert ("second" in current) != cancelled
+
+def test_every_future_completes_when_closed_during_submits(mgt, parts):
+	writer = mgt.BackgroundWriter(mgt.full_path)
+	futures = []
+	def submitter(n):
+		try:
+			for i in range(1000):
+				futures.append(writer.submit("INSERT INTO parts (name, price) VALUES (?, ?)", ("t{}-{}".format(n, i), 1.0)))
+		except RuntimeError:
+			pass
+	threads = [threading.Thread(target=submitter, args=(n,)) for n in range(4)]
+	for thread in threads:
+		thread.start()
+	writer.close()
+	for thread in threads:
+		thread.join()
+	with pytest.raises(RuntimeError):
+		writer.submit("INSERT INTO parts (name, price) VALUES ('late', 1.0)")
+	# Nothing was queued behind the stop marker: every write was committed
+	assert all(f.result(timeout=0) != None for f in futures)
+	assert mgt.conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0] == 5 + len(futures)
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_writes_left_by_a_dead_writer_thread_fail(mgt, parts, monkeypatch):
+	writer = mgt.BackgroundWriter(mgt.full_path)
+	started = threading.Event()
+	resume = threading.Event()
+	def crash(batch):
+		started.set()
+		resume.wait(5)
+		raise MemoryError("writer thread crashed")
+	monkeypatch.setattr(writer, "write_batch", crash)
+	taken = writer.submit("INSERT INTO parts (name, price) VALUES ('taken', 1.0)")
+	assert started.wait(5)
+	queued = [writer.submit("INSERT INTO parts (name, price) VALUES (?, ?)", ("queued-{}".format(i), 1.0)) for i in range(3)]
+	resume.set()
+	writer.close(timeout=5)
+	for future in [taken] + queued:
+		with pytest.raises(RuntimeError, match="stopped before the write was committed"):
+			future.result(timeout=0)
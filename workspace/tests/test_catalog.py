@@ -0,0 +1,36 @@
+"""
+Normalized parts catalog (modules/catalog.py): the compatibility view must match 'designs'
+"""
+import modules.schema as schema
+import modules.catalog as catalog
+
+def test_compat_view_matches_designs(mgt, utils):
+	schema.migrate(mgt.conn, utils, target_version=2)
+	columns = catalog.design_columns()
+	rows = []
+	for i in range(20):
+		row = []
+		for col in columns:
+			if col.endswith("_price"):
+				row.append(0.0 if (i + len(row)) % 5 == 0 else 9.99 * (i + 1))
+			elif (i + len(row)) % 7 == 0:
+				row.append(None)
+			else:
+				row.append("{} {}".format(col, i % 3))
+		rows.append(row)
+	utils.insert_many(mgt.conn, "designs", rows, columns)
+
+	catalog.migrate(mgt.conn)
+
+	design_columns = [row[1] for row in mgt.conn.execute("PRAGMA table_info(designs)")]
+	view_columns = [row[1] for row in mgt.conn.execute("PRAGMA table_info(designs_compat)")]
+	assert view_columns == design_columns
+	assert "total_price" in view_columns
+	assert mgt.conn.execute("SELECT COUNT(*) FROM (SELECT * FROM designs EXCEPT SELECT * FROM designs_compat)").fetchone()[0] == 0
+	assert mgt.conn.execute("SELECT COUNT(*) FROM (SELECT * FROM designs_compat EXCEPT SELECT * FROM designs)").fetchone()[0] == 0
+
+def test_compat_view_without_total_price(mgt, utils):
+	mgt.conn.execute("CREATE TABLE designs (ROW_ID INTEGER PRIMARY KEY, {})".format(", ".join(catalog.design_columns())))
+	catalog.migrate(mgt.conn)
+	view_columns = [row[1] for row in mgt.conn.execute("PRAGMA table_info(designs_compat)")]
+	assert view_columns == ["ROW_ID"] + catalog.design_columns()
@@ -0,0 +1,52 @@
+"""
+SQLiteDBMgmt.ConnectionPool: nested readers and the writer lock shared with self.conn in pool mode
+"""
+import threading
+import pytest
+import modules.dblib as dblib
+
+@pytest.fixture
+def pooled(tmp_path):
+	db_mgmt = dblib.SQLiteDBMgmt("pool.db", str(tmp_path), pool=True, pool_size=2)
+	db_mgmt.conn.execute("CREATE TABLE parts (ROW_ID INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+	db_mgmt.conn.commit()
+	yield db_mgmt
+	db_mgmt.__exit__()
+
+def test_nested_reader_is_released_by_the_outermost_block(pooled):
+	pool = pooled.pool
+	with pool.reader() as outer:
+		# A read snapshot spanning several queries
+		outer.execute("BEGIN")
+		outer.execute("SELECT COUNT(*) FROM parts").fetchone()
+		with pool.reader() as inner:
+			assert inner is outer
+		# The inner exit neither released the connection nor ended the outer read transaction
+		assert pool.stats()["in_use"] == 1
+		assert outer.in_transaction
+	assert pool.stats()["in_use"] == 0
+	assert not outer.in_transaction
+
+def run_in_thread(func):
+	done = threading.Event()
+	def target():
+		func()
+		done.set()
+	thread = threading.Thread(target=target)
+	thread.start()
+	return thread, done
+
+@pytest.mark.parametrize("hold", ["writer", "transaction"])
+def test_writes_on_conn_wait_for_the_writer(pooled, hold):
+	utils = pooled.BaseUtilities()
+	scope = pooled.pool.writer() if hold == "writer" else pooled.transaction()
+	with scope as conn:
+		conn.execute("INSERT INTO parts (name) VALUES ('held')")
+		thread, done = run_in_thread(lambda: utils.insert(pooled.conn, "parts", {"name" : "other"}, commit=True, get_result=False, completion_msg="", parameterized=True))
+		# The other thread cannot write (nor commit) into the open transaction
+		assert not done.wait(0.3)
+		assert conn.in_transaction
+	thread.join(5)
+	assert done.is_set()
+	with pooled.pool.reader() as reader:
+		assert sorted(r[0] for r in reader.execute("SELECT name FROM parts")) == ["held", "other"]
@@ -0,0 +1,74 @@
+"""
+BaseUtilities.import_file(): validation, rejected records and rollback
+"""
+import json
+import sqlite3
+import pytest
+
+COLUMNS = {
+	"ROW_ID"	: {"type" : "INTEGER",	"key" : "PRIMARY KEY",	"null" : False,	"default" : None,	"unique" : False,	"others" : ""},
+	"name"		: {"type" : "TEXT",		"key" : "NIL",			"null" : False,	"default" : None,	"unique" : True,	"others" : ""},
+	"price"		: {"type" : "REAL",		"key" : "NIL",			"null" : True,	"default" : None,	"unique" : False,	"others" : ""},
+}
+
+def write(path, text):
+	path.write_text(text, encoding="utf-8")
+	return str(path)
+
+def rows(conn):
+	return conn.execute("SELECT name, price FROM parts ORDER BY name").fetchall()
+
+@pytest.fixture
+def empty_parts(mgt, utils):
+	utils.create_table(mgt.conn, "parts", COLUMNS, True, None, True, False, completion_msg="")
+	return "parts"
+
+def test_csv_invalid_records_are_rejected(mgt, utils, empty_parts, tmp_path):
+	file_path = write(tmp_path / "parts.csv", "name,price\na,1.5\n,2.0\nb,not-a-number\nc,3\n")
+	stats = utils.import_file(mgt.conn, "parts", file_path, COLUMNS, workers=0)
+	assert stats["rows_read"] == 4
+	assert stats["rows_inserted"] == 2
+	assert stats["rows_rejected"] == 2
+	assert [line for line, message in stats["errors"]] == [2, 3]
+	assert rows(mgt.conn) == [("a", 1.5), ("c", 3.0)]
+
+def test_json_columns_come_from_every_record(mgt, utils, empty_parts, tmp_path):
+	file_path = write(tmp_path / "parts.json", json.dumps([{"name" : "a"}, {"name" : "b", "price" : 2.5}]))
+	stats = utils.import_file(mgt.conn, "parts", file_path, COLUMNS, workers=0)
+	assert stats["rows_inserted"] == 2
+	assert rows(mgt.conn) == [("a", None), ("b", 2.5)]
+
+def test_json_unknown_column_is_refused(mgt, utils, empty_parts, tmp_path):
+	file_path = write(tmp_path / "parts.json", json.dumps([{"name" : "a"}, {"name" : "b", "colour" : "red"}]))
+	with pytest.raises(ValueError):
+		utils.import_file(mgt.conn, "parts", file_path, COLUMNS, workers=0)
+	assert rows(mgt.conn) == []
+
+def test_jsonl_record_with_other_fields_is_rejected(mgt, utils, empty_parts, tmp_path):
+	file_path = write(tmp_path / "parts.jsonl", '{"name" : "a"}\n{"name" : "b", "price" : 2.5}\n{"name" : "c"}\n')
+	stats = utils.import_file(mgt.conn, "parts", file_path, COLUMNS, workers=0)
+	assert stats["rows_rejected"] == 1
+	assert stats["errors"][0][0] == 2
+	assert rows(mgt.conn) == [("a", None), ("c", None)]
+
+def test_dry_run_writes_nothing(mgt, utils, empty_parts, tmp_path):
+	file_path = write(tmp_path / "parts.csv", "name,price\na,1\nb,2\n")
+	stats = utils.import_file(mgt.conn, "parts", file_path, COLUMNS, workers=0, dry_run=True)
+	assert (stats["rows_read"], stats["rows_inserted"]) == (2, 0)
+	assert rows(mgt.conn) == []
+
+def test_database_error_rolls_the_import_back(mgt, utils, empty_parts, tmp_path):
+	# The duplicate name is only caught by the UNIQUE constraint, after the first rows were inserted
+	lines = ["name,price"] + ["part-{},1".format(i) for i in range(50)] + ["part-0,2"]
+	file_path = write(tmp_path / "parts.csv", "\n".join(lines) + "\n")
+	with pytest.raises(sqlite3.IntegrityError):
+		utils.import_file(mgt.conn, "parts", file_path, COLUMNS, chunk_size=10, workers=0)
+	assert not mgt.conn.in_transaction
+	assert rows(mgt.conn) == []
+
+def test_parallel_parsing_keeps_file_order(mgt, utils, empty_parts, tmp_path):
+	lines = ["name,price"] + ["part-{:03d},{}".format(i, i) for i in range(100)]
+	file_path = write(tmp_path / "parts.csv", "\n".join(lines) + "\n")
+	stats = utils.import_file(mgt.conn, "parts", file_path, COLUMNS, chunk_size=7, workers=2)
+	assert stats["rows_inserted"] == 100
+	assert [row[0] for row in mgt.conn.execute("SELECT name FROM parts ORDER BY ROW_ID")] == ["part-{:03d}".format(i) for i in range(100)]
@@ -0,0 +1,63 @@
+"""
+BaseUtilities.paginate(): keyset pagination and its continuation tokens
+"""
+import pytest
+
+@pytest.fixture
+def priced_parts(mgt):
+	# 23 rows, prices with ties so that ROW_ID has to break them
+	mgt.conn.execute("CREATE TABLE parts (ROW_ID INTEGER PRIMARY KEY, name TEXT NOT NULL, price REAL NOT NULL)")
+	mgt.conn.executemany("INSERT INTO parts (name, price) VALUES (?, ?)", [("part-{}".format(i), float(i % 4)) for i in range(23)])
+	mgt.conn.commit()
+	return "parts"
+
+def walk_forward(utils, conn, **kwargs):
+	pages = []
+	page = utils.paginate(conn, "parts", "name", page_size=5, **kwargs)
+	pages.append(page)
+	while page["next"] != None:
+		page = utils.paginate(conn, "parts", "name", page_size=5, token=page["next"], **kwargs)
+		pages.append(page)
+	return pages
+
+def names(page):
+	return [row[0] for row in page["rows"]]
+
+@pytest.mark.parametrize("sort_column,descending", [(None, False), (None, True), ("price", False), ("price", True)])
+def test_forward_walk_returns_every_row_once_in_order(mgt, utils, priced_parts, sort_column, descending):
+	pages = walk_forward(utils, mgt.conn, sort_column=sort_column, descending=descending)
+	order = "{} {}, ROW_ID {}".format(sort_column, "DESC" if descending else "ASC", "DESC" if descending else "ASC") if sort_column != None else "ROW_ID {}".format("DESC" if descending else "ASC")
+	expected = [row[0] for row in mgt.conn.execute("SELECT name FROM parts ORDER BY {}".format(order))]
+	assert [name for page in pages for name in names(page)] == expected
+	assert [len(page["rows"]) for page in pages] == [5, 5, 5, 5, 3]
+	assert pages[0]["previous"] == None
+	assert pages[-1]["next"] == None
+
+def test_previous_token_returns_the_previous_page(mgt, utils, priced_parts):
+	pages = walk_forward(utils, mgt.conn, sort_column="price")
+	for i in range(1, len(pages)):
+		previous = utils.paginate(mgt.conn, "parts", "name", page_size=5, token=pages[i]["previous"], sort_column="price")
+		assert names(previous) == names(pages[i - 1])
+	# And forward again from a page reached backward
+	previous = utils.paginate(mgt.conn, "parts", "name", page_size=5, token=pages[2]["previous"], sort_column="price")
+	following = utils.paginate(mgt.conn, "parts", "name", page_size=5, token=previous["next"], sort_column="price")
+	assert names(following) == names(pages[2])
+
+def test_filter_and_params_apply_to_every_page(mgt, utils, priced_parts):
+	pages = walk_forward(utils, mgt.conn, where_condition="price >= ?", params=(2.0,))
+	expected = [row[0] for row in mgt.conn.execute("SELECT name FROM parts WHERE price >= 2 ORDER BY ROW_ID")]
+	assert [name for page in pages for name in names(page)] == expected
+
+def test_token_of_another_query_is_refused(mgt, utils, priced_parts):
+	token = utils.paginate(mgt.conn, "parts", "name", page_size=5, sort_column="price")["next"]
+	with pytest.raises(ValueError):
+		utils.paginate(mgt.conn, "parts", "name", page_size=5, token=token, sort_column="price", descending=True)
+	with pytest.raises(ValueError):
+		utils.paginate(mgt.conn, "parts", "name", page_size=5, token=token)
+
+@pytest.mark.parametrize("changed", [{"where_condition" : "price >= ?", "params" : (3.0,)}, {"col" : "name, price"}, {"key_column" : "name"}])
+def test_token_of_another_filter_or_column_list_is_refused(mgt, utils, priced_parts, changed):
+	query = {"col" : "name", "where_condition" : "price >= ?", "params" : (2.0,), "key_column" : "ROW_ID"}
+	token = utils.paginate(mgt.conn, "parts", page_size=5, **query)["next"]
+	with pytest.raises(ValueError, match="does not belong to this query"):
+		utils.paginate(mgt.conn, "parts", page_size=5, token=token, **dict(query, **changed))
@@ -0,0 +1,30 @@
+"""
+SQLiteDBMgmt.QueryAdvisor: full scans, index suggestions and unused indexes
+"""
+import pytest
+
+def analyze(mgt, stmts):
+	advisor = mgt.QueryAdvisor()
+	for stmt, params in stmts:
+		advisor.record(stmt, params)
+	return advisor.analyze(mgt.conn, measure=False)
+
+def test_full_scan_gets_a_suggestion(mgt, parts):
+	report = analyze(mgt, [("SELECT ROW_ID FROM parts WHERE price = ?", (10.0,))])
+	assert report["queries"][0]["full_scans"] == ["parts"]
+	assert [s["columns"] for s in report["suggestions"]] == [["price"]]
+
+def test_virtual_table_is_not_a_full_scan(mgt, utils, parts):
+	if not utils.fts_available(mgt.conn):
+		pytest.skip("SQLite built without FTS5")
+	mgt.conn.execute("CREATE INDEX idx_parts_price ON parts (price)")
+	mgt.conn.execute("CREATE VIRTUAL TABLE parts_fts USING fts5(name, content='parts', content_rowid='ROW_ID')")
+	mgt.conn.execute("INSERT INTO parts_fts (parts_fts) VALUES ('rebuild')")
+	report = analyze(mgt, [
+		("SELECT p.ROW_ID FROM parts_fts JOIN parts p ON p.ROW_ID = parts_fts.rowid WHERE parts_fts MATCH ?", ("part",)),
+		("SELECT ROW_ID FROM parts WHERE price > ?", (10.0,)),
+	])
+	assert any("VIRTUAL TABLE" in detail for detail in report["queries"][0]["plan"])
+	assert report["queries"][0]["full_scans"] == []
+	assert report["suggestions"] == []
+	assert "idx_parts_price" not in [r["index"] for r in report["redundant_indexes"]]
@@ -0,0 +1,81 @@
+"""
+SQLiteDBMgmt.ResultCache through BaseUtilities.retrieve(): hits, and invalidation on writes and rollbacks
+"""
+import sqlite3
+import pytest
+
+def price(utils, conn, name="part-1"):
+	row = utils.retrieve(conn, "parts", "price", "name=?", fetch="one", completion_msg="", verbose=False, params=(name,))
+	return row[0] if row != None else None
+
+def count(utils, conn):
+	return utils.retrieve(conn, "parts", "COUNT(*)", completion_msg="", verbose=False)[0][0]
+
+@pytest.fixture
+def cache(mgt, utils, parts):
+	utils.result_cache = mgt.ResultCache()
+	return utils.result_cache
+
+def test_repeated_reads_are_served_from_the_cache(mgt, utils, cache):
+	assert price(utils, mgt.conn) == 10.0
+	assert price(utils, mgt.conn) == 10.0
+	stats = cache.stats()
+	assert (stats["hits"], stats["misses"]) == (1, 1)
+
+def test_write_invalidates(mgt, utils, cache):
+	assert price(utils, mgt.conn) == 10.0
+	utils.query_exec(mgt.conn, None, "UPDATE parts SET price = ? WHERE name = ?", True, completion_msg="", params=(99.0, "part-1"))
+	assert price(utils, mgt.conn) == 99.0
+
+def test_insert_many_invalidates(mgt, utils, cache):
+	assert count(utils, mgt.conn) == 5
+	utils.insert_many(mgt.conn, "parts", [("new-{}".format(i), 1.0) for i in range(3)], ["name", "price"])
+	assert count(utils, mgt.conn) == 8
+
+def test_write_through_a_view_invalidates(mgt, utils, cache):
+	mgt.conn.execute("CREATE VIEW cheap_parts AS SELECT name FROM parts WHERE price < 25")
+	assert len(utils.retrieve(mgt.conn, "cheap_parts", completion_msg="", verbose=False)) == 3
+	utils.query_exec(mgt.conn, None, "UPDATE parts SET price = 0 WHERE name = 'part-4'", True, completion_msg="")
+	assert len(utils.retrieve(mgt.conn, "cheap_parts", completion_msg="", verbose=False)) == 4
+
+def test_failed_insert_many_rolls_back_and_invalidates(mgt, utils, cache):
+	assert count(utils, mgt.conn) == 5
+	with pytest.raises(sqlite3.IntegrityError):
+		utils.insert_many(mgt.conn, "parts", [("new", 1.0), ("part-0", 1.0)], ["name", "price"], batch_size=1)
+	assert count(utils, mgt.conn) == 5
+	assert price(utils, mgt.conn, "new") == None
+
+def test_scope_commit_invalidates_other_connections(mgt, utils, cache):
+	other = sqlite3.connect(mgt.full_path)
+	try:
+		assert price(utils, other) == 10.0
+		with mgt.transaction() as conn:
+			utils.query_exec(conn, None, "UPDATE parts SET price = 99 WHERE name = 'part-1'", True, completion_msg="")
+			assert price(utils, conn) == 99.0		# read inside the scope: not cached
+			assert price(utils, other) == 10.0		# re-cached by the other connection before the commit
+		assert price(utils, other) == 99.0
+		assert price(utils, mgt.conn) == 99.0
+	finally:
+		other.close()
+
+def test_scope_rollback_leaves_no_stale_rows(mgt, utils, cache):
+	assert price(utils, mgt.conn) == 10.0
+	with pytest.raises(ValueError):
+		with mgt.transaction() as conn:
+			utils.query_exec(conn, None, "UPDATE parts SET price = 99 WHERE name = 'part-1'", True, completion_msg="")
+			assert price(utils, conn) == 99.0
+			raise ValueError("abort")
+	assert price(utils, mgt.conn) == 10.0
+
+def test_uncached_read_bypasses_the_cache(mgt, utils, cache):
+	assert price(utils, mgt.conn) == 10.0
+	# A write the cache cannot see (outside BaseUtilities)
+	mgt.conn.execute("UPDATE parts SET price = 55 WHERE name = 'part-1'")
+	mgt.conn.commit()
+	entries = cache.stats()["entries"]
+	row = utils.retrieve(mgt.conn, "parts", "price", "name=?", fetch="one", completion_msg="", verbose=False, params=("part-1",), cache=False)
+	assert row[0] == 55.0
+	assert cache.stats()["entries"] == entries
+	# Nothing is stored either
+	utils.retrieve(mgt.conn, "parts", "name", "price=?", fetch="one", completion_msg="", verbose=False, params=(55.0,), cache=False)
+	assert cache.stats()["entries"] == entries
@@ -0,0 +1,27 @@
+"""
+modules/schema.py: migrations replay their own frozen definitions, and a new file ends up with table_properties
+"""
+import modules.schema as schema
+
+def columns(conn, table_name):
+	return [row[1] for row in conn.execute("PRAGMA table_info({})".format(table_name)).fetchall()]
+
+def test_new_file_matches_table_properties(mgt, utils):
+	schema.migrate(mgt.conn, utils)
+	for curr_table in schema.table_properties:
+		assert columns(mgt.conn, curr_table["name"]) == list(curr_table["columns"].keys())
+		for index_name in curr_table.get("indexes", {}):
+			assert mgt.conn.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name=?", (index_name,)).fetchone() != None
+
+def test_released_migrations_ignore_table_properties(mgt, utils, monkeypatch):
+	designs = dict(schema.table_properties[1])
+	designs["columns"] = dict(designs["columns"], build_notes={"type" : "TEXT", "key" : "NIL", "null" : True, "default" : None, "unique" : False, "others" : ""})
+	designs["aggregates"] = {"parts_price" : ["cpu_price", "gpu_price"]}
+	monkeypatch.setattr(schema, "table_properties", [schema.table_properties[0], designs])
+
+	schema.migrate(mgt.conn, utils, target_version=1)
+	assert "total_price" not in columns(mgt.conn, "designs")
+	assert "build_notes" not in columns(mgt.conn, "designs")
+	schema.migrate(mgt.conn, utils)
+	assert columns(mgt.conn, "designs")[-1] == "total_price"
+	assert "parts_price" not in columns(mgt.conn, "designs")
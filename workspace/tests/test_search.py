@@ -0,0 +1,46 @@
+"""
+BaseUtilities.search() and the FTS5 index kept in sync by create_fts_index() triggers
+"""
+import sqlite3
+import pytest
+import modules.schema as schema
+
+@pytest.fixture
+def designs(mgt, utils):
+	if not utils.fts_available(mgt.conn):
+		pytest.skip("SQLite built without FTS5")
+	schema.migrate(mgt.conn, utils)
+	return "designs"
+
+def found(utils, conn, text):
+	return [row[0] for row in (utils.search(conn, "designs", text, col="ROW_ID") or [])]
+
+def insert(conn, row_id, cpu_name, verb="INSERT"):
+	conn.execute("{} INTO designs (ROW_ID, cpu_name, cpu_price) VALUES (?, ?, 100)".format(verb), (row_id, cpu_name))
+	conn.commit()
+
+def test_insert_update_delete_are_indexed(mgt, utils, designs):
+	insert(mgt.conn, 1, "Ryzen 7 7800X3D")
+	assert found(utils, mgt.conn, "ryz") == [1]
+	mgt.conn.execute("UPDATE designs SET cpu_name = 'Intel i9' WHERE ROW_ID = 1")
+	assert found(utils, mgt.conn, "ryz") == []
+	assert found(utils, mgt.conn, "i9") == [1]
+	mgt.conn.execute("DELETE FROM designs WHERE ROW_ID = 1")
+	assert found(utils, mgt.conn, "i9") == []
+
+def test_replace_removes_the_old_words(mgt, utils, designs):
+	insert(mgt.conn, 1, "Ryzen 7 7800X3D")
+	insert(mgt.conn, 1, "Intel i9", "INSERT OR REPLACE")
+	assert found(utils, mgt.conn, "ryz") == []
+	assert found(utils, mgt.conn, "i9") == [1]
+
+def test_insert_many_replace_on_a_plain_connection(mgt, utils, designs):
+	insert(mgt.conn, 1, "Ryzen 7 7800X3D")
+	conn = sqlite3.connect(mgt.full_path)		# recursive_triggers off, as sqlite3 opens it
+	try:
+		utils.insert_many(conn, "designs", [(1, "Intel i9")], ["ROW_ID", "cpu_name"], conflict="OR REPLACE")
+		assert found(utils, conn, "ryz") == []
+		assert found(utils, conn, "i9") == [1]
+		assert conn.execute("INSERT INTO designs_fts (designs_fts, rank) VALUES ('integrity-check', 1)") != None
+	finally:
+		conn.close()
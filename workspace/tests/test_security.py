@@ -0,0 +1,43 @@
+"""
+Password hashing and verification (modules/security.py)
+"""
+import pytest
+import modules.security as sec
+
+ITERATIONS = 1000
+
+def test_pbkdf2_round_trip():
+	encoded = sec.hash_password("correct horse", ITERATIONS)
+	assert sec.verify_password("correct horse", encoded)
+	assert not sec.verify_password("wrong horse", encoded)
+	assert not sec.needs_rehash(encoded, iterations=ITERATIONS)
+	assert sec.needs_rehash(encoded, iterations=ITERATIONS * 2)
+
+def test_legacy_sha256():
+	encoded = sec.encrypt_sha256("pässwörd")
+	assert sec.verify_password("pässwörd", encoded)
+	assert not sec.verify_password("password", encoded)
+	assert sec.needs_rehash(encoded)
+
+def test_non_ascii_stored_value_is_rejected():
+	assert not sec.verify_password("password", "pässwörd")
+
+def test_unknown_account_is_rejected():
+	assert not sec.verify_password("password", None, dummy_iterations=ITERATIONS)
+	with sec.HashingService(workers=1, iterations=ITERATIONS) as hashing:
+		assert not hashing.verify("password", None)
+
+def test_rehash_only_below_the_configured_count():
+	encoded = sec.hash_password("correct horse", ITERATIONS * 3)
+	assert not sec.needs_rehash(encoded, iterations=ITERATIONS * 2)
+	assert not sec.needs_rehash(encoded, iterations=ITERATIONS * 3)
+	assert sec.needs_rehash(encoded, iterations=ITERATIONS * 4)
+
+def test_configured_iterations_is_stable(monkeypatch):
+	monkeypatch.delenv(sec.ITERATIONS_ENV_VAR, raising=False)
+	assert sec.configured_iterations() == sec.DEFAULT_ITERATIONS
+	monkeypatch.setenv(sec.ITERATIONS_ENV_VAR, "600000")
+	assert [sec.configured_iterations() for i in range(3)] == [600000] * 3
+	monkeypatch.setenv(sec.ITERATIONS_ENV_VAR, "0")
+	with pytest.raises(ValueError):
+		sec.configured_iterations()
@@ -0,0 +1,41 @@
+"""
+designs.total_price: the stored sum kept up to date by BaseUtilities.materialize_sum() triggers
+"""
+import modules.schema as schema
+
+PRICES = schema.table_properties[1]["aggregates"]["total_price"]
+
+def total(conn, row_id):
+	return conn.execute("SELECT total_price FROM designs WHERE ROW_ID=?", (row_id,)).fetchone()[0]
+
+def test_triggers_keep_the_sum(mgt, utils):
+	schema.migrate(mgt.conn, utils)
+	conn = mgt.conn
+	row_id = conn.execute("INSERT INTO designs (cpu_price, gpu_price) VALUES (300, 600)").lastrowid
+	assert total(conn, row_id) == 900
+	conn.execute("UPDATE designs SET gpu_price = 500, case_price = NULL WHERE ROW_ID=?", (row_id,))
+	assert total(conn, row_id) == 800
+	# A hand edit of the stored sum is put back
+	conn.execute("UPDATE designs SET total_price = 1 WHERE ROW_ID=?", (row_id,))
+	assert total(conn, row_id) == 800
+	conn.commit()
+
+def test_update_trigger_does_not_watch_the_stored_column(mgt, utils):
+	schema.migrate(mgt.conn, utils)
+	sql = mgt.conn.execute("SELECT sql FROM sqlite_master WHERE type='trigger' AND name='trg_designs_total_price_update'").fetchone()[0]
+	update_of = sql[sql.index("UPDATE OF") + len("UPDATE OF"):sql.index(" ON ")]
+	assert "total_price" not in update_of
+
+def test_migration_replaces_the_old_triggers(mgt, utils):
+	schema.migrate(mgt.conn, utils, target_version=4)
+	conn = mgt.conn
+	expr = " + ".join(["IFNULL(NEW.{}, 0)".format(c) for c in PRICES])
+	conn.execute("DROP TRIGGER trg_designs_total_price_update")
+	conn.execute("CREATE TRIGGER trg_designs_total_price_update AFTER UPDATE OF {}, total_price ON designs BEGIN UPDATE designs SET total_price = {} WHERE ROW_ID = NEW.ROW_ID; END".format(", ".join(PRICES), expr))
+	conn.commit()
+	schema.migrate(conn, utils)
+	assert schema.get_version(conn) == schema.SCHEMA_VERSION
+	sql = conn.execute("SELECT sql FROM sqlite_master WHERE type='trigger' AND name='trg_designs_total_price_update'").fetchone()[0]
+	assert ", total_price ON" not in sql
+	row_id = conn.execute("INSERT INTO designs (cpu_price) VALUES (250)").lastrowid
+	assert total(conn, row_id) == 250
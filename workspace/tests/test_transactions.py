@@ -0,0 +1,75 @@
+"""
+SQLiteDBMgmt.transaction(): commit once on exit, roll back on error, nested scopes as savepoints
+"""
+import sqlite3
+import pytest
+import modules.dblib as dblib
+
+def names(conn):
+	return [row[0] for row in conn.execute("SELECT name FROM parts ORDER BY ROW_ID")]
+
+def test_scope_commits_once(mgt, utils, parts):
+	with mgt.transaction() as conn:
+		utils.query_exec(conn, None, "INSERT INTO parts (name, price) VALUES (?, ?)", True, completion_msg="", params=("new", 1.0))
+		assert conn.in_transaction		# commit=True is deferred to the scope
+	assert not mgt.conn.in_transaction
+	assert "new" in names(mgt.conn)
+
+def test_error_rolls_the_scope_back(mgt, utils, parts):
+	with pytest.raises(ZeroDivisionError):
+		with mgt.transaction() as conn:
+			utils.query_exec(conn, None, "INSERT INTO parts (name, price) VALUES (?, ?)", True, completion_msg="", params=("new", 1.0))
+			1 / 0
+	assert "new" not in names(mgt.conn)
+	assert dblib.transaction_scope(mgt.conn) == None
+
+def test_nested_scope_rolls_back_alone(mgt, utils, parts):
+	with mgt.transaction() as conn:
+		utils.query_exec(conn, None, "INSERT INTO parts (name, price) VALUES ('outer', 1.0)", True, completion_msg="")
+		with pytest.raises(ValueError):
+			with mgt.transaction():
+				utils.query_exec(conn, None, "INSERT INTO parts (name, price) VALUES ('inner', 1.0)", True, completion_msg="")
+				raise ValueError("inner")
+		with mgt.transaction():
+			utils.query_exec(conn, None, "INSERT INTO parts (name, price) VALUES ('inner-2', 1.0)", True, completion_msg="")
+	current = names(mgt.conn)
+	assert "outer" in current and "inner-2" in current
+	assert "inner" not in current
+
+def test_swallowed_error_fails_the_scope(mgt, utils, parts):
+	# query_exec() only records the IntegrityError; the scope raises it on exit and rolls back
+	with pytest.raises(sqlite3.IntegrityError):
+		with mgt.transaction() as conn:
+			utils.query_exec(conn, None, "INSERT INTO parts (name, price) VALUES ('new', 1.0)", True, completion_msg="")
+			utils.query_exec(conn, None, "INSERT INTO parts (name, price) VALUES ('part-0', 1.0)", True, completion_msg="")
+	assert "new" not in names(mgt.conn)
+
+def test_open_transaction_is_refused(mgt, parts):
+	mgt.conn.execute("INSERT INTO parts (name, price) VALUES ('pending', 1.0)")
+	with pytest.raises(RuntimeError):
+		with mgt.transaction():
+			pass
+	mgt.conn.rollback()
+	with mgt.transaction():
+		pass
+
+def test_sqlite_rollback_keeps_the_original_error(mgt, parts):
+	# INSERT OR ROLLBACK ends the whole transaction, so the savepoint no longer exists when the scope rolls back
+	with pytest.raises(sqlite3.IntegrityError):
+		with mgt.transaction() as conn:
+			conn.execute("INSERT INTO parts (name, price) VALUES ('outer', 1.0)")
+			with mgt.transaction():
+				conn.execute("INSERT OR ROLLBACK INTO parts (name, price) VALUES ('part-0', 1.0)")
+	assert not mgt.conn.in_transaction
+	assert "outer" not in names(mgt.conn)
+
+def test_sqlite_rollback_in_a_caught_nested_scope_fails_the_outer_scope(mgt, parts):
+	with pytest.raises(sqlite3.OperationalError):
+		with mgt.transaction() as conn:
+			conn.execute("INSERT INTO parts (name, price) VALUES ('outer', 1.0)")
+			with pytest.raises(sqlite3.IntegrityError):
+				with mgt.transaction():
+					conn.execute("INSERT OR ROLLBACK INTO parts (name, price) VALUES ('part-0', 1.0)")
+	assert "outer" not in names(mgt.conn)
+	with mgt.transaction():
+		pass